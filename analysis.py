@@ -1,53 +1,216 @@
 import pandas as pd
-from PyQt5.QtWidgets import QMessageBox
-from scipy import stats
-import matplotlib.pyplot as plt
-import seaborn as sns
-from export_word import export_to_word
+from charts import chart_specs, overview_spec, render_charts
+from export_word import export_to_word, DEFAULT_REPORT, MAX_RAW_ROWS
+from data_input import df_from_table, numeric_columns, infer_roles
+from stats_engine import batch_statistics
+from anova import run_tests, MAX_FACTORS
+from cache import make_key
+from resampling import N_RESAMPLES, CI, SEED
+from profiling import stage, timed
+
+TEST_TITLES = [
+    ("design", "план досліду"),
+    ("anova", "дисперсійний аналіз"),
+    ("rm_anova", "ANOVA з повторними вимірюваннями"),
+    ("lsd", "НІР₀₅"),
+    ("tukey", "критерій Тьюкі"),
+    ("kruskal", "критерій Краскела–Волліса"),
+    ("friedman", "критерій Фрідмана"),
+    ("permutation", "перестановочний тест"),
+    ("permutation_pairs", "перестановочні попарні порівняння"),
+    ("bootstrap", "бутстреп-інтервали середніх"),
+    ("bootstrap_diff", "бутстреп-інтервали різниць середніх"),
+    ("means", "середні за факторами"),
+]
+
+# бутстреп і перестановочні тести (resampling.py) — для показників, що не
+# проходять тест нормальності, якщо спостережень не більше RESAMPLE_MAX_N
+RESAMPLING = {"n_resamples": N_RESAMPLES, "ci": CI, "seed": SEED}
+RESAMPLE_MAX_N = 5_000
+
+# графіки для кожного показника у звіті (див. charts.chart_specs)
+REPORT_CHARTS = {"box": True, "bar": True}
+
+
+class _NoContext:
+    """Заглушка контексту для синхронного виклику (без прогресу і скасування)."""
+    def progress(self, percent):
+        pass
+
+    def check(self):
+        pass
+
+
+class _Scaled:
+    """Контекст, що відображає прогрес 0..100 підзадачі у проміжок [lo, hi] цілого."""
+    def __init__(self, ctx, lo, hi):
+        self._ctx, self._lo, self._hi = ctx, lo, hi
+
+    def progress(self, percent):
+        self._ctx.progress(self._lo + (self._hi - self._lo) * percent // 100)
+
+    def check(self):
+        self._ctx.check()
+
+
+def analyze_indicators(ctx, df: pd.DataFrame, columns, roles: dict, resampling: dict = None) -> dict:
+    """
+    Описова статистика, нормальність та однорідність для групи показників
+    (stats_engine.batch_statistics) і ANOVA/непараметричні тести для кожного
+    (anova.run_tests); для ненормальних — ще бутстреп і перестановочні тести
+    з параметрами resampling (доповнюють RESAMPLING). Не звертається до Qt —
+    безпечно у фоні.
+    """
+    ctx = ctx or _NoContext()
+    ctx.progress(5)
+    with stage("normality"):
+        result = batch_statistics(df, columns, roles["group_for_np"])
+    params = {**RESAMPLING, **(resampling or {})}
+    bad = set(non_normal_indicators(result["describe"]))
+    result["tests"] = {}
+    for i, col in enumerate(columns):
+        ctx.check()
+        small = col in bad and df[col].count() <= RESAMPLE_MAX_N
+        with stage("model"):
+            res = result["tests"][col] = run_tests(df, col, roles, resampling=params if small else None)
+        if col in bad and "permutation" not in res:
+            res["resampling_skipped"] = (f"понад {RESAMPLE_MAX_N} спостережень" if not small
+                                         else "немає фактора з двома і більше групами")
+        ctx.progress(10 + 90 * (i + 1) // len(columns))
+    return result
+
+
+def merge_results(parts: list) -> dict:
+    """Об'єднує результати analyze_indicators, порахованих окремими завданнями."""
+    homogeneity = [p["homogeneity"] for p in parts if p["homogeneity"] is not None]
+    tests = {}
+    for p in parts:
+        tests.update(p["tests"])
+    return {
+        "describe": pd.concat([p["describe"] for p in parts], ignore_index=True),
+        "homogeneity": pd.concat(homogeneity, ignore_index=True) if homogeneity else None,
+        "tests": tests,
+    }
+
+
+def split_results(result: dict) -> dict:
+    """Розбиває результат analyze_indicators на частини по показниках (для кешу)."""
+    describe, hom = result["describe"], result["homogeneity"]
+    parts = {}
+    for col, tests in result["tests"].items():
+        parts[col] = {
+            "describe": describe[describe["indicator"] == col].reset_index(drop=True),
+            "homogeneity": None if hom is None else hom[hom["indicator"] == col].reset_index(drop=True),
+            "tests": {col: tests},
+        }
+    return parts
+
+
+def indicator_key(fingerprints: dict, indicator, roles: dict, subset: str = None) -> tuple:
+    """
+    Ключ кешу результатів одного показника: його дані, стовпці ролей і самі ролі;
+    subset — хеш набору рядків фільтра (row_views.fingerprint), None — уся таблиця.
+    """
+    params = roles if subset is None else {"roles": roles, "rows": subset}
+    return make_key("indicator", fingerprints, [indicator] + role_columns(roles), params)
+
+
+def non_normal_indicators(describe: pd.DataFrame, alpha: float = 0.05) -> list:
+    """Показники, у яких хоча б одна група не проходить тест Шапіро–Уілка."""
+    return list(dict.fromkeys(describe.loc[describe["shapiro_p"] < alpha, "indicator"]))
+
+
+@timed("parse")
+def resampling_outcome(results: dict) -> tuple:
+    """
+    (ненормальні показники з бутстрепом і перестановочними тестами,
+    [(показник, причина)] — ненормальні, для яких їх не виконано).
+    """
+    done, skipped = [], []
+    for col in non_normal_indicators(results["describe"]):
+        res = results["tests"].get(col) or {}
+        if "permutation" in res:
+            done.append(col)
+        else:
+            skipped.append((col, res.get("resampling_skipped", "не виконувались")))
+    return done, skipped
+
+
+def analysis_plan(df: pd.DataFrame):
+    """
+    (показники, ролі) за infer_roles; порожні стовпці ігноруються.
+    Показники — response і числові стовпці, що не є факторами чи суб'єктом.
+    """
+    df = df.dropna(axis=1, how="all")
+    roles = infer_roles(df)
+    skip = set(roles["factors"]) | {roles["subject"]}
+    indicators = [c for c in numeric_columns(df) if c == roles["response"] or c not in skip]
+    return indicators, roles
+
+
+def role_columns(roles: dict) -> list:
+    """Стовпці-фактори і суб'єкт, потрібні тестам, без повторів."""
+    cols = [c for c in roles["factors"][:MAX_FACTORS + 1] + [roles["subject"], roles["group_for_np"]] if c is not None]
+    return list(dict.fromkeys(cols))
+
+
+def report_tables(results: dict, tests=None) -> dict:
+    """Таблиці звіту {заголовок: DataFrame}; tests — ключі TEST_TITLES (None — усі)."""
+    tables = {"Описова статистика": results["describe"]}
+    if results["homogeneity"] is not None:
+        tables["Однорідність дисперсій"] = results["homogeneity"]
+    for col, res in results["tests"].items():
+        for key, title in TEST_TITLES:
+            # план (збалансованість, тип SS) іде разом із таблицею ANOVA
+            wanted = tests is None or key in tests or (key == "design" and "anova" in tests)
+            if res.get(key) is not None and wanted:
+                tables[f"{col}: {title}"] = res[key]
+    return tables
+
+
+def build_report(ctx, df: pd.DataFrame, results: dict, indicators: list,
+                 path: str = DEFAULT_REPORT, charts: dict = None, tests=None,
+                 parallel: bool = True, max_raw_rows: int = MAX_RAW_ROWS) -> str:
+    """
+    Графіки і Word-звіт (у файл path) за результатами analyze_indicators (у фоні).
+    Загальний box-plot плюс графіки charts (за замовчуванням REPORT_CHARTS)
+    для кожного показника; з parallel — паралельно у пулі процесів.
+    tests — ключі TEST_TITLES, які включати у звіт (None — усі).
+    """
+    ctx = ctx or _NoContext()
+    selection = REPORT_CHARTS if charts is None else charts
+    specs = [overview_spec(df, indicators)]
+    for col in indicators:
+        res = results["tests"].get(col) or {}
+        specs += chart_specs(df, col, res.get("factors") or [], res, selection)
+    images = render_charts(specs, parallel, _Scaled(ctx, 0, 80))
+    ctx.check()
+    export_to_word(df, "Результати аналізу", "од.", report_tables(results, tests), images, path, max_raw_rows)
+    ctx.progress(100)
+    return path
+
 
 def run_analysis(table_widget):
-    # Зчитуємо дані з таблиці
-    rows = table_widget.rowCount()
-    cols = table_widget.columnCount()
-    headers = [table_widget.horizontalHeaderItem(i).text() for i in range(cols)]
-    data = []
-
-    for i in range(rows):
-        row_data = []
-        for j in range(cols):
-            item = table_widget.item(i, j)
-            try:
-                row_data.append(float(item.text()) if item else None)
-            except:
-                row_data.append(None)
-        data.append(row_data)
-
-    df = pd.DataFrame(data, columns=headers)
-
-    # Автоматична перевірка на нормальність
-    normal_results = {}
-    for col in df.columns:
-        col_data = df[col].dropna()
-        if len(col_data) > 3:
-            stat, p = stats.shapiro(col_data)
-            normal_results[col] = (stat, p)
-
-    # Якщо дані не нормальні → повідомлення
-    for col, (stat, p) in normal_results.items():
-        if p < 0.05:
-            QMessageBox.warning(None, "Перевірка нормальності", 
-                f"Дані у стовпчику '{col}' не відповідають нормальному розподілу (p={p:.3f}).\n"
-                f"Рекомендується використати непараметричні методи.")
-            return
-
-    # Якщо нормальні → будуємо графік і експортуємо
-    plt.figure(figsize=(6,4))
-    sns.boxplot(data=df)
-    plt.title("Розподіл даних")
-    plt.savefig("graph.png")
-    plt.close()
-
-    # Експорт у Word
-    export_to_word(df, "Результати аналізу", "од.", {"Нормальність": normal_results}, "graph.png")
-
-    QMessageBox.information(None, "Аналіз завершено", "Результати збережено у Word.")
+    """Синхронний аналіз (блокує GUI); у вікні використовується фонова черга завдань."""
+    from PyQt5.QtWidgets import QMessageBox
+
+    with stage("table"):
+        df = df_from_table(table_widget)
+    indicators, roles = analysis_plan(df)
+    if not indicators:
+        QMessageBox.information(None, "Аналіз", "У таблиці немає числових показників.")
+        return
+
+    results = merge_results([analyze_indicators(None, df, indicators, roles)])
+    path = build_report(None, df, results, indicators)
+
+    bad = non_normal_indicators(results["describe"])
+    done, skipped = resampling_outcome(results)
+    msg = f"Результати збережено у {path}."
+    if bad:
+        msg += ("\n\nНе відповідають нормальному розподілу: " + ", ".join(map(str, bad)) +
+                ".\nДля них у звіті — критерії Краскела–Волліса і Фрідмана")
+        msg += (", бутстреп-інтервали і перестановочні тести." if not skipped else
+                ".\nБутстреп і перестановочні тести: " + (", ".join(map(str, done)) or "немає") +
+                "; пропущено — " + "; ".join(f"{col} ({why})" for col, why in skipped) + ".")
+    QMessageBox.information(None, "Аналіз завершено", msg)
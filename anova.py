@@ -0,0 +1,337 @@
+"""
+Дисперсійний аналіз за ролями стовпців з data_input.infer_roles:
+  - одно-, дво- і трифакторний ANOVA з попередньо обчислених сум по комірках
+  - ANOVA з повторними вимірюваннями (subject × перший фактор)
+  - Краскела–Волліса (group_for_np) і Фрідмана (subject × group_for_np)
+  - post-hoc: Тьюкі HSD та НІР₀₅ (LSD) для головних ефектів
+  - таблиця середніх "means", яку використовують графіки (charts.py)
+  - за запитом — бутстреп і перестановочні тести за group_for_np (resampling.py)
+
+Групування (коди рівнів, суми по комірках) обчислюється один раз у Design;
+суми для будь-якого ефекту отримуються агрегуванням сум комірок, без
+повторної підгонки моделі. Суми квадратів — класичні для збалансованих
+дослідів; для незбалансованих — тип II з моделі середніх комірок (ті самі
+суми по комірках), ступені вільності — ранг оцінюваних контрастів ефекту.
+"""
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from data_input import infer_roles
+from resampling import resampling_tests
+
+MAX_FACTORS = 3
+
+
+class Design:
+    """Закодовані рівні факторів і суми по комірках для одного показника."""
+
+    def __init__(self, df: pd.DataFrame, response, factors, subject=None):
+        self.response = response
+        self.factors = list(factors)[:MAX_FACTORS]
+        self.subject = subject
+        cols = [response] + self.factors + ([subject] if subject is not None else [])
+        y = df[response].to_numpy(dtype=np.float64, na_value=np.nan)
+        keep = ~np.isnan(y)
+        for f in cols[1:]:
+            keep &= df[f].notna().to_numpy()
+        self.y = y[keep]
+        self.N = len(self.y)
+
+        self.codes, self.levels = [], []
+        for f in self.factors:
+            codes, levels = pd.factorize(df[f].to_numpy()[keep], sort=True)
+            self.codes.append(codes)
+            self.levels.append(list(levels))
+        if subject is not None:
+            self.subject_codes, self.subject_levels = pd.factorize(df[subject].to_numpy()[keep], sort=True)
+        else:
+            self.subject_codes, self.subject_levels = None, []
+
+        # комірка — комбінація рівнів усіх факторів (змішана система числення)
+        self.shape = tuple(len(lv) for lv in self.levels)
+        cell = np.zeros(self.N, dtype=np.int64)
+        for codes, k in zip(self.codes, self.shape):
+            cell = cell * k + codes
+        size = int(np.prod(self.shape)) if self.shape else 1
+        self.cell = cell
+        self.cell_n = np.bincount(cell, minlength=size).reshape(self.shape or (1,))
+        self.cell_sum = np.bincount(cell, weights=self.y, minlength=size).reshape(self.shape or (1,))
+        self.sum_sq = float(np.sum(self.y ** 2))
+        self.total = float(np.sum(self.y))
+        filled = self.cell_n[self.cell_n > 0]
+        self.balanced = bool(filled.size == self.cell_n.size and np.all(filled == filled[0]))
+
+    def margin(self, effect: tuple):
+        """(n, сума) для комбінацій рівнів факторів effect — агрегування сум комірок."""
+        other = tuple(i for i in range(len(self.factors)) if i not in effect)
+        return self.cell_n.sum(axis=other), self.cell_sum.sum(axis=other)
+
+    def _q(self, effect: tuple) -> float:
+        n, s = self.margin(effect)
+        m = n > 0
+        return float(np.sum(s[m] ** 2 / n[m]))
+
+
+def _type2(d: Design, effects: list) -> list:
+    """
+    [(SS, df)] типу II для effects: модель — зважена регресія середніх комірок
+    (ваги — cell_n), тож потрібні лише cell_n і cell_sum. SS ефекту — приріст
+    пояснених сум від додавання ефекту до моделі з усіма ефектами, що його не
+    містять; df — приріст рангу (оцінювані контрасти, з урахуванням порожніх комірок).
+    """
+    flat = np.flatnonzero(d.cell_n.ravel() > 0)
+    n = d.cell_n.ravel()[flat].astype(np.float64)
+    w = np.sqrt(n)
+    yw = d.cell_sum.ravel()[flat] / n * w
+    levels = np.unravel_index(flat, d.shape)
+
+    def columns(e):
+        # індикатори комбінацій рівнів факторів e
+        code = np.zeros(len(flat), dtype=np.int64)
+        for i in e:
+            code = code * d.shape[i] + levels[i]
+        return np.eye(int(np.prod([d.shape[i] for i in e])))[code]
+
+    cols = {e: columns(e) * w[:, None] for e in effects}
+
+    def fit(terms):
+        X = np.column_stack([w] + [cols[t] for t in terms])
+        b, _, rank, _ = np.linalg.lstsq(X, yw, rcond=None)
+        fitted = X @ b
+        return float(fitted @ fitted), rank
+
+    out = []
+    for e in effects:
+        base = [t for t in effects if not set(e) <= set(t)]
+        ss0, r0 = fit(base)
+        ss1, r1 = fit(base + [e])
+        df_e = int(r1 - r0)
+        out.append((max(ss1 - ss0, 0.0), df_e) if df_e > 0 else (np.nan, 0))
+    return out
+
+
+def factorial_anova(d: Design) -> pd.DataFrame:
+    """
+    Таблиця ANOVA: усі головні ефекти та взаємодії (до трьох факторів).
+    Збалансований дослід — класичні SS із сум по комірках, інакше — тип II
+    (ss_type у результаті run_tests і в таблиці "design").
+    """
+    cf = d.total ** 2 / d.N
+    q = {(): cf}
+    k = len(d.factors)
+    effects = [e for r in range(1, k + 1) for e in combinations(range(k), r)]
+    for e in effects:
+        q[e] = d._q(e)
+    rows = []
+    if d.balanced:
+        for e in effects:
+            # SS ефекту — включення-виключення по всіх підмножинах
+            ss = sum((-1) ** (len(e) - len(sub)) * q[sub] for r in range(len(e) + 1) for sub in combinations(e, r))
+            df_e = int(np.prod([len(d.levels[i]) - 1 for i in e]))
+            rows.append([" × ".join(str(d.factors[i]) for i in e), ss, df_e])
+    else:
+        for e, (ss, df_e) in zip(effects, _type2(d, effects)):
+            rows.append([" × ".join(str(d.factors[i]) for i in e), ss, df_e])
+    n_cells = int(np.count_nonzero(d.cell_n))
+    ss_err = d.sum_sq - (q[tuple(range(k))] if k else cf)
+    df_err = d.N - n_cells
+    rows.append(["Залишок", ss_err, df_err])
+    rows.append(["Загальна", d.sum_sq - cf, d.N - 1])
+    table = pd.DataFrame(rows, columns=["source", "ss", "df"])
+    table["ms"] = table["ss"] / table["df"].where(table["df"] > 0)
+    mse = table["ms"].iloc[-2]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        table["F"] = table["ms"] / mse
+    table["p"] = stats.f.sf(table["F"], table["df"], df_err)
+    table.loc[table.index[-2:], ["F", "p"]] = np.nan
+    table.loc[table.index[-1], "ms"] = np.nan
+    return table
+
+
+def ss_type(d: Design) -> str:
+    """Тип сум квадратів, який використовує factorial_anova для d."""
+    return "класичні (збалансований)" if d.balanced else "II"
+
+
+def design_table(d: Design) -> pd.DataFrame:
+    """Опис плану для звіту: спостереження, комірки, збалансованість, тип SS."""
+    return pd.DataFrame({
+        "n": [d.N], "cells": [int(d.cell_n.size)], "empty_cells": [int(np.count_nonzero(d.cell_n == 0))],
+        "balanced": [d.balanced], "ss_type": [ss_type(d)],
+    })
+
+
+def rm_anova(d: Design) -> pd.DataFrame:
+    """
+    Однофакторний ANOVA з повторними вимірюваннями: subject × перший фактор.
+    Враховуються лише суб'єкти з усіма рівнями; повтори усереднюються.
+    """
+    if d.subject_codes is None or not d.factors:
+        return None
+    n_s, k = len(d.subject_levels), len(d.levels[0])
+    idx = d.subject_codes * k + d.codes[0]
+    cnt = np.bincount(idx, minlength=n_s * k).reshape(n_s, k)
+    tot = np.bincount(idx, weights=d.y, minlength=n_s * k).reshape(n_s, k)
+    complete = np.all(cnt > 0, axis=1)
+    n = int(complete.sum())
+    if n < 2 or k < 2:
+        return None
+    M = tot[complete] / cnt[complete]
+    grand = M.mean()
+    ss_total = float(np.sum((M - grand) ** 2))
+    ss_subj = k * float(np.sum((M.mean(axis=1) - grand) ** 2))
+    ss_cond = n * float(np.sum((M.mean(axis=0) - grand) ** 2))
+    ss_err = ss_total - ss_subj - ss_cond
+    df_cond, df_err = k - 1, (k - 1) * (n - 1)
+    F = (ss_cond / df_cond) / (ss_err / df_err) if ss_err > 0 else np.nan
+    return pd.DataFrame({
+        "source": [str(d.factors[0]), str(d.subject), "Залишок"],
+        "ss": [ss_cond, ss_subj, ss_err],
+        "df": [df_cond, n - 1, df_err],
+        "ms": [ss_cond / df_cond, ss_subj / (n - 1), ss_err / df_err],
+        "F": [F, np.nan, np.nan],
+        "p": [stats.f.sf(F, df_cond, df_err), np.nan, np.nan],
+    })
+
+
+def _tie_correction(counts: np.ndarray, N: int) -> float:
+    """Поправка на зв'язані ранги; counts — кількості однакових значень."""
+    t = counts[counts > 1].astype(float)
+    return 1.0 - np.sum(t ** 3 - t) / (N ** 3 - N) if N > 1 else 1.0
+
+
+def kruskal(d: Design, factor: int = 0) -> pd.DataFrame:
+    """Краскела–Волліса за рівнями одного фактора (коди з Design)."""
+    if not d.factors or d.N < 2:
+        return None
+    codes, k = d.codes[factor], len(d.levels[factor])
+    ranks = stats.rankdata(d.y)
+    n = np.bincount(codes, minlength=k)
+    r = np.bincount(codes, weights=ranks, minlength=k)
+    m = n > 0
+    if m.sum() < 2:
+        return None
+    N = d.N
+    H = 12.0 / (N * (N + 1)) * np.sum(r[m] ** 2 / n[m]) - 3 * (N + 1)
+    _, counts = np.unique(d.y, return_counts=True)
+    H /= _tie_correction(counts, N)
+    df_ = int(m.sum()) - 1
+    return pd.DataFrame({"factor": [str(d.factors[factor])], "H": [H], "df": [df_], "p": [stats.chi2.sf(H, df_)]})
+
+
+def friedman(d: Design, factor: int = 0) -> pd.DataFrame:
+    """Фрідмана: блоки — subject, обробки — рівні фактора (лише повні блоки)."""
+    if d.subject_codes is None or not d.factors:
+        return None
+    n_s, k = len(d.subject_levels), len(d.levels[factor])
+    idx = d.subject_codes * k + d.codes[factor]
+    cnt = np.bincount(idx, minlength=n_s * k).reshape(n_s, k)
+    tot = np.bincount(idx, weights=d.y, minlength=n_s * k).reshape(n_s, k)
+    complete = np.all(cnt > 0, axis=1)
+    n = int(complete.sum())
+    if n < 2 or k < 2:
+        return None
+    M = tot[complete] / cnt[complete]
+    R = stats.rankdata(M, axis=1)
+    Q = 12.0 / (n * k * (k + 1)) * np.sum(R.sum(axis=0) ** 2) - 3 * n * (k + 1)
+    # поправка на зв'язки в межах блоків: довжини серій однакових значень
+    S = np.sort(M, axis=1)
+    new = np.ones_like(S, dtype=bool)
+    new[:, 1:] = S[:, 1:] != S[:, :-1]
+    t = np.bincount(np.cumsum(new.ravel())).astype(float)
+    ties = np.sum(t ** 3 - t)
+    corr = 1 - ties / (n * k * (k * k - 1))
+    Q = Q / corr if corr > 0 else np.nan
+    return pd.DataFrame({"factor": [str(d.factors[factor])], "Q": [Q], "df": [k - 1], "p": [stats.chi2.sf(Q, k - 1)]})
+
+
+def means_table(d: Design) -> pd.DataFrame:
+    """Середні, SD і SE за рівнями кожного фактора (для графіків і звіту)."""
+    rows = []
+    if not d.factors:
+        sd = float(np.std(d.y, ddof=1)) if d.N > 1 else np.nan
+        rows.append([None, "Усі", d.N, d.total / d.N if d.N else np.nan, sd, sd / np.sqrt(d.N) if d.N else np.nan])
+    for i, f in enumerate(d.factors):
+        k = len(d.levels[i])
+        n = np.bincount(d.codes[i], minlength=k)
+        s = np.bincount(d.codes[i], weights=d.y, minlength=k)
+        s2 = np.bincount(d.codes[i], weights=d.y ** 2, minlength=k)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = s / n
+            sd = np.sqrt((s2 - n * mean ** 2) / (n - 1))
+            sem = sd / np.sqrt(n)
+        for j in range(k):
+            rows.append([f, d.levels[i][j], int(n[j]), mean[j], sd[j], sem[j]])
+    return pd.DataFrame(rows, columns=["factor", "level", "n", "mean", "sd", "sem"])
+
+
+def posthoc(d: Design, anova: pd.DataFrame, alpha: float = 0.05):
+    """
+    Тьюкі HSD і НІР₀₅ для головних ефектів; похибка — MS залишку з ANOVA.
+    Повертає (таблиця пар, таблиця НІР по факторах).
+    """
+    err = anova[anova["source"] == "Залишок"].iloc[0]
+    mse, df_err = err["ms"], int(err["df"])
+    if not (df_err > 0 and mse == mse):
+        return None, None
+    pairs, lsd_rows = [], []
+    t_crit = stats.t.ppf(1 - alpha / 2, df_err)
+    for i, f in enumerate(d.factors):
+        k = len(d.levels[i])
+        n, s = d.margin((i,))
+        m = n > 0
+        if m.sum() < 2:
+            continue
+        mean = np.where(m, s / np.where(m, n, 1), np.nan)
+        n_h = m.sum() / np.sum(1.0 / n[m])  # гармонічне середнє для незбалансованих
+        lsd = t_crit * np.sqrt(2 * mse / n_h)
+        lsd_rows.append([f, lsd, n_h])
+        a, b = np.triu_indices(k, 1)
+        ok = m[a] & m[b]
+        a, b = a[ok], b[ok]
+        diff = mean[a] - mean[b]
+        se = np.sqrt(mse / 2 * (1 / n[a] + 1 / n[b]))
+        q = np.abs(diff) / se
+        p = stats.studentized_range.sf(q, int(m.sum()), df_err)
+        for j in range(len(a)):
+            pairs.append([f, d.levels[i][a[j]], d.levels[i][b[j]], diff[j], q[j], p[j],
+                          bool(abs(diff[j]) > lsd)])
+    tukey = pd.DataFrame(pairs, columns=["factor", "level_a", "level_b", "diff", "q", "p_tukey", "lsd_significant"])
+    lsd = pd.DataFrame(lsd_rows, columns=["factor", f"lsd{int(round(alpha * 100)):02d}", "n"])
+    return tukey, lsd
+
+
+def run_tests(df: pd.DataFrame, response=None, roles: dict = None, alpha: float = 0.05,
+              resampling: dict = None) -> dict:
+    """
+    Усі тести для одного показника. roles — результат infer_roles (обчислюється,
+    якщо не передано); response за замовчуванням — roles["response"].
+    resampling — параметри resampling.resampling_tests (n_resamples, ci, seed);
+    якщо задано, додаються бутстреп і перестановочні тести.
+    """
+    roles = roles or infer_roles(df)
+    response = response if response is not None else roles["response"]
+    subject = roles.get("subject")
+    factors = [f for f in roles["factors"] if f not in (subject, response)]
+    group = roles.get("group_for_np")
+    if group in factors:
+        factors.remove(group)
+        factors.insert(0, group)
+    d = Design(df, response, factors, subject)
+
+    out = {"response": response, "factors": d.factors, "balanced": d.balanced, "n": d.N,
+           "ss_type": ss_type(d), "design": design_table(d), "means": means_table(d)}
+    if d.N < 2:
+        return out
+    anova = factorial_anova(d)
+    out["anova"] = anova
+    out["tukey"], out["lsd"] = posthoc(d, anova, alpha) if d.factors else (None, None)
+    out["rm_anova"] = rm_anova(d)
+    out["kruskal"] = kruskal(d)
+    out["friedman"] = friedman(d)
+    if resampling is not None:
+        out.update(resampling_tests(d, **resampling))
+    return out
@@ -0,0 +1,167 @@
+"""
+Пакетний аналіз без графічного інтерфейсу: по звіту Word на кожен файл.
+
+    python batch.py "дослід/*.csv" "дослід/*.xlsx" -o звіти --spec spec.json -j 8
+
+spec.json (усі ключі необов'язкові):
+    {
+      "roles": {"response": "Урожай", "factors": ["Сорт", "Добриво"], "subject": null},
+      "indicators": ["Урожай", "Маса"],
+      "tests": ["anova", "tukey", "means"],
+      "charts": {"box": true, "bar": true, "hist": false},
+      "max_raw_rows": 1000,
+      "resampling": {"n_resamples": 20000, "ci": 0.95, "seed": 1}
+    }
+roles доповнює/замінює результат infer_roles; tests — ключі analysis.TEST_TITLES;
+charts — вибір для charts.chart_specs; resampling — параметри бутстрепу і
+перестановочних тестів для ненормальних показників (analysis.RESAMPLING).
+
+Файли обробляються паралельно у пулі процесів; Qt не імпортується.
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from data_input import load_excel_or_csv, numeric_columns
+from analysis import analysis_plan, analyze_indicators, merge_results, build_report, non_normal_indicators
+from export_word import MAX_RAW_ROWS
+
+# бібліотеки BLAS у кожному процесі — в один потік, інакше процеси конкурують за ядра
+_BLAS_ENV = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+
+def plan_for(df, spec: dict):
+    """(показники, ролі) за infer_roles з поправками зі spec."""
+    indicators, roles = analysis_plan(df)
+    roles = {**roles, **spec.get("roles", {})}
+    if "roles" in spec and "group_for_np" not in spec["roles"]:
+        roles["group_for_np"] = roles["factors"][0] if roles["factors"] else None
+    if "indicators" in spec:
+        indicators = list(spec["indicators"])
+    elif "roles" in spec:
+        skip = set(roles["factors"]) | {roles["subject"]}
+        indicators = [c for c in numeric_columns(df) if c == roles["response"] or c not in skip]
+    used = indicators + roles["factors"] + [roles["subject"], roles["group_for_np"]]
+    missing = [c for c in used if c is not None and c not in df.columns]
+    if missing:
+        raise ValueError("У файлі немає стовпців: " + ", ".join(map(str, dict.fromkeys(missing))))
+    return indicators, roles
+
+
+def process_file(path: str, report: str, spec: dict) -> dict:
+    """Аналіз одного файлу і звіт у report. Виконується у робочому процесі."""
+    t0 = time.perf_counter()
+    out = {"file": path, "report": report}
+    try:
+        df = load_excel_or_csv(path)
+        indicators, roles = plan_for(df, spec)
+        if not indicators:
+            raise ValueError("У файлі немає числових показників.")
+        results = merge_results([analyze_indicators(None, df, indicators, roles, spec.get("resampling"))])
+        build_report(None, df, results, indicators, report, spec.get("charts"), spec.get("tests"),
+                     parallel=False, max_raw_rows=spec.get("max_raw_rows", MAX_RAW_ROWS))
+        out.update(rows=len(df), indicators=indicators, non_normal=non_normal_indicators(results["describe"]))
+    except Exception as e:
+        out["error"] = f"{type(e).__name__}: {e}"
+        out["traceback"] = traceback.format_exc()
+    out["seconds"] = round(time.perf_counter() - t0, 3)
+    return out
+
+
+def expand(patterns) -> list:
+    files = []
+    for pattern in patterns:
+        files += sorted(glob.glob(pattern, recursive=True))
+    return list(dict.fromkeys(f for f in files if f.lower().endswith((".csv", ".xlsx", ".xls"))))
+
+
+def report_paths(files, out_dir: str) -> list:
+    """Шляхи звітів: ім'я вихідного файлу, при збігу імен — з номером."""
+    seen, paths = {}, []
+    for f in files:
+        stem = os.path.splitext(os.path.basename(f))[0]
+        k = seen[stem] = seen.get(stem, 0) + 1
+        paths.append(os.path.join(out_dir, f"{stem}.docx" if k == 1 else f"{stem}_{k}.docx"))
+    return paths
+
+
+def run_batch(files, out_dir: str, spec: dict = None, workers: int = None, log=print) -> list:
+    """Обробляє files у пулі з workers процесів; повертає підсумки process_file у порядку files."""
+    spec = spec or {}
+    os.makedirs(out_dir, exist_ok=True)
+    reports = report_paths(files, out_dir)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(files)))
+    results = [None] * len(files)
+    if workers == 1:
+        for i, (f, r) in enumerate(zip(files, reports)):
+            results[i] = process_file(f, r, spec)
+            _log_result(log, i + 1, len(files), results[i])
+        return results
+    for name in _BLAS_ENV:
+        os.environ.setdefault(name, "1")
+    done = 0
+    try:
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = {pool.submit(process_file, f, r, spec): i for i, (f, r) in enumerate(zip(files, reports))}
+            for fut in as_completed(futures):
+                i = futures[fut]
+                results[i] = fut.result()
+                done += 1
+                _log_result(log, done, len(files), results[i])
+    except (BrokenProcessPool, OSError):
+        if not getattr(sys, "frozen", False):
+            raise
+        # зібраний exe без робочих процесів — решта файлів послідовно
+        for i, (f, r) in enumerate(zip(files, reports)):
+            if results[i] is None:
+                results[i] = process_file(f, r, spec)
+                done += 1
+                _log_result(log, done, len(files), results[i])
+    return results
+
+
+def _log_result(log, done, total, res):
+    if "error" in res:
+        log(f"[{done}/{total}] ПОМИЛКА {res['file']}: {res['error']}")
+    else:
+        log(f"[{done}/{total}] {res['file']} -> {res['report']} ({res['seconds']} с)")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="batch.py", description="SAD: пакетний аналіз файлів без інтерфейсу")
+    parser.add_argument("patterns", nargs="+", help="файли або шаблони (*.csv, **/*.xlsx)")
+    parser.add_argument("-o", "--out", default="reports", help="тека для звітів (типово: reports)")
+    parser.add_argument("-s", "--spec", help="JSON-файл зі специфікацією аналізу")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="кількість процесів (типово: ядра)")
+    parser.add_argument("--summary", help="записати підсумок у JSON-файл")
+    args = parser.parse_args(argv)
+
+    spec = {}
+    if args.spec:
+        with open(args.spec, encoding="utf-8") as f:
+            spec = json.load(f)
+    files = expand(args.patterns)
+    if not files:
+        print("Файлів не знайдено.", file=sys.stderr)
+        return 2
+
+    t0 = time.perf_counter()
+    results = run_batch(files, args.out, spec, args.workers)
+    failed = [r for r in results if "error" in r]
+    print(f"Готово: {len(results) - len(failed)} з {len(results)} за {time.perf_counter() - t0:.1f} с")
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Порівняння старої таблиці (QTableWidget, об'єкт на комірку) і нової
+(TableWidget над ColumnStore): пам'ять після заповнення і затримка прокрутки.
+
+    python benchmarks/bench_grid.py --rows 100000 --cols 20
+
+Кожна реалізація вимірюється в окремому процесі, щоб RSS не змішувались;
+затримка прокрутки — найкраща медіана з --runs процесів по --repeat проходів
+(на віртуальних машинах окремі запуски відрізняються в рази).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def rss_mb() -> float:
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def make_frame(rows, cols):
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(0)
+    data = {f"x{j}": rng.normal(50, 10, rows).round(2) for j in range(cols - 1)}
+    data["Сорт"] = rng.choice(["A", "B", "C", "D"], rows)
+    return pd.DataFrame(data)
+
+
+def measure(impl, rows, cols, steps, repeat=1):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication, QTableWidget, QTableWidgetItem
+    app = QApplication(sys.argv)
+    df = make_frame(rows, cols)
+    base = rss_mb()
+    t0 = time.perf_counter()
+    if impl == "widget":
+        w = QTableWidget(rows, cols)
+        for i in range(rows):
+            for j in range(cols):
+                w.setItem(i, j, QTableWidgetItem(str(df.iat[i, j])))
+    else:
+        from main import TableWidget
+        from data_input import df_to_table
+        w = TableWidget(1, 1)
+        df_to_table(w, df)
+    fill_s = time.perf_counter() - t0
+    del df
+    mem = rss_mb() - base
+
+    w.resize(1100, 650)
+    w.show()
+    app.processEvents()
+    bar = w.verticalScrollBar()
+    passes = []
+    for _ in range(repeat):
+        lat = []
+        for k in range(steps):
+            bar.setValue(bar.maximum() * k // max(1, steps - 1))
+            t = time.perf_counter()
+            w.viewport().repaint()
+            lat.append((time.perf_counter() - t) * 1000)
+        lat.sort()
+        passes.append(lat)
+    # найкращий прохід за медіаною: окремі проходи на завантаженій машині шумлять
+    lat = min(passes, key=lambda p: p[len(p) // 2])
+    return {"impl": impl, "rows": rows, "cols": cols, "fill_s": round(fill_s, 3),
+            "mem_mb": round(mem, 1), "scroll_ms_median": round(lat[len(lat) // 2], 2),
+            "scroll_ms_p95": round(lat[int(len(lat) * 0.95)], 2)}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--cols", type=int, default=20)
+    ap.add_argument("--steps", type=int, default=200)
+    ap.add_argument("--repeat", type=int, default=5, help="проходів прокрутки (береться найкращий)")
+    ap.add_argument("--runs", type=int, default=3, help="окремих процесів на реалізацію (береться найкращий)")
+    ap.add_argument("--impl", choices=["widget", "model"])
+    args = ap.parse_args()
+    if args.impl:
+        print(json.dumps(measure(args.impl, args.rows, args.cols, args.steps, args.repeat)))
+        return
+    for impl in ("widget", "model"):
+        runs = []
+        for _ in range(args.runs):
+            out = subprocess.run([sys.executable, __file__, "--impl", impl, "--rows", str(args.rows),
+                                  "--cols", str(args.cols), "--steps", str(args.steps), "--repeat", str(args.repeat)],
+                                 capture_output=True, text=True, check=True)
+            runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+        print(json.dumps(min(runs, key=lambda r: r["scroll_ms_median"])))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Швидкість розбору чисел (number_parser.parse_numbers) на великому стовпці рядків
+у кількох форматах, порівняно з поштучним float() у try/except і pd.to_numeric.
+
+    python benchmarks/bench_parse.py --cells 10000000
+    python benchmarks/bench_parse.py --cells 1000000 --layouts comma unique
+
+Формати:
+  dot       "12.34"            — звичайна десяткова крапка
+  comma     "12,34"            — десяткова кома
+  thousands "1 234,56"         — роздільник тисяч і кома
+  percent   "12,5 %"           — відсотки
+  blanks    "12,34", "", " ", "н/д" — порожні і нерозібрані комірки
+  unique    "12345,678901"     — усі значення різні (найгірший випадок)
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+LAYOUTS = ("dot", "comma", "thousands", "percent", "blanks", "unique")
+
+
+def make_cells(layout: str, n: int, seed: int = 0) -> np.ndarray:
+    """object-масив з n рядків; значення з пулу (вимірювання повторюються, як у реальних даних)."""
+    rng = np.random.default_rng(seed)
+    if layout == "unique":
+        vals = rng.random(n) * 1e5
+        return np.array([f"{v:.6f}".replace(".", ",") for v in vals.tolist()], dtype=object)
+    pool = np.round(rng.normal(50, 15, 20_000), 2)
+    if layout == "dot":
+        texts = [f"{v:.2f}" for v in pool]
+    elif layout == "comma":
+        texts = [f"{v:.2f}".replace(".", ",") for v in pool]
+    elif layout == "thousands":
+        texts = [f"{v * 100:,.2f}".replace(",", " ").replace(".", ",") for v in pool]
+    elif layout == "percent":
+        texts = [f"{v:.1f} %".replace(".", ",") for v in pool]
+    else:
+        texts = [f"{v:.2f}".replace(".", ",") for v in pool] + ["", " ", "н/д"] * 500
+    texts = np.array(texts, dtype=object)
+    return texts[rng.integers(0, len(texts), n)]
+
+
+def float_loop(cells) -> int:
+    """Старий спосіб: float() у try/except на кожну комірку; повертає кількість NaN."""
+    bad = 0
+    for c in cells:
+        try:
+            float(c)
+        except (TypeError, ValueError):
+            bad += 1
+    return bad
+
+
+def measure(layout: str, n: int, baseline_cells: int) -> dict:
+    import pandas as pd
+    from number_parser import parse_numbers
+    cells = make_cells(layout, n)
+    t = time.perf_counter()
+    nums, bad = parse_numbers(cells)
+    parse_s = time.perf_counter() - t
+    res = {"layout": layout, "cells": n, "uniques": int(len(pd.unique(cells[:1_000_000]))) if n else 0,
+           "parse_s": round(parse_s, 3), "mcells_per_s": round(n / parse_s / 1e6, 2) if parse_s else None,
+           "bad": int(bad.sum()), "nan": int(np.isnan(nums).sum()), "sample": cells[0], "value": float(nums[0])}
+    # базові способи — на частині комірок, з перерахунком на n
+    part = cells[:baseline_cells]
+    scale = n / max(len(part), 1)
+    t = time.perf_counter()
+    float_loop(part)
+    res["float_loop_s"] = round((time.perf_counter() - t) * scale, 3)
+    t = time.perf_counter()
+    pd.to_numeric(pd.Series(part), errors="coerce")
+    res["to_numeric_s"] = round((time.perf_counter() - t) * scale, 3)
+    return res
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--cells", type=int, default=10_000_000)
+    ap.add_argument("--layouts", nargs="+", choices=LAYOUTS, default=list(LAYOUTS))
+    ap.add_argument("--baseline-cells", type=int, default=1_000_000,
+                    help="на скількох комірках вимірювати float()/to_numeric (час перераховується на --cells)")
+    args = ap.parse_args()
+    for layout in args.layouts:
+        print(json.dumps(measure(layout, args.cells, args.baseline_cells), ensure_ascii=False), flush=True)
+
+
+if __name__ == "__main__":
+    main()
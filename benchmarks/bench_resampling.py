@@ -0,0 +1,67 @@
+"""
+Швидкість бутстрепу і перестановочних тестів (resampling.py) на однофакторному
+досліді з ненормальним (експоненційним) розподілом.
+
+    python benchmarks/bench_resampling.py
+    python benchmarks/bench_resampling.py --groups 12 48 --per-group 10 --resamples 100000 --workers 1 4
+
+Виводить час bootstrap і permutation_test для кожної комбінації та перевіряє,
+що результат із тим самим seed не залежить від кількості потоків.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def make_design(groups: int, per_group: int, seed: int = 0):
+    from anova import Design
+    rng = np.random.default_rng(seed)
+    g = np.repeat([f"В{i + 1:02d}" for i in range(groups)], per_group)
+    y = rng.exponential(1.0, len(g)) + np.repeat(rng.normal(0, 0.3, groups), per_group)
+    return Design(pd.DataFrame({"Варіант": g, "Урожай": y}), "Урожай", ["Варіант"])
+
+
+def measure(groups: int, per_group: int, resamples: int, workers: int) -> dict:
+    from resampling import bootstrap, permutation_test
+    d = make_design(groups, per_group)
+    res = {"groups": groups, "per_group": per_group, "resamples": resamples, "workers": workers}
+    t = time.perf_counter()
+    means, diffs = bootstrap(d, n_resamples=resamples, seed=1, workers=workers)
+    res["bootstrap_s"] = round(time.perf_counter() - t, 3)
+    t = time.perf_counter()
+    global_, pairs = permutation_test(d, n_resamples=resamples, seed=1, workers=workers)
+    res["permutation_s"] = round(time.perf_counter() - t, 3)
+    res["pairs"] = len(pairs)
+    res["p"] = float(global_["p"].iloc[0])
+    res["digest"] = round(float(means["ci_low"].sum() + diffs["ci_high"].sum() + pairs["p_adj"].sum()), 10)
+    return res
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--groups", type=int, nargs="+", default=[12, 36])
+    ap.add_argument("--per-group", type=int, default=8)
+    ap.add_argument("--resamples", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    args = ap.parse_args()
+    for groups in args.groups:
+        for resamples in args.resamples:
+            digests = set()
+            for workers in dict.fromkeys(args.workers):
+                res = measure(groups, args.per_group, resamples, workers)
+                digests.add(res.pop("digest"))
+                print(json.dumps(res, ensure_ascii=False), flush=True)
+            if len(digests) > 1:
+                print(f"УВАГА: результат залежить від кількості потоків ({groups} груп, {resamples} повторів)")
+
+
+if __name__ == "__main__":
+    main()
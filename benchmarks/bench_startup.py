@@ -0,0 +1,70 @@
+"""
+Час холодного старту: від запуску інтерпретатора до показаного MainWindow
+і які важкі модулі на той момент уже завантажені.
+
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --eager     # для порівняння: модулі аналізу імпортуються до вікна
+
+Кожен запуск — окремий процес (холодний імпорт); фоновий warm_up вимкнено,
+щоб він не впливав на вимірювання.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("pandas", "scipy", "matplotlib", "seaborn", "docx")
+
+CHILD = r"""
+import sys, time, json
+t0 = time.perf_counter()
+sys.path.insert(0, {root!r})
+if {eager}:
+    import analysis
+from PyQt5.QtWidgets import QApplication
+app = QApplication(sys.argv)
+import main
+t_import = time.perf_counter()
+w = main.MainWindow()
+w.show()
+app.processEvents()
+t_shown = time.perf_counter()
+print(json.dumps({{"wall_end": time.time(), "import_s": t_import - t0, "shown_s": t_shown - t0,
+                  "heavy_loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def run_once(eager: bool) -> dict:
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"), SAD_NO_WARMUP="1")
+    code = CHILD.format(root=ROOT, eager=eager, heavy=HEAVY)
+    start = time.time()
+    out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    res = json.loads(out.stdout.strip().splitlines()[-1])
+    res["first_window_s"] = res.pop("wall_end") - start
+    return res
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--eager", action="store_true", help="імпортувати analysis до створення вікна")
+    ap.add_argument("--json", action="store_true", help="вивести результат у JSON")
+    args = ap.parse_args()
+
+    runs = [run_once(args.eager) for _ in range(args.runs)]
+    med = lambda key: round(sorted(r[key] for r in runs)[len(runs) // 2], 3)
+    summary = {"mode": "eager" if args.eager else "lazy", "runs": args.runs,
+               "first_window_s": med("first_window_s"), "in_process_shown_s": med("shown_s"),
+               "import_s": med("import_s"), "heavy_loaded": runs[-1]["heavy_loaded"]}
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False))
+    else:
+        for k, v in summary.items():
+            print(f"{k:>20}: {v}")
+
+
+if __name__ == "__main__":
+    main()
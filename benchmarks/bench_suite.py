@@ -0,0 +1,283 @@
+"""
+Вимірювання повільних етапів на синтетичних дослідах: імпорт, аналіз, графіки, звіт.
+
+    python benchmarks/bench_suite.py --sizes 1000 10000 -o bench.json
+    python benchmarks/bench_suite.py --repeat 3 --save-baseline baseline.json
+    python benchmarks/bench_suite.py --repeat 3 --compare baseline.json     # код 1 при регресії
+
+База залежить від машини, тому в репозиторії не зберігається; для порівняння
+краще --repeat 3 (мінімум із повторів менш шумний).
+
+Макети (make_dataset):
+  oneway     Сорт (6 рівнів) і три показники
+  factorial  Сорт × Добриво × Повторення (4 × 3 × 4) і три показники
+  rm         Subject × Час (4 заміри) — повторні вимірювання
+  locale     як oneway, але CSV з ';' і десятковою комою (розбір number_parser)
+
+Етапи:
+  load        data_input.load_excel_or_csv (з --xlsx ще load_xlsx для розмірів ≤ XLSX_MAX_ROWS)
+  import      data_input.read_chunks у ColumnStore (як фоновий імпорт у вікні)
+  to_table    data_input.df_to_table у TableWidget
+  from_table  data_input.df_from_table
+  analysis    analysis_plan + analyze_indicators (обчислювальна частина run_analysis)
+  charts      render_charts: оглядовий графік і графіки кожного показника
+  export      export_to_word
+
+Кожен набір вимірюється в окремому процесі (Qt — offscreen, без warm_up).
+Час етапу — мінімум з --repeat повторів. Пік пам'яті — VmHWM процесу під час
+етапу (лічильник скидається через /proc/self/clear_refs); де це недоступно —
+пік tracemalloc в окремому невимірюваному повторі.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+LAYOUTS = ("oneway", "factorial", "rm", "locale")
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+XLSX_MAX_ROWS = 100_000
+# регресія — повільніше за базу більш ніж у (1 + tolerance) раза і більш ніж на стільки
+MIN_SECONDS = 0.05
+MIN_MB = 20.0
+
+
+def make_dataset(layout: str, rows: int, seed: int = 0):
+    """Синтетичний дослід: фактори з ефектами рівнів і нормальний шум."""
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    if layout == "rm":
+        times = np.array(["T1", "T2", "T3", "T4"])
+        subj = np.arange(rows) // len(times)
+        t = np.arange(rows) % len(times)
+        base = rng.normal(50, 8, subj[-1] + 1)[subj]
+        return pd.DataFrame({"Subject": [f"S{i:07d}" for i in subj], "Час": times[t],
+                             "Показник": (base + 2.5 * t + rng.normal(0, 3, rows)).round(2)})
+    if layout == "factorial":
+        sort = rng.integers(0, 4, rows)
+        fert = rng.integers(0, 3, rows)
+        data = {"Сорт": np.array(["Сорт A", "Сорт B", "Сорт C", "Сорт D"])[sort],
+                "Добриво": np.array(["N0", "N60", "N120"])[fert],
+                "Повторення": rng.integers(1, 5, rows)}
+        effect = 3.0 * sort + 4.0 * fert + 0.5 * sort * fert
+    else:
+        sort = rng.integers(0, 6, rows)
+        data = {"Сорт": np.array([f"Сорт {k}" for k in "ABCDEF"])[sort]}
+        effect = 2.0 * sort
+    data["Урожай"] = (40 + effect + rng.normal(0, 4, rows)).round(2)
+    data["Маса"] = (300 + 5 * effect + rng.normal(0, 25, rows)).round(1)
+    data["Висота"] = (90 + rng.normal(0, 10, rows)).round(1)
+    return pd.DataFrame(data)
+
+
+def write_dataset(df, layout: str, folder: str) -> str:
+    path = os.path.join(folder, f"{layout}.csv")
+    if layout == "locale":
+        df.to_csv(path, sep=";", decimal=",", index=False)
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+
+# ---- вимірювання в дочірньому процесі ----
+def _status_mb(field: str) -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def _reset_peak() -> bool:
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _measure(fn, repeat: int):
+    """(результат fn, секунди, пік МБ, приріст МБ відносно RSS до етапу)."""
+    best = peak = delta = float("-inf")
+    hwm = False
+    for _ in range(repeat):
+        gc.collect()
+        hwm = _reset_peak()
+        before = _status_mb("VmRSS") if hwm else 0.0
+        t = time.perf_counter()
+        out = fn()
+        seconds = time.perf_counter() - t
+        best = seconds if best < 0 else min(best, seconds)
+        if hwm:
+            top = _status_mb("VmHWM")
+            peak, delta = max(peak, top), max(delta, top - before)
+    if not hwm:
+        import tracemalloc
+        tracemalloc.start()
+        fn()
+        delta = peak = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return out, best, peak, delta
+
+
+def run_dataset(layout: str, rows: int, repeat: int, xlsx: bool, parallel: bool) -> list:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+    from data_input import load_excel_or_csv, read_chunks, df_to_table, df_from_table
+    from column_store import ColumnStore
+    from analysis import analysis_plan, analyze_indicators, merge_results, report_tables
+    from charts import chart_specs, overview_spec, render_charts, clear_image_cache
+    from export_word import export_to_word
+    from main import TableWidget
+
+    records = []
+
+    def stage(name, fn):
+        out, seconds, peak, delta = _measure(fn, repeat)
+        records.append({"layout": layout, "rows": rows, "stage": name, "seconds": round(seconds, 4),
+                        "peak_mb": round(peak, 1), "delta_mb": round(delta, 1)})
+        return out
+
+    def import_chunks(path):
+        store = ColumnStore()
+        for chunk, _ in read_chunks(path):
+            store.append_frame(chunk)
+        return store
+
+    def analyse(df):
+        indicators, roles = analysis_plan(df)
+        return indicators, merge_results([analyze_indicators(None, df, indicators, roles)])
+
+    def charts(df, indicators, results):
+        specs = [overview_spec(df, indicators)]
+        for col in indicators:
+            res = results["tests"].get(col) or {}
+            specs += chart_specs(df, col, res.get("factors") or [], res, {"box": True, "bar": True})
+        clear_image_cache()   # вимірюється малювання, а не кеш повторів
+        return render_charts(specs, parallel)
+
+    with tempfile.TemporaryDirectory() as folder:
+        source = make_dataset(layout, rows)
+        path = write_dataset(source, layout, folder)
+        stage("load", lambda: load_excel_or_csv(path))
+        if xlsx and rows <= XLSX_MAX_ROWS and layout != "locale":
+            xlsx_path = os.path.join(folder, f"{layout}.xlsx")
+            source.to_excel(xlsx_path, index=False)
+            stage("load_xlsx", lambda: load_excel_or_csv(xlsx_path))
+        del source
+        stage("import", lambda: import_chunks(path))
+        table = TableWidget(1, 1)
+        df = load_excel_or_csv(path)
+        stage("to_table", lambda: df_to_table(table, df))
+        del df
+        df = stage("from_table", lambda: df_from_table(table))
+        indicators, results = stage("analysis", lambda: analyse(df))
+        images = stage("charts", lambda: charts(df, indicators, results))
+        report = os.path.join(folder, "report.docx")
+        stage("export", lambda: export_to_word(df, "Результати аналізу", "од.", report_tables(results),
+                                               images, report))
+    app.processEvents()
+    return records
+
+
+# ---- батьківський процес: запуск наборів, база, порівняння ----
+def meta() -> dict:
+    import numpy as np
+    import pandas as pd
+    return {"python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+            "platform": platform.platform(), "cpus": os.cpu_count(), "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def run_suite(layouts, sizes, repeat: int, xlsx: bool, parallel: bool, log=print) -> list:
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"), SAD_NO_WARMUP="1")
+    records = []
+    for rows in sizes:
+        for layout in layouts:
+            cmd = [sys.executable, os.path.abspath(__file__), "--child", layout, str(rows), "--repeat", str(repeat)]
+            cmd += ["--xlsx"] if xlsx else []
+            cmd += ["--parallel"] if parallel else []
+            t = time.perf_counter()
+            out = subprocess.run(cmd, env=env, capture_output=True, text=True)
+            if out.returncode != 0:
+                log(f"{layout} × {rows}: ПОМИЛКА\n{out.stderr.strip()}")
+                records.append({"layout": layout, "rows": rows, "stage": "error", "error": out.stderr.strip()[-2000:]})
+                continue
+            part = json.loads(out.stdout.strip().splitlines()[-1])
+            records += part
+            log(f"{layout} × {rows}: " + ", ".join(f"{r['stage']} {r['seconds']:.3g} с" for r in part)
+                + f" ({time.perf_counter() - t:.0f} с)")
+    return records
+
+
+def compare(records: list, baseline: list, tolerance: float) -> list:
+    """Рядки порівняння з базою; regression=True — повільніше або більше пам'яті понад допуск."""
+    base = {(r["layout"], r["rows"], r["stage"]): r for r in baseline if "seconds" in r}
+    rows = []
+    for r in records:
+        b = base.get((r["layout"], r["rows"], r["stage"]))
+        if b is None or "seconds" not in r:
+            continue
+        ratio = r["seconds"] / b["seconds"] if b["seconds"] else float("inf")
+        slower = ratio > 1 + tolerance and r["seconds"] - b["seconds"] > MIN_SECONDS
+        mem = r["delta_mb"] - b["delta_mb"]
+        bigger = mem > MIN_MB and r["delta_mb"] > (1 + tolerance) * max(b["delta_mb"], 0.0)
+        rows.append({**r, "base_seconds": b["seconds"], "ratio": round(ratio, 3),
+                     "base_delta_mb": b["delta_mb"], "regression": slower or bigger})
+    return rows
+
+
+def print_comparison(rows: list):
+    print(f"{'набір':<22}{'етап':<12}{'база, с':>10}{'зараз, с':>10}{'×':>8}{'Δ пам., МБ':>12}")
+    for r in rows:
+        flag = "  <-- регресія" if r["regression"] else ""
+        print(f"{r['layout'] + ' × ' + str(r['rows']):<22}{r['stage']:<12}{r['base_seconds']:>10.3f}"
+              f"{r['seconds']:>10.3f}{r['ratio']:>8.2f}{r['delta_mb'] - r['base_delta_mb']:>12.1f}{flag}")
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="SAD: вимірювання імпорту, аналізу, графіків і звіту")
+    ap.add_argument("--layouts", nargs="+", choices=LAYOUTS, default=list(LAYOUTS))
+    ap.add_argument("--sizes", nargs="+", type=int, default=list(SIZES))
+    ap.add_argument("--repeat", type=int, default=1)
+    ap.add_argument("--xlsx", action="store_true", help="також load_xlsx (розміри ≤ XLSX_MAX_ROWS)")
+    ap.add_argument("--parallel", action="store_true", help="графіки у пулі процесів")
+    ap.add_argument("-o", "--out", help="записати результати у JSON-файл")
+    ap.add_argument("--save-baseline", help="записати результати як базу")
+    ap.add_argument("--compare", help="порівняти з базою (JSON від --out/--save-baseline)")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="допуск регресії (типово 0.25 = +25%%)")
+    ap.add_argument("--child", nargs=2, metavar=("LAYOUT", "ROWS"), help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.child:
+        layout, rows = args.child[0], int(args.child[1])
+        print(json.dumps(run_dataset(layout, rows, args.repeat, args.xlsx, args.parallel), ensure_ascii=False))
+        return 0
+
+    records = run_suite(args.layouts, args.sizes, args.repeat, args.xlsx, args.parallel)
+    doc = {"meta": meta(), "results": records}
+    for path in filter(None, (args.out, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(doc, f, ensure_ascii=False, indent=1)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(records, baseline["results"], args.tolerance)
+        print_comparison(rows)
+        failed = [r for r in rows if r["regression"]]
+        print(f"Регресій: {len(failed)} з {len(rows)} (допуск +{args.tolerance:.0%})")
+        return 1 if failed or any(r["stage"] == "error" for r in records) else 0
+    return 1 if any(r["stage"] == "error" for r in records) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
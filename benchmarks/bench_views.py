@@ -0,0 +1,62 @@
+"""
+Швидкість подань рядків (row_views.py) на великій таблиці: перше обчислення
+(сортування стовпця, коди рівнів) і повторне перемикання між готовими поданнями.
+
+    python benchmarks/bench_views.py --rows 1000000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def make_specs(store) -> dict:
+    sort, year, crop = store.columns
+    return {
+        "sort": {"sort": (crop, False)},
+        "sort_desc": {"sort": (crop, True)},
+        "sort_text": {"sort": (sort, False)},
+        "group": {"group": sort},
+        "group_sort": {"group": sort, "sort": (crop, True)},
+        "filter": {"filter": {sort: {"values": ["Айдаред"]}, year: {"values": ["2023"]}}},
+        "filter_range": {"filter": {crop: {"min": 10, "max": 20}}, "sort": (crop, False)},
+    }
+
+
+def make_store(rows: int, seed: int = 0):
+    import pandas as pd
+    from column_store import ColumnStore
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Сорт": rng.choice(["Айдаред", "Голден", "Ренет", "Флорина", "Чемпіон"], rows),
+        "Рік": rng.choice([2021, 2022, 2023], rows),
+        "Урожай": np.round(rng.normal(15, 4, rows), 2),
+    })
+    return ColumnStore.from_frame(df)
+
+
+def main():
+    from row_views import view_rows, group_starts
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    args = ap.parse_args()
+    store = make_store(args.rows)
+    for name, spec in make_specs(store).items():
+        res = {"view": name, "rows": args.rows}
+        for key in ("first_s", "again_s"):
+            t = time.perf_counter()
+            rows = view_rows(store, spec)
+            group_starts(store, spec, rows)
+            res[key] = round(time.perf_counter() - t, 4)
+        res["shown"] = store.n_rows if rows is None else len(rows)
+        print(json.dumps(res, ensure_ascii=False), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Кеш результатів аналізу: ключ — хеші вмісту потрібних стовпців
+(ColumnStore.fingerprints) плюс параметри аналізу. LRU-витіснення
+з обмеженням на обсяг пам'яті; при редагуванні стовпця записи,
+що від нього залежать, видаляються одразу.
+"""
+import json
+import sys
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_MAX_BYTES = 256 * 2**20
+
+
+def _nbytes(obj) -> int:
+    """Наближений обсяг результату в пам'яті."""
+    if hasattr(obj, "memory_usage"):   # DataFrame / Series (pandas не імпортуємо заради isinstance)
+        usage = obj.memory_usage(deep=True)
+        return int(getattr(usage, "sum", lambda: usage)())
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(_nbytes(k) + _nbytes(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(_nbytes(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+def make_key(kind: str, fingerprints: dict, columns, params=None) -> tuple:
+    """Ключ кешу: вид результату, хеші стовпців columns і параметри (JSON)."""
+    cols = tuple((str(c), fingerprints.get(c)) for c in columns)
+    return kind, cols, json.dumps(params, sort_keys=True, default=str, ensure_ascii=False)
+
+
+class ResultCache:
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()   # key -> (value, size, columns)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value, columns=None):
+        """columns — назви стовпців, від яких залежить результат (для invalidate_columns)."""
+        if columns is None:
+            columns = [c for c, _ in key[1]]
+        size = _nbytes(value)
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.nbytes -= old[1]
+        self._entries[key] = (value, size, frozenset(map(str, columns)))
+        self.nbytes += size
+        while self.nbytes > self.max_bytes:
+            _, (_, s, _) = self._entries.popitem(last=False)
+            self.nbytes -= s
+
+    def invalidate_columns(self, names):
+        names = set(map(str, names))
+        for key in [k for k, (_, _, cols) in self._entries.items() if cols & names]:
+            self.nbytes -= self._entries.pop(key)[1]
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
@@ -1,100 +1,470 @@
+"""
+Графіки звіту. Кожен графік будується окремою функцією через об'єктний API
+matplotlib (Figure, без глобального стану pyplot) і повертається як PNG-байти
+в пам'яті — export_word вставляє їх без тимчасових файлів.
+
+Побудова розбита на два кроки: chart_specs() у поточному процесі готує
+легкі описи графіків (вид + лише потрібні дані), а render_charts() малює їх
+паралельно у пулі процесів (matplotlib тримає GIL, тож потоки не допомагають).
+Готові PNG кешуються за хешем опису: опис містить лише дані використаних
+стовпців, тож повторний звіт за незмінними даними графіків не перемальовує.
+"""
+import atexit
+import hashlib
+import io
+import multiprocessing
 import os
-import uuid
-import pandas as pd
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict
+from concurrent.futures.process import BrokenProcessPool
+
 import numpy as np
-import matplotlib
-matplotlib.use("Agg")  # без вікон при збірці
-import matplotlib.pyplot as plt
+import pandas as pd
+from matplotlib.figure import Figure
 import seaborn as sns
 
-def _tmp_png():
-    return os.path.join(os.getcwd(), f"chart_{uuid.uuid4().hex[:8]}.png")
+from profiling import timed
+
+DPI = 130
+# з цієї кількості точок графіки будуються з агрегатів, а не з сирих даних
+LARGE_N = 50_000
+HIST_BINS = 60
+KDE_GRID = 1024
+DENSITY_BINS = 150
+MAX_FLIERS = 500
+# менше графіків не варто віддавати в пул: запуск процесу дорожчий за малювання
+MIN_PARALLEL = 3
+
+_executor = None
+_executor_lock = threading.Lock()
+# у зібраному exe пул не запустився — далі графіки малюються послідовно
+_pool_broken = False
+
+# кеш готових PNG: хеш опису -> байти (LRU з обмеженням обсягу)
+IMAGE_CACHE_BYTES = 64 * 2**20
+_images = OrderedDict()
+_images_nbytes = 0
+_images_lock = threading.Lock()
+
+
+def _png(fig: Figure) -> bytes:
+    fig.tight_layout()
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=DPI)
+    return buf.getvalue()
+
+
+# ---- агрегати для великих даних: O(n) NumPy у поточному процесі, малювання — O(1) ----
+def binned_kde(values: np.ndarray, grid: int = KDE_GRID):
+    """
+    Гаусова KDE на рівномірній сітці: лінійне бінування + згортка через FFT.
+    Ширина вікна — правило Скотта (як у scipy.stats.gaussian_kde). Повертає (x, щільність).
+    """
+    n = len(values)
+    sd = values.std(ddof=1) if n > 1 else 0.0
+    if n < 2 or not sd > 0:
+        return np.array([]), np.array([])
+    h = sd * n ** (-1 / 5)
+    lo, hi = values.min() - 3 * h, values.max() + 3 * h
+    dx = (hi - lo) / (grid - 1)
+    pos = (values - lo) / dx
+    i = np.minimum(pos.astype(np.int64), grid - 2)
+    w = pos - i
+    counts = np.bincount(i, 1 - w, grid) + np.bincount(i + 1, w, grid)
+    m = min(grid - 1, int(np.ceil(4 * h / dx)))
+    kernel = np.exp(-0.5 * (np.arange(-m, m + 1) * dx / h) ** 2)
+    size = 1 << int(np.ceil(np.log2(grid + 2 * m + 1)))
+    dens = np.fft.irfft(np.fft.rfft(counts, size) * np.fft.rfft(kernel, size), size)[m:m + grid]
+    dens = np.maximum(dens, 0) / (n * h * np.sqrt(2 * np.pi))
+    return np.linspace(lo, hi, grid), dens
+
+
+def box_stats(values: np.ndarray, label) -> dict:
+    """
+    Статистики box-plot (формат Axes.bxp) за один прохід: квартилі, вуса
+    за 1.5·IQR і не більше MAX_FLIERS викидів (рівномірно за рангом).
+    """
+    v = values[~np.isnan(values)]
+    if not len(v):
+        return {"label": str(label), "med": np.nan, "q1": np.nan, "q3": np.nan,
+                "whislo": np.nan, "whishi": np.nan, "fliers": np.array([])}
+    q1, med, q3 = np.percentile(v, [25, 50, 75])
+    lo, hi = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+    inside = (v >= lo) & (v <= hi)
+    fliers = np.sort(v[~inside])
+    if len(fliers) > MAX_FLIERS:
+        fliers = fliers[np.linspace(0, len(fliers) - 1, MAX_FLIERS).astype(np.int64)]
+    return {"label": str(label), "med": med, "q1": q1, "q3": q3,
+            "whislo": v[inside].min(), "whishi": v[inside].max(), "fliers": fliers}
+
+
+class StreamingLinearFit:
+    """
+    МНК-пряма y = a·x + b за порціями даних: зберігаються лише n, середні
+    та центровані суми (злиття як у паралельному алгоритмі Велфорда),
+    тож пам'ять O(1), а точність не страждає від великих сум.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.mx = self.my = 0.0
+        self.sxx = self.sxy = 0.0
+
+    def update(self, x: np.ndarray, y: np.ndarray):
+        k = len(x)
+        if not k:
+            return
+        mx, my = x.mean(), y.mean()
+        dx, dy = x - mx, y - my
+        sxx, sxy = dx @ dx, dx @ dy
+        n = self.n + k
+        ddx, ddy = mx - self.mx, my - self.my
+        self.sxx += sxx + ddx * ddx * self.n * k / n
+        self.sxy += sxy + ddx * ddy * self.n * k / n
+        self.mx += ddx * k / n
+        self.my += ddy * k / n
+        self.n = n
+
+    def coef(self):
+        """(нахил, зсув)."""
+        a = self.sxy / self.sxx if self.sxx > 0 else 0.0
+        return a, self.my - a * self.mx
+
+
+def density_2d(x: np.ndarray, y: np.ndarray, bins: int = DENSITY_BINS):
+    """Рівномірна 2D-гістограма за один прохід (bincount замість сортування у histogram2d)."""
+    def edges_and_index(v):
+        lo, hi = v.min(), v.max()
+        if hi <= lo:
+            hi = lo + 1.0
+        idx = ((v - lo) * (bins / (hi - lo))).astype(np.int64)
+        return np.linspace(lo, hi, bins + 1), np.minimum(idx, bins - 1)
+    xe, ix = edges_and_index(x)
+    ye, iy = edges_and_index(y)
+    counts = np.bincount(ix * bins + iy, minlength=bins * bins).reshape(bins, bins)
+    return counts, xe, ye
+
+
+def fit_line(x: np.ndarray, y: np.ndarray, chunk: int = 1 << 20):
+    fit = StreamingLinearFit()
+    for i in range(0, len(x), chunk):
+        fit.update(x[i:i + chunk], y[i:i + chunk])
+    return fit.coef()
+
+
+# ---- окремі графіки: payload -> Figure ----
+def _hist(p):
+    fig = Figure()
+    ax = fig.add_subplot()
+    if "counts" in p:
+        edges, counts = p["edges"], p["counts"]
+        ax.stairs(counts, edges, fill=True, alpha=0.6, edgecolor="white")
+        # щільність -> кількість на бін, щоб крива лягла на гістограму
+        ax.plot(p["kde_x"], p["kde_y"] * counts.sum() * (edges[1] - edges[0]))
+    else:
+        sns.histplot(p["values"], kde=True, ax=ax)
+    ax.set_xlabel(p["y"])
+    ax.set_ylabel("Кількість")
+    ax.set_title("Розподіл значень")
+    return fig
+
+
+def _box(p):
+    fig = Figure()
+    ax = fig.add_subplot()
+    if "stats" in p:
+        ax.bxp(p["stats"])
+        ax.set_xlabel(p["x"])
+        ax.set_ylabel(p["y"])
+    else:
+        sns.boxplot(data=p["data"], x=p["x"], y=p["y"], ax=ax)
+    ax.set_title(f"Box-plot: {p['y']} за {p['x']}")
+    return fig
+
+
+def _box_all(p):
+    fig = Figure(figsize=(6, 4))
+    ax = fig.add_subplot()
+    if "stats" in p:
+        ax.bxp(p["stats"])
+    else:
+        sns.boxplot(data=p["data"], ax=ax)
+    ax.set_title("Розподіл даних")
+    return fig
+
+
+def _bar(p):
+    fig = Figure()
+    ax = fig.add_subplot()
+    if p["x"] is not None:
+        levels = [str(v) for v in p["levels"]]
+        ax.bar(levels, p["means"])
+        ax.errorbar(levels, p["means"], yerr=p["sem"], fmt="none")
+        ax.set_xlabel(p["x"])
+    else:
+        ax.bar(["Середнє"], p["means"])
+    ax.set_ylabel(p["y"])
+    ax.set_title("Середні значення ± SE")
+    return fig
+
+
+def _line(p):
+    fig = Figure()
+    ax = fig.add_subplot()
+    if "density" in p:
+        # забагато точок для scatter — густина у 2D-бінах
+        xe, ye = p["xedges"], p["yedges"]
+        d = np.ma.masked_equal(p["density"].T, 0)
+        mesh = ax.pcolormesh(xe, ye, d, cmap="viridis")
+        fig.colorbar(mesh, ax=ax, label="Кількість")
+        xlim = xe[0], xe[-1]
+    else:
+        ax.scatter(p["xvals"], p["yvals"])
+        xlim = p["xvals"].min(), p["xvals"].max()
+    coef = p["coef"]
+    xs = np.linspace(xlim[0], xlim[1], 100)
+    ax.plot(xs, coef[0] * xs + coef[1], color="C1")
+    ax.set_xlabel(p["x"])
+    ax.set_ylabel(p["y"])
+    ax.set_title(f"Лінія тренду: y={coef[0]:.3f}x+{coef[1]:.3f}")
+    return fig
+
+
+def _pie(p):
+    fig = Figure()
+    ax = fig.add_subplot()
+    ax.pie(p["counts"], labels=[str(v) for v in p["labels"]], autopct="%1.1f%%")
+    ax.set_title(f"Частки за {p['x']}")
+    return fig
+
+
+_BUILDERS = {"hist": _hist, "box": _box, "box_all": _box_all, "bar": _bar, "line": _line, "pie": _pie}
 
-def select_and_build_charts(df, y, factors, results, selection: dict):
-    imgs = []
+
+def render_chart(spec) -> bytes:
+    """spec = (вид, payload) -> PNG. Виконується і в робочих процесах пулу."""
+    kind, payload = spec
+    return _png(_BUILDERS[kind](payload))
+
+
+# ---- описи графіків ----
+def chart_specs(df, y, factors, results, selection: dict) -> list:
+    """
+    Описи графіків для показника y за вибором selection (hist, box, bar, line, pie).
+    Кожен опис містить лише ті дані, які потрібні для малювання.
+    """
+    specs = []
+    yvals = pd.to_numeric(df[y], errors="coerce")
+    large = len(df) > LARGE_N
 
     # гістограма/щільність за показником
     if selection.get("hist"):
-        path = _tmp_png()
-        plt.figure()
-        s = pd.to_numeric(df[y], errors="coerce").dropna()
-        sns.histplot(s, kde=True)
-        plt.xlabel(y)
-        plt.ylabel("Кількість")
-        plt.title("Розподіл значень")
-        plt.tight_layout()
-        plt.savefig(path, dpi=130)
-        plt.close()
-        imgs.append(path)
+        values = yvals.dropna().to_numpy()
+        if large:
+            counts, edges = np.histogram(values, bins=HIST_BINS)
+            kde_x, kde_y = binned_kde(values)
+            specs.append(("hist", {"y": y, "counts": counts, "edges": edges, "kde_x": kde_x, "kde_y": kde_y}))
+        else:
+            specs.append(("hist", {"y": y, "values": values}))
 
     # box-plot за першим фактором
     if selection.get("box") and factors:
-        path = _tmp_png()
-        plt.figure()
-        sns.boxplot(data=df, x=factors[0], y=y)
-        plt.title(f"Box-plot: {y} за {factors[0]}")
-        plt.tight_layout()
-        plt.savefig(path, dpi=130)
-        plt.close()
-        imgs.append(path)
-
-    # бар-чарт середніх ± SE
-    if selection.get("bar") and "means" in results:
-        means = results["means"].copy()
-        path = _tmp_png()
-        plt.figure()
-        # якщо кілька факторів — візьмемо перший
+        if large:
+            specs.append(("box", {"x": factors[0], "y": y, "stats": grouped_box_stats(yvals, df[factors[0]])}))
+        else:
+            specs.append(("box", {"x": factors[0], "y": y, "data": df[[factors[0], y]]}))
+
+    # бар-чарт середніх ± SE (таблиця середніх з anova.run_tests — без повторного групування)
+    if selection.get("bar") and results.get("means") is not None:
+        means = results["means"]
         if factors:
-            x = factors[0]
-            grp = df.groupby(x)[y].agg(["mean", "sem"]).reset_index()
-            plt.bar(grp[x].astype(str), grp["mean"])
-            # помилки SE
-            plt.errorbar(grp[x].astype(str), grp["mean"], yerr=grp["sem"], fmt="none")
-            plt.xlabel(x)
+            grp = means[means["factor"] == factors[0]]
+            specs.append(("bar", {"x": factors[0], "y": y, "levels": grp["level"].tolist(),
+                                  "means": grp["mean"].to_numpy(), "sem": grp["sem"].to_numpy()}))
         else:
-            plt.bar(["Середнє"], [means["mean"].mean()])
-        plt.ylabel(y)
-        plt.title("Середні значення ± SE")
-        plt.tight_layout()
-        plt.savefig(path, dpi=130)
-        plt.close()
-        imgs.append(path)
-
-    # лінія тренду (простий лінійний регрес)
+            specs.append(("bar", {"x": None, "y": y, "means": [means["mean"].mean()]}))
+
+    # лінія тренду (простий лінійний регрес) за першим іншим числовим стовпцем
     if selection.get("line"):
-        # шукаємо якийсь числовий предиктор окрім y
         nums = [c for c in df.columns if c != y and pd.api.types.is_numeric_dtype(df[c])]
         if nums:
             x = nums[0]
             xvals = pd.to_numeric(df[x], errors="coerce")
-            yvals = pd.to_numeric(df[y], errors="coerce")
-            mask = xvals.notna() & yvals.notna()
+            mask = (xvals.notna() & yvals.notna()).to_numpy()
             if mask.sum() >= 3:
-                path = _tmp_png()
-                plt.figure()
-                plt.scatter(xvals[mask], yvals[mask])
-                # тренд
-                coef = np.polyfit(xvals[mask], yvals[mask], 1)
-                poly = np.poly1d(coef)
-                xs = np.linspace(xvals[mask].min(), xvals[mask].max(), 100)
-                plt.plot(xs, poly(xs))
-                plt.xlabel(x); plt.ylabel(y)
-                plt.title(f"Лінія тренду: y={coef[0]:.3f}x+{coef[1]:.3f}")
-                plt.tight_layout()
-                plt.savefig(path, dpi=130)
-                plt.close()
-                imgs.append(path)
+                xv, yv = xvals.to_numpy()[mask], yvals.to_numpy()[mask]
+                p = {"x": x, "y": y, "coef": fit_line(xv, yv)}
+                if len(xv) > LARGE_N:
+                    p["density"], p["xedges"], p["yedges"] = density_2d(xv, yv)
+                else:
+                    p["xvals"], p["yvals"] = xv, yv
+                specs.append(("line", p))
 
     # кругова — частки за першим фактором
     if selection.get("pie") and factors:
-        path = _tmp_png()
-        plt.figure()
-        grp = df.groupby(factors[0])[y].count().reset_index()
-        plt.pie(grp[y], labels=grp[factors[0]].astype(str), autopct="%1.1f%%")
-        plt.title(f"Частки за {factors[0]}")
-        plt.tight_layout()
-        plt.savefig(path, dpi=130)
-        plt.close()
-        imgs.append(path)
-
-    return imgs
+        grp = df.groupby(factors[0], observed=True)[y].count()
+        specs.append(("pie", {"x": factors[0], "labels": grp.index.tolist(), "counts": grp.to_numpy()}))
+
+    return specs
+
+
+def _feed(h, obj):
+    """Додає obj до хешу h: масиви і таблиці — вмістом, решта — через repr."""
+    if isinstance(obj, dict):
+        for k in sorted(obj, key=str):
+            h.update(repr(k).encode())
+            _feed(h, obj[k])
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"[%d" % len(obj))
+        for v in obj:
+            _feed(h, v)
+    elif isinstance(obj, np.ndarray):
+        h.update(f"{obj.dtype}{obj.shape}".encode())
+        h.update(np.ascontiguousarray(obj).data if obj.dtype != object else repr(obj.tolist()).encode())
+    elif isinstance(obj, (pd.DataFrame, pd.Series)):
+        h.update(repr(obj.columns.tolist() if isinstance(obj, pd.DataFrame) else obj.name).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=False).to_numpy().data)
+        if isinstance(obj, pd.DataFrame):
+            h.update(repr(obj.dtypes.astype(str).tolist()).encode())
+    else:
+        h.update(repr(obj).encode())
+
+
+def spec_key(spec) -> str:
+    """Хеш опису графіка (вид + дані) — ключ кешу зображень."""
+    h = hashlib.blake2b(str(DPI).encode(), digest_size=16)
+    _feed(h, spec)
+    return h.hexdigest()
+
+
+def _cached_image(key):
+    with _images_lock:
+        png = _images.get(key)
+        if png is not None:
+            _images.move_to_end(key)
+        return png
+
+
+def _store_image(key, png: bytes):
+    global _images_nbytes
+    with _images_lock:
+        if key in _images or len(png) > IMAGE_CACHE_BYTES:
+            return
+        _images[key] = png
+        _images_nbytes += len(png)
+        while _images_nbytes > IMAGE_CACHE_BYTES:
+            _, old = _images.popitem(last=False)
+            _images_nbytes -= len(old)
+
+
+def clear_image_cache():
+    global _images_nbytes
+    with _images_lock:
+        _images.clear()
+        _images_nbytes = 0
+
+
+# ---- паралельне малювання ----
+def grouped_box_stats(values: pd.Series, by: pd.Series) -> list:
+    """box_stats для кожного рівня фактора (порядок — як у groupby)."""
+    v = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+    codes, levels = pd.factorize(by, sort=True)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(levels) + 1))
+    return [box_stats(v[order[bounds[k]:bounds[k + 1]]], lvl) for k, lvl in enumerate(levels)]
+
+
+def overview_spec(df, columns) -> tuple:
+    """Загальний box-plot показників; на великих даних — з готових статистик."""
+    if len(df) > LARGE_N:
+        return "box_all", {"stats": [box_stats(pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=float), c)
+                                     for c in columns]}
+    return "box_all", {"data": df[columns]}
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: fork з процесу з потоками Qt/BLAS небезпечний
+            _executor = ProcessPoolExecutor(max_workers=os.cpu_count() or 1,
+                                            mp_context=multiprocessing.get_context("spawn"))
+            atexit.register(shutdown)
+    return _executor
+
+
+def shutdown():
+    """Зупиняє пул процесів малювання (викликається й при виході)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(cancel_futures=True)
+            _executor = None
+
+
+@timed("charts")
+def render_charts(specs: list, parallel: bool = True, ctx=None) -> list:
+    """
+    PNG-байти для кожного опису, у тому ж порядку. Графіки з кешу не
+    перемальовуються; якщо решти багато, вони малюються у пулі процесів
+    (по процесу на ядро). ctx — JobContext для прогресу і скасування
+    (необов'язково).
+    """
+    keys = [spec_key(spec) for spec in specs]
+    images = [_cached_image(k) for k in keys]
+    todo = [i for i, png in enumerate(images) if png is None]
+    for i, png in zip(todo, _render([specs[i] for i in todo], parallel, ctx)):
+        images[i] = png
+        _store_image(keys[i], png)
+    return images
+
+
+def _render(specs: list, parallel: bool, ctx=None) -> list:
+    global _pool_broken
+    if not specs:
+        return []
+    if not parallel or _pool_broken or len(specs) < MIN_PARALLEL or (os.cpu_count() or 1) < 2:
+        return _render_serial(specs, ctx)
+    try:
+        return _render_parallel(specs, ctx)
+    except (BrokenProcessPool, OSError):
+        if not getattr(sys, "frozen", False):
+            raise
+        # зібраний exe без робочих процесів (див. multiprocessing.freeze_support у main.py)
+        _pool_broken = True
+        shutdown()
+        return _render_serial(specs, ctx)
+
+
+def _render_serial(specs: list, ctx=None) -> list:
+    images = []
+    for i, spec in enumerate(specs):
+        if ctx is not None:
+            ctx.check()
+        images.append(render_chart(spec))
+        if ctx is not None:
+            ctx.progress(100 * (i + 1) // len(specs))
+    return images
+
+
+def _render_parallel(specs: list, ctx=None) -> list:
+    futures = [_get_executor().submit(render_chart, spec) for spec in specs]
+    try:
+        images = []
+        for i, fut in enumerate(futures):
+            if ctx is not None:
+                ctx.check()
+            images.append(fut.result())
+            if ctx is not None:
+                ctx.progress(100 * (i + 1) // len(futures))
+        return images
+    finally:
+        for fut in futures:
+            fut.cancel()
+
+
+def select_and_build_charts(df, y, factors, results, selection: dict, parallel: bool = True) -> list:
+    """Графіки для показника y як список PNG-байтів (див. chart_specs)."""
+    return render_charts(chart_specs(df, y, factors, results, selection), parallel)
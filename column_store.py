@@ -0,0 +1,444 @@
+import hashlib
+
+import numpy as np
+
+from number_parser import parse_number, parse_numbers
+
+NUM = "num"
+CAT = "cat"
+
+
+def _fmt(v) -> str:
+    """Текстове подання числа для комірки ('' для NaN, без зайвого '.0')."""
+    if v != v:
+        return ""
+    return f"{v:.15g}"
+
+
+# текст комірок кешується блоками по 2**TEXT_BLOCK_BITS рядків (_Column.text)
+TEXT_BLOCK_BITS = 5
+TEXT_BLOCK_MASK = (1 << TEXT_BLOCK_BITS) - 1
+TEXT_BLOCKS = 256
+
+
+# pandas імпортується у функціях: таблиця працює і без нього, а вікно
+# відкривається без ~1 с на завантаження pandas (див. main.warm_up)
+def _numeric_chunk(s: "pd.Series"):
+    """float64-масив для числової порції або None, якщо в ній є текст (див. number_parser)."""
+    import pandas as pd
+    if pd.api.types.is_bool_dtype(s):
+        return None
+    if pd.api.types.is_numeric_dtype(s):
+        return s.to_numpy(dtype=np.float64, na_value=np.nan)
+    parsed = parse_numbers(s, strict=True)
+    return None if parsed is None else parsed[0]
+
+
+def _string_chunk(s: "pd.Series"):
+    """(масив значень, маска порожніх) для запису порції у категорійний стовпець."""
+    import pandas as pd
+    if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+        arr = s.to_numpy(dtype=np.float64, na_value=np.nan)
+        return np.array([_fmt(v) for v in arr.tolist()], dtype=object), np.isnan(arr)
+    # порожні після обрізання рядки відкидає _Column._encode
+    return s.to_numpy(dtype=object), s.isna().to_numpy()
+
+
+def _codes_dtype(n_categories: int):
+    """Найменший цілий тип кодів — той самий, що обирає pandas.Categorical (без копії)."""
+    for dt in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dt).max:
+            return dt
+    return np.int64
+
+
+class _Column:
+    """
+    Один стовпець сховища:
+      - NUM: values — float64, NaN = порожня комірка
+      - CAT: values — цілі коди, -1 = порожня комірка; categories — таблиця рядків
+    series() віддає pandas.Series над тим самим масивом; редагування комірок
+    видно у ній одразу, кеш скидається лише при заміні масиву чи категорій.
+    Нова категорія після виданої series() пишеться вже в копію масиву:
+    видані Series лишаються узгодженими зі своїми (старими) категоріями.
+    version зростає при кожній зміні вмісту — за ним кешуються fingerprint(),
+    sort_index(), group_codes() (подання рядків, row_views.py) і текст комірок.
+    """
+    __slots__ = ("name", "kind", "values", "categories", "_lookup", "_series", "_buf", "version", "_fp",
+                 "_order", "_groups", "_text", "_shared")
+
+    def __init__(self, name: str, n_rows: int):
+        self.name = name
+        self.kind = NUM
+        self.categories = []
+        self._lookup = {}
+        self.version = 0
+        self._fp = None
+        self._order = None
+        self._groups = None
+        self._text = None
+        self._shared = False
+        self.replace_values(np.full(n_rows, np.nan))
+
+    def fingerprint(self) -> str:
+        """Хеш вмісту стовпця (назва, тип, значення, категорії); перераховується лише після змін."""
+        if self._fp is None or self._fp[0] != self.version:
+            h = hashlib.blake2b(digest_size=16)
+            h.update(f"{self.name}\x00{self.kind}\x00{self.values.dtype.str}".encode("utf-8"))
+            h.update(np.ascontiguousarray(self.values).data)
+            if self.kind == CAT:
+                h.update("\x00".join(self.categories).encode("utf-8"))
+            self._fp = (self.version, h.hexdigest())
+        return self._fp[1]
+
+    def group_codes(self):
+        """
+        (коди рівнів 0..k-1 у порядку зростання, -1 — порожньо; назви рівнів).
+        Для категорійних — перенумерування кодів сховища за алфавітом назв,
+        для числових — унікальні значення. Обчислюється раз на версію стовпця.
+        """
+        if self._groups is None or self._groups[0] != self.version:
+            if self.kind == NUM:
+                mask = ~np.isnan(self.values)
+                uniq, inverse = np.unique(self.values[mask], return_inverse=True)
+                codes = np.full(len(self.values), -1, dtype=np.int64)
+                codes[mask] = inverse
+                labels = [_fmt(u) for u in uniq.tolist()]
+            else:
+                order = sorted(range(len(self.categories)), key=self.categories.__getitem__)
+                rank = np.full(len(order) + 1, -1, dtype=np.int64)
+                rank[order] = np.arange(len(order))
+                codes = rank[self.values]
+                labels = [self.categories[i] for i in order]
+            self._groups = (self.version, (codes, labels))
+        return self._groups[1]
+
+    def sort_index(self, descending: bool = False) -> np.ndarray:
+        """
+        Номери рядків у порядку значень (стабільно, порожні — в кінці);
+        категорійні — за алфавітом назв. Кешується для обох напрямків до зміни стовпця.
+        """
+        if self._order is None or self._order[0] != self.version:
+            self._order = (self.version, {})
+        cache = self._order[1]
+        if descending not in cache:
+            if self.kind == NUM:
+                key = self.values
+            else:
+                codes = self.group_codes()[0]
+                key = np.where(codes < 0, np.nan, codes.astype(np.float64))
+            cache[descending] = np.argsort(-key if descending else key, kind="stable")
+        return cache[descending]
+
+    def text(self, r: int) -> str:
+        """
+        Текст комірки. Викликається для кожної видимої комірки при кожному
+        перемальовуванні, тож рядки форматуються блоками по 2**TEXT_BLOCK_BITS і
+        кешуються до зміни стовпця (не більше TEXT_BLOCKS блоків).
+        """
+        cache = self._text
+        if cache is None or cache[0] != self.version:
+            cache = self._text = (self.version, {})
+        block = cache[1].get(r >> TEXT_BLOCK_BITS)
+        if block is None:
+            block = self._format_block(cache[1], r >> TEXT_BLOCK_BITS)
+        return block[r & TEXT_BLOCK_MASK]
+
+    def _format_block(self, blocks: dict, k: int) -> list:
+        if len(blocks) >= TEXT_BLOCKS:
+            blocks.clear()
+        chunk = self.values[k << TEXT_BLOCK_BITS:(k + 1) << TEXT_BLOCK_BITS]
+        if self.kind == NUM:
+            block = [f"{v:.15g}" if v == v else "" for v in chunk.tolist()]
+        else:
+            cats = self.categories
+            block = [cats[c] if c >= 0 else "" for c in chunk.tolist()]
+        blocks[k] = block
+        return block
+
+    def code_for(self, s: str) -> int:
+        code = self._lookup.get(s)
+        if code is None:
+            code = len(self.categories)
+            self.categories.append(s)
+            self._lookup[s] = code
+            dt = _codes_dtype(len(self.categories))
+            if dt != self.values.dtype:
+                self.replace_values(self.values.astype(dt))
+            elif self._shared:
+                # видані series()/to_frame() тримають старі категорії над цим масивом —
+                # новий код у ньому вийшов би за їхні межі; нові рівні рідкісні
+                self.replace_values(self.values.copy())
+            self._series = None
+        return code
+
+    def set_categorical(self, codes: np.ndarray, categories: list):
+        self.kind = CAT
+        self.categories = list(categories)
+        self._lookup = {s: i for i, s in enumerate(self.categories)}
+        self.replace_values(codes.astype(_codes_dtype(len(self.categories))))
+
+    def to_categorical(self):
+        """Переводить числовий стовпець у категорійний (значення стають рядками)."""
+        if self.kind == CAT:
+            return
+        vals = self.values
+        mask = ~np.isnan(vals)
+        uniq, inverse = np.unique(vals[mask], return_inverse=True)
+        codes = np.full(len(vals), -1, dtype=np.int64)
+        codes[mask] = inverse
+        self.set_categorical(codes, [_fmt(u) for u in uniq])
+
+    def set_text(self, r: int, text: str):
+        self.version += 1
+        if self.kind == NUM:
+            v = parse_number(text)
+            if v is not None:
+                self.values[r] = v
+                return
+            self.to_categorical()
+        s = text.strip()
+        code = -1 if s == "" else self.code_for(s)
+        self.values[r] = code
+
+    def replace_values(self, values: np.ndarray):
+        self.values = values
+        self._buf = values
+        self._series = None
+        self._shared = False
+        self.version += 1
+
+    # ---- дописування порціями (імпорт) ----
+    def reserve(self, capacity: int):
+        """Резервує буфер на capacity рядків; values лишається зрізом буфера."""
+        n = len(self.values)
+        if len(self._buf) >= capacity:
+            return
+        buf = self.empty(capacity)
+        buf[:n] = self.values
+        self._buf = buf
+        self.values = buf[:n]
+        self._series = None
+        self._shared = False
+
+    def _put(self, n: int, arr: np.ndarray):
+        end = n + len(arr)
+        if len(self._buf) < end:
+            self.reserve(max(end, len(self._buf) * 3 // 2))
+        self._buf[n:end] = arr
+        self.values = self._buf[:end]
+        self._series = None
+        self.version += 1
+
+    def append(self, s: "pd.Series"):
+        n = len(self.values)
+        if self.kind == NUM:
+            arr = _numeric_chunk(s)
+            if arr is not None:
+                self._put(n, arr)
+                return
+            self.to_categorical()
+        strs, mask = _string_chunk(s)
+        self._put(n, self._encode(strs, mask))
+
+    def _encode(self, strs: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """
+        Коди категорій для масиву значень (mask — порожні комірки, код -1); нові рядки додаються.
+        Текст обрізається лише в унікальних значеннях — після factorize їх зазвичай небагато.
+        """
+        import pandas as pd
+        codes, uniques = pd.factorize(strs[~mask])
+        labels = [str(u).strip() for u in uniques]
+        remap = np.array([self.code_for(t) if t else -1 for t in labels] + [-1], dtype=np.int64)
+        out = np.full(len(strs), -1, dtype=np.int64)
+        out[~mask] = remap[codes]
+        return out
+
+    def set_values(self, r: int, arr: np.ndarray):
+        """
+        Векторний запис масиву (числа або рядки, None/NaN — порожньо) у комірки
+        r..r+len(arr)-1 (вставка блоку). Якщо серед рядків є текст, що не є
+        числом, — стовпець стає категорійним.
+        """
+        import pandas as pd
+        self.version += 1
+        s = pd.Series(arr, copy=False)
+        end = r + len(s)
+        if self.kind == NUM:
+            nums = _numeric_chunk(s)
+            if nums is not None:
+                self.values[r:end] = nums
+                return
+            self.to_categorical()
+        strs, mask = _string_chunk(s)
+        self.values[r:end] = self._encode(strs, mask)
+
+    def texts(self, rows: np.ndarray) -> list:
+        """Текст комірок rows (для копіювання)."""
+        if self.kind == NUM:
+            return [_fmt(v) for v in self.values[rows].tolist()]
+        lookup = np.array(self.categories + [""], dtype=object)
+        return lookup[self.values[rows]].tolist()
+
+    def empty(self, n: int) -> np.ndarray:
+        if self.kind == NUM:
+            return np.full(n, np.nan)
+        return np.full(n, -1, dtype=self.values.dtype)
+
+    def is_empty(self) -> np.ndarray:
+        return np.isnan(self.values) if self.kind == NUM else self.values < 0
+
+    def series(self) -> "pd.Series":
+        """Series без копіювання: float64 або category над кодами сховища."""
+        import pandas as pd
+        if self._series is None:
+            if self.kind == NUM:
+                self._series = pd.Series(self.values, name=self.name, copy=False)
+            else:
+                cat = pd.Categorical.from_codes(self.values, categories=self.categories)
+                self._series = pd.Series(cat, name=self.name, copy=False)
+                self._shared = True
+        return self._series
+
+
+class ColumnStore:
+    """
+    Стовпчикове сховище даних таблиці: по одному типізованому NumPy-масиву
+    на стовпець, рядкова таблиця — лише для категорійних стовпців.
+    Не залежить від Qt, тому придатне і для моделі таблиці, і для аналізу.
+    """
+
+    def __init__(self, rows: int = 0, cols: int = 0):
+        self.n_rows = rows
+        self.columns = [_Column(f"Колонка {j+1}", rows) for j in range(cols)]
+
+    # ---- розміри та заголовки ----
+    @property
+    def n_cols(self) -> int:
+        return len(self.columns)
+
+    @property
+    def names(self) -> list:
+        return [c.name for c in self.columns]
+
+    def unique_name(self, name: str, skip=None) -> str:
+        """
+        name, якщо її не має інший стовпець, інакше «name (2)», «name (3)»…
+        Назви унікальні: за ними ключуються кеш аналізу і fingerprints().
+        """
+        taken = {c.name for c in self.columns if c is not skip}
+        if name not in taken:
+            return name
+        k = 2
+        while f"{name} ({k})" in taken:
+            k += 1
+        return f"{name} ({k})"
+
+    def _default_name(self, k: int, taken: set) -> str:
+        """«Колонка k» або перша вільна «Колонка k+1», «Колонка k+2»…"""
+        while f"Колонка {k}" in taken:
+            k += 1
+        return f"Колонка {k}"
+
+    def rename(self, col: int, name: str):
+        self.columns[col].name = self.unique_name(name, skip=self.columns[col])
+        self.columns[col]._series = None
+        self.columns[col].version += 1
+
+    def fingerprints(self) -> dict:
+        """{назва стовпця: хеш вмісту} — ключі для кешу результатів аналізу (назви унікальні)."""
+        return {c.name: c.fingerprint() for c in self.columns}
+
+    # ---- комірки ----
+    def text(self, r: int, c: int) -> str:
+        return self.columns[c].text(r)
+
+    def set_text(self, r: int, c: int, text: str):
+        self.columns[c].set_text(r, text)
+
+    def set_block(self, top: int, left: int, columns: list):
+        """Записує блок стовпцями: columns — масиви (числа або рядки) однакової довжини."""
+        for j, arr in enumerate(columns):
+            self.columns[left + j].set_values(top, arr)
+
+    # ---- вставка / видалення ----
+    def insert_rows(self, pos: int, count: int = 1):
+        for col in self.columns:
+            col.replace_values(np.insert(col.values, pos, col.empty(count)))
+        self.n_rows += count
+
+    def remove_rows(self, pos: int, count: int = 1):
+        idx = np.arange(pos, pos + count)
+        for col in self.columns:
+            col.replace_values(np.delete(col.values, idx))
+        self.n_rows -= count
+
+    def insert_columns(self, pos: int, count: int = 1, names=None):
+        new = []
+        taken = set(self.names)
+        for i in range(count):
+            if names:
+                name = self.unique_name(names[i])
+                name = name if name not in taken else self._default_name(pos + i + 1, taken)
+            else:
+                name = self._default_name(pos + i + 1, taken)
+            taken.add(name)
+            new.append(_Column(name, self.n_rows))
+        self.columns[pos:pos] = new
+
+    def remove_columns(self, pos: int, count: int = 1):
+        del self.columns[pos:pos + count]
+
+    # ---- обмін з pandas ----
+    @classmethod
+    def from_frame(cls, df: "pd.DataFrame") -> "ColumnStore":
+        store = cls()
+        store.append_frame(df)
+        return store
+
+    def append_frame(self, df: "pd.DataFrame"):
+        """
+        Дописує порцію рядків у кінець. Тип стовпця задає перша порція:
+        текст у числовому стовпці переводить його у категорійний,
+        числа у категорійному зберігаються як рядки.
+        """
+        k = df.shape[0]
+        for j in range(self.n_cols, df.shape[1]):
+            self.columns.append(_Column(self.unique_name(str(df.columns[j])), self.n_rows))
+        for j, col in enumerate(self.columns):
+            if j < df.shape[1]:
+                col.append(df.iloc[:, j])
+            else:
+                col._put(self.n_rows, col.empty(k))
+        self.n_rows += k
+
+    def to_frame(self, rows: np.ndarray = None) -> "pd.DataFrame":
+        """
+        DataFrame-подання сховища без копіювання даних: float64 для числових
+        стовпців, category — для категорійних. Повністю порожні рядки
+        відкидаються; якщо вони лише в кінці таблиці, це простий зріз (без копії).
+        Подання призначене лише для читання.
+        rows — лише ці рядки сховища (поточний фільтр, row_views.view_rows),
+        у вихідному порядку; тоді це копія вибраних рядків.
+        """
+        import pandas as pd
+        if not self.columns:
+            return pd.DataFrame()
+        df = pd.DataFrame({j: col.series() for j, col in enumerate(self.columns)}, copy=False)
+        df.columns = self.names
+        empty = np.ones(self.n_rows, dtype=bool)
+        for col in self.columns:
+            empty &= col.is_empty()
+        if rows is not None:
+            keep = np.unique(rows)
+            keep = keep[~empty[keep]]
+            return df.take(keep).reset_index(drop=True)
+        keep = np.flatnonzero(~empty)
+        if len(keep) == 0:
+            return df.iloc[:0]
+        if keep[-1] == len(keep) - 1:
+            return df.iloc[:len(keep)]
+        return df.take(keep).reset_index(drop=True)
+
+    def nbytes(self) -> int:
+        return sum(c.values.nbytes for c in self.columns)
@@ -1,55 +1,130 @@
+import os
 import pandas as pd
 import numpy as np
-from PyQt5.QtWidgets import QTableWidget, QTableWidgetItem
+
+from column_store import ColumnStore
 
 def load_excel_or_csv(path: str) -> pd.DataFrame:
+    """
+    Файл -> DataFrame з тими ж типами, що й у таблиці інтерфейсу (через ColumnStore):
+    числові стовпці — float64 (зокрема "3,14", "1 234,5", "12 %"), решта — category.
+    """
     if path.lower().endswith((".xlsx", ".xls")):
-        return pd.read_excel(path)
+        df = pd.read_excel(path)
     elif path.lower().endswith(".csv"):
-        return pd.read_csv(path)
+        df = pd.read_csv(path, sep=_csv_sep(path))
     else:
         raise ValueError("Підтримуються лише файли Excel (.xlsx/.xls) або CSV.")
+    return ColumnStore.from_frame(df).to_frame()
+
+def _csv_sep(path: str) -> str:
+    """Роздільник CSV за першим рядком: ';' (Excel з українською локаллю), табуляція або ','."""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        head = f.readline()
+    return max(";\t,", key=head.count) if head.count(";") or head.count("\t") else ","
+
+CHUNK_ROWS = 50_000
+
+def read_chunks(path: str, chunksize: int = CHUNK_ROWS):
+    """
+    Потокове читання файлу порціями. Генерує пари (DataFrame, частка 0..1).
+    У пам'яті одночасно перебуває лише одна порція.
+    """
+    low = path.lower()
+    if low.endswith(".csv"):
+        return _csv_chunks(path, chunksize)
+    if low.endswith(".xlsx"):
+        return _xlsx_chunks(path, chunksize)
+    if low.endswith(".xls"):
+        # старий формат не читається потоково — одна порція
+        return iter([(pd.read_excel(path), 1.0)])
+    raise ValueError("Підтримуються лише файли Excel (.xlsx/.xls) або CSV.")
+
+def _csv_chunks(path, chunksize):
+    # типи визначаємо за першою порцією: текстові стовпці далі читаємо як рядки
+    # числа з десятковою комою читаються як текст і розбираються у ColumnStore (number_parser)
+    sep = _csv_sep(path)
+    head = pd.read_csv(path, nrows=chunksize, sep=sep)
+    dtype = {c: str for c in head.columns if c not in numeric_columns(head)}
+    del head
+    total = os.path.getsize(path) or 1
+    with open(path, "rb") as f:
+        for chunk in pd.read_csv(f, chunksize=chunksize, dtype=dtype, sep=sep):
+            yield chunk, min(1.0, f.tell() / total)
+
+def _xlsx_chunks(path, chunksize):
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        total = ws.max_row or 0
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        names = [f"Unnamed: {j}" if h is None else str(h) for j, h in enumerate(header)]
+        width = len(names)
+        buf, done = [], 1
+        for row in rows:
+            buf.append(row[:width] + (None,) * (width - len(row)))
+            done += 1
+            if len(buf) == chunksize:
+                yield pd.DataFrame(buf, columns=names), done / total if total else 0.0
+                buf = []
+        if buf:
+            yield pd.DataFrame(buf, columns=names), 1.0
+    finally:
+        wb.close()
+
+def read_tsv_text(text: str) -> list:
+    """
+    Текст із буфера обміну (TSV, як копіює Excel) -> список стовпців-масивів
+    однакової довжини: числові стовпці — float/int (типи визначає C-парсер pandas,
+    як і при імпорті файлу), решта — object з рядками; відсутні комірки — NaN.
+    Лапки Excel (комірки з табуляцією чи переносом рядка) враховуються.
+    Порожні рядки тексту пропускаються, порожні стовпці в кінці відкидаються.
+    """
+    import csv
+    import io
+    if not text:
+        return []
+    # ширина — найбільша кількість табуляцій у рядку тексту, без циклу по рядках
+    raw = np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+    tabs = np.cumsum(raw == 9)
+    at = tabs[np.append(np.flatnonzero(raw == 10), len(raw) - 1)]
+    width = int(np.diff(at, prepend=0).max()) + 1
+    df = pd.read_csv(io.StringIO(text), sep="\t", header=None, names=range(width), keep_default_na=False,
+                     na_values=[""], skip_blank_lines=True, quoting=csv.QUOTE_MINIMAL, engine="c")
+    columns = [df[j].to_numpy() for j in range(width)]
+    while columns and pd.isna(columns[-1]).all():
+        columns.pop()
+    return columns if columns and len(columns[0]) else []
+
+def df_to_table(table, df: pd.DataFrame):
+    """Завантажує DataFrame у таблицю (TableWidget) через стовпчикове сховище."""
+    table.data_model().set_store(ColumnStore.from_frame(df))
+    if df.shape[1] == 0:
+        table.data_model().insertColumns(0, 1)
+    if df.shape[0] == 0:
+        table.data_model().insertRows(0, 1)
+
+def df_from_table(table, rows=None) -> pd.DataFrame:
+    """
+    DataFrame-подання даних таблиці без копіювання (див. ColumnStore.to_frame).
+    Типи стовпців уже визначені сховищем: float64 або category.
+    rows — лише ці рядки сховища (поточний фільтр, TableWidget.filtered_rows).
+    """
+    return table.data_model().store.to_frame(rows)
 
-def df_to_table(table: QTableWidget, df: pd.DataFrame):
-    table.clear()
-    table.setRowCount(max(1, df.shape[0]))
-    table.setColumnCount(max(1, df.shape[1]))
-    # встановити заголовки, якщо є
-    if df.columns is not None:
-        for j, c in enumerate(df.columns):
-            table.setHorizontalHeaderItem(j, QTableWidgetItem(str(c)))
-    for i in range(df.shape[0]):
-        for j in range(df.shape[1]):
-            table.setItem(i, j, QTableWidgetItem("" if pd.isna(df.iat[i, j]) else str(df.iat[i, j])))
-
-def df_from_table(table: QTableWidget) -> pd.DataFrame:
-    rows, cols = table.rowCount(), table.columnCount()
-    data = []
-    headers = [table.horizontalHeaderItem(c).text() if table.horizontalHeaderItem(c) else f"col{c+1}" for c in range(cols)]
-    for r in range(rows):
-        row = []
-        empty_row = True
-        for c in range(cols):
-            it = table.item(r, c)
-            val = "" if it is None else it.text()
-            if val != "":
-                empty_row = False
-            row.append(val)
-        if not empty_row:
-            data.append(row)
-    if not data:
-        return pd.DataFrame(columns=headers)
-    df = pd.DataFrame(data, columns=headers)
-    # спробуємо перетворити числові стовпці
-    for col in df.columns:
-        df[col] = pd.to_numeric(df[col], errors="ignore")
-    return df
+def numeric_columns(df: pd.DataFrame) -> list:
+    """Єдине правило визначення числових стовпців для infer_roles та аналізу."""
+    return [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
 
 def infer_roles(df: pd.DataFrame) -> dict:
     """
     Евристика:
       - 'Subject' (якщо є) — суб'єкт для RM-ANOVA
-      - 'response' — перший числовий стовпець
+      - 'response' — перший числовий стовпець (крім суб'єкта)
       - 'factors' — нечислові стовпці + числові з ≤10 унікальних значень
       - 'group_for_np' — перший фактор для непараметричних тестів
     """
@@ -59,7 +134,7 @@ def infer_roles(df: pd.DataFrame) -> dict:
             subject = name
             break
 
-    numeric_cols = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
+    numeric_cols = [c for c in numeric_columns(df) if c != subject]
     response = numeric_cols[0] if numeric_cols else None
 
     factors = []
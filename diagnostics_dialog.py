@@ -0,0 +1,115 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QFontDatabase
+from PyQt5.QtWidgets import (QCheckBox, QDialog, QFileDialog, QHBoxLayout, QHeaderView, QLabel, QMessageBox,
+                             QPlainTextEdit, QPushButton, QTableWidget, QTableWidgetItem, QVBoxLayout)
+
+import profiling
+
+
+class DiagnosticsDialog(QDialog):
+    """
+    Довідка → Діагностика продуктивності: вмикання вимірювань (profiling),
+    час етапів із початку сесії, найдорожчі функції за cProfile і експорт
+    усього в zip, який можна додати до звіту про помилку.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Діагностика продуктивності")
+        self.resize(780, 560)
+        s = profiling.current()
+
+        self.enabled = QCheckBox("Вимірювати час етапів аналізу")
+        self.cprofile = QCheckBox("Профіль викликів (cProfile)")
+        self.memory = QCheckBox("Пік пам'яті (tracemalloc; помітно уповільнює роботу)")
+        self.enabled.setChecked(s is not None)
+        self.cprofile.setChecked(s is not None and s.cprofile)
+        self.memory.setChecked(s is not None and s.memory)
+        for cb in (self.enabled, self.cprofile, self.memory):
+            cb.toggled.connect(self._apply)
+
+        self.stages = QTableWidget(0, 5)
+        self.stages.setHorizontalHeaderLabels(["Етап", "Викликів", "Усього, с", "Середнє, с", "Пік пам'яті, МБ"])
+        self.stages.verticalHeader().hide()
+        self.stages.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.stages.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.stages.horizontalHeader().setStretchLastSection(True)
+
+        self.profile = QPlainTextEdit()
+        self.profile.setReadOnly(True)
+        self.profile.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.profile.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+
+        b_refresh = QPushButton("Оновити")
+        b_refresh.clicked.connect(self.refresh)
+        b_reset = QPushButton("Скинути")
+        b_reset.clicked.connect(self._apply)
+        self.b_export = QPushButton("Експорт профілю…")
+        self.b_export.clicked.connect(self.export)
+        b_close = QPushButton("Закрити")
+        b_close.clicked.connect(self.accept)
+        buttons = QHBoxLayout()
+        for b in (b_refresh, b_reset, self.b_export):
+            buttons.addWidget(b)
+        buttons.addStretch(1)
+        buttons.addWidget(b_close)
+
+        lay = QVBoxLayout(self)
+        lay.addWidget(self.enabled)
+        lay.addWidget(self.cprofile)
+        lay.addWidget(self.memory)
+        lay.addWidget(QLabel("Зміна параметрів або «Скинути» починає нову сесію вимірювань."))
+        lay.addWidget(self.stages, 2)
+        lay.addWidget(QLabel("Найдорожчі функції (cProfile, за сукупним часом):"))
+        lay.addWidget(self.profile, 3)
+        lay.addLayout(buttons)
+        self.refresh()
+
+    def _apply(self):
+        on = self.enabled.isChecked()
+        self.cprofile.setEnabled(on)
+        self.memory.setEnabled(on)
+        if on:
+            profiling.start(self.cprofile.isChecked(), self.memory.isChecked())
+        else:
+            profiling.stop()
+        self.refresh()
+
+    def refresh(self):
+        s = profiling.current()
+        on = s is not None
+        self.cprofile.setEnabled(on)
+        self.memory.setEnabled(on)
+        self.b_export.setEnabled(on)
+        rows = s.summary() if on else []
+        self.stages.setRowCount(len(rows))
+        for i, r in enumerate(rows):
+            peak = "" if r["peak_mb"] is None else f"{r['peak_mb']:.1f}"
+            cells = [r["title"], str(r["calls"]), f"{r['seconds']:.3f}", f"{r['mean']:.3f}", peak]
+            for j, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                if j:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.stages.setItem(i, j, item)
+        if not on:
+            self.profile.setPlainText("Вимірювання вимкнено.")
+        elif not s.cprofile:
+            self.profile.setPlainText("Профіль викликів вимкнено.")
+        else:
+            self.profile.setPlainText(s.profile_text() or "Ще немає даних — запустіть аналіз.")
+
+    def export(self):
+        s = profiling.current()
+        if s is None:
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Експорт профілю", "sad_profile.zip", "Архів zip (*.zip)")
+        if not path:
+            return
+        if not path.lower().endswith(".zip"):
+            path += ".zip"
+        try:
+            s.export(path)
+        except OSError as e:
+            QMessageBox.critical(self, "Помилка експорту", str(e))
+            return
+        QMessageBox.information(self, "Експорт профілю", f"Профіль збережено у {path}.")
@@ -1,39 +1,168 @@
+import io
+import os
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+import pandas as pd
 from docx import Document
 from docx.shared import Inches
 from datetime import datetime
 
-def export_to_word(df, indicator, units, results, graph_path):
-    doc = Document()
+from profiling import timed
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "template_statistika.docx")
+DEFAULT_REPORT = "Результати_аналізу.docx"
+# більше рядків сирих даних у звіт не виводиться (решта — у файлі даних/проєкту)
+MAX_RAW_ROWS = 10_000
+# рядків таблиці в одному фрагменті XML
+_XML_CHUNK = 2_000
+# символи, недопустимі в XML 1.0
+_BAD_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+# мітка місця таблиці в документі до збереження
+_MARK = "[[SAD-TABLE:"
+
+
+def _fmt_cell(v, float_fmt: str = ".4g") -> str:
+    if v is None or (isinstance(v, float) and v != v):
+        return ""
+    if isinstance(v, float):
+        return format(v, float_fmt)
+    return str(v)
+
+
+def _column_text(s: pd.Series, float_fmt: str) -> list:
+    """Текст комірок стовпця; NaN/None — порожньо."""
+    if pd.api.types.is_float_dtype(s.dtype):
+        return [format(v, float_fmt) if v == v else "" for v in s.to_numpy()]
+    if pd.api.types.is_numeric_dtype(s.dtype) and not pd.api.types.is_bool_dtype(s.dtype):
+        return [str(v) for v in s.to_numpy()]
+    return [_fmt_cell(v, float_fmt) for v in s.astype(object).to_numpy()]
+
+
+def _new_document():
+    """Документ на основі шаблону кафедри; порожній чи відсутній шаблон — стандартний."""
+    if os.path.isfile(TEMPLATE) and os.path.getsize(TEMPLATE) > 0:
+        return Document(TEMPLATE)
+    return Document()
+
+
+def _cell_xml(text: str, width: int) -> str:
+    if not text:
+        return f'<w:tc><w:tcPr><w:tcW w:w="{width}" w:type="dxa"/></w:tcPr><w:p/></w:tc>'
+    text = escape(_BAD_XML.sub("", text))
+    return (f'<w:tc><w:tcPr><w:tcW w:w="{width}" w:type="dxa"/></w:tcPr>'
+            f'<w:p><w:r><w:t xml:space="preserve">{text}</w:t></w:r></w:p></w:tc>')
+
+
+def _table_xml(df: pd.DataFrame, width: int, style: str, float_fmt: str):
+    """XML таблиці фрагментами по _XML_CHUNK рядків (генератор рядків тексту)."""
+    ncols = max(df.shape[1], 1)
+    grid = "".join(f'<w:gridCol w:w="{width}"/>' for _ in range(ncols))
+    header = "".join(_cell_xml(str(c), width) for c in df.columns)
+    yield (f'<w:tbl><w:tblPr>{style}<w:tblW w:w="0" w:type="auto"/><w:tblLook w:val="04A0"/></w:tblPr>'
+           f'<w:tblGrid>{grid}</w:tblGrid><w:tr><w:trPr><w:tblHeader/></w:trPr>{header}</w:tr>')
+    columns = [_column_text(df.iloc[:, j], float_fmt) for j in range(df.shape[1])]
+    for start in range(0, len(df), _XML_CHUNK):
+        yield "".join(
+            "<w:tr>" + "".join(_cell_xml(col[i], width) for col in columns) + "</w:tr>"
+            for i in range(start, min(start + _XML_CHUNK, len(df)))
+        )
+    yield "</w:tbl>"
+
+
+def _table_style(doc) -> str:
+    """Стиль «Table Grid», якщо він є в шаблоні (перебір стилів дорогий — раз на документ)."""
+    return '<w:tblStyle w:val="TableGrid"/>' if "Table Grid" in [s.name for s in doc.styles] else ""
+
+
+def _add_table(doc, tables: list, df: pd.DataFrame, float_fmt: str = ".4g", style: str = None):
+    """
+    Додає в документ мітку, замість якої _save вставить таблицю як готовий XML.
+    table.cell(i, j).text у python-docx щоразу перебирає всю таблицю (квадратично),
+    а навіть побудова дерева lxml для великої таблиці коштує секунди.
+    """
+    sec = doc.sections[-1]
+    width = int((sec.page_width - sec.left_margin - sec.right_margin) / 635 / max(df.shape[1], 1))  # EMU -> twips
+    if style is None:
+        style = _table_style(doc)
+    doc.add_paragraph(f"{_MARK}{len(tables)}]]")
+    tables.append(_table_xml(df, width, style, float_fmt))
+
+
+def _save(doc, path: str, tables: list):
+    """Зберігає документ, потоково підставляючи XML таблиць на місце міток у word/document.xml."""
+    buf = io.BytesIO()
+    doc.save(buf)
+    tmp = path + ".tmp"
+    try:
+        with zipfile.ZipFile(buf) as src, zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as dst:
+            for item in src.infolist():
+                if item.filename != "word/document.xml":
+                    dst.writestr(item, src.read(item.filename))
+                    continue
+                xml = src.read(item.filename).decode("utf-8")
+                with dst.open(item.filename, "w") as out:
+                    pos = 0
+                    for k, parts in enumerate(tables):
+                        mark = xml.index(f"{_MARK}{k}]]", pos)
+                        p_start = max(xml.rfind("<w:p>", pos, mark), xml.rfind("<w:p ", pos, mark))
+                        out.write(xml[pos:p_start].encode("utf-8"))
+                        for part in parts:
+                            out.write(part.encode("utf-8"))
+                        pos = xml.index("</w:p>", mark) + len("</w:p>")
+                    out.write(xml[pos:].encode("utf-8"))
+        os.replace(tmp, path)
+    except BaseException:
+        # недописаний .tmp не лишаємо поруч зі звітом
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+@timed("docx")
+def export_to_word(df, indicator, units, results, images, path: str = DEFAULT_REPORT,
+                   max_raw_rows: int = MAX_RAW_ROWS) -> str:
+    """
+    Зберігає звіт у path і повертає його. images — PNG-байти графіків
+    (charts.render_charts), шлях або їх список. Сирі дані обрізаються до
+    max_raw_rows рядків (None — усі, 0 — без таблиці сирих даних).
+    """
+    if isinstance(images, (bytes, str)):
+        images = [images]
+    doc = _new_document()
+    tables = []
+    style = _table_style(doc)
 
     # Заголовок
     doc.add_heading(f"Показник: {indicator} ({units})", level=1)
 
     # Таблиця з сирими даними
-    doc.add_heading("Початкові дані", level=2)
-    table = doc.add_table(rows=df.shape[0]+1, cols=df.shape[1])
-    table.style = "Table Grid"
-
-    # Заголовки
-    for j, col in enumerate(df.columns):
-        table.cell(0, j).text = str(col)
-
-    # Дані
-    for i in range(df.shape[0]):
-        for j in range(df.shape[1]):
-            val = str(df.iat[i, j]) if df.iat[i, j] is not None else ""
-            table.cell(i+1, j).text = val
+    if max_raw_rows != 0:
+        doc.add_heading("Початкові дані", level=2)
+        shown = df if max_raw_rows is None else df.iloc[:max_raw_rows]
+        _add_table(doc, tables, shown, ".15g", style)
+        if len(shown) < len(df):
+            doc.add_paragraph(f"Показано перші {len(shown)} з {len(df)} рядків; "
+                              "повні дані — у вихідному файлі або проєкті.")
 
     # Результати аналізів
     doc.add_heading("Результати аналізу", level=2)
     for key, value in results.items():
-        doc.add_paragraph(f"{key}: {value}")
+        if isinstance(value, pd.DataFrame):
+            doc.add_paragraph(f"{key}:")
+            _add_table(doc, tables, value, style=style)
+        else:
+            doc.add_paragraph(f"{key}: {value}")
 
-    # Додаємо графік
+    # Графіки — прямо з пам'яті, без тимчасових файлів
     doc.add_heading("Графічне відображення", level=2)
-    doc.add_picture(graph_path, width=Inches(5))
+    for img in images:
+        doc.add_picture(io.BytesIO(img) if isinstance(img, bytes) else img, width=Inches(5))
 
     # Дата і назва програми
     doc.add_paragraph(f"\nДата виконання: {datetime.now().strftime('%d.%m.%Y %H:%M')}")
     doc.add_paragraph("Програма: SAD - Статистичний аналіз даних")
 
-    doc.save("Результати_аналізу.docx")
+    _save(doc, path, tables)
+    return path
@@ -0,0 +1,111 @@
+import numpy as np
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import (QDialog, QDialogButtonBox, QFormLayout, QHBoxLayout, QLabel, QLineEdit, QListWidget,
+                             QListWidgetItem, QMessageBox, QPushButton, QVBoxLayout)
+
+from column_store import NUM
+from number_parser import parse_number
+
+# більше рівнів у списку не показується — для таких стовпців лише межі
+MAX_LEVELS = 2000
+
+
+class FilterDialog(QDialog):
+    """
+    Фільтр одного стовпця: позначені рівні (за _Column.group_codes, з кількістю
+    рядків) і, для числових стовпців, межі «від/до». condition() — умова для
+    row_views.filter_mask або None, якщо фільтр знято.
+    """
+
+    def __init__(self, column, current: dict = None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Фільтр: {column.name}")
+        self.resize(360, 480)
+        self.column = column
+        current = current or {}
+        codes, labels = column.group_codes()
+        counts = np.bincount(codes[codes >= 0], minlength=len(labels))
+        blanks = int(np.count_nonzero(codes < 0))
+
+        self.levels = QListWidget()
+        self.too_many = len(labels) > MAX_LEVELS
+        if not self.too_many:
+            allowed = current.get("values")
+            entries = [(lv, int(k)) for lv, k in zip(labels, counts.tolist()) if k]
+            if blanks:
+                entries.append(("", blanks))
+            for label, k in entries:
+                item = QListWidgetItem(f"{label or '(порожньо)'}  ({k})")
+                item.setData(Qt.UserRole, label)
+                item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+                item.setCheckState(Qt.Checked if allowed is None or label in allowed else Qt.Unchecked)
+                self.levels.addItem(item)
+        b_all = QPushButton("Усі")
+        b_all.clicked.connect(lambda: self._check_all(Qt.Checked))
+        b_none = QPushButton("Жодного")
+        b_none.clicked.connect(lambda: self._check_all(Qt.Unchecked))
+        checks = QHBoxLayout()
+        checks.addWidget(b_all)
+        checks.addWidget(b_none)
+        checks.addStretch(1)
+
+        lay = QVBoxLayout(self)
+        if self.too_many:
+            lay.addWidget(QLabel(f"Різних значень більше {MAX_LEVELS} — фільтр лише за межами."))
+        else:
+            lay.addWidget(QLabel("Показувати рядки зі значеннями:"))
+            lay.addWidget(self.levels, 1)
+            lay.addLayout(checks)
+
+        self.lo = QLineEdit("" if current.get("min") is None else f"{current['min']:.15g}")
+        self.hi = QLineEdit("" if current.get("max") is None else f"{current['max']:.15g}")
+        if column.kind == NUM:
+            form = QFormLayout()
+            form.addRow("Від:", self.lo)
+            form.addRow("До:", self.hi)
+            lay.addLayout(form)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel | QDialogButtonBox.Reset)
+        buttons.button(QDialogButtonBox.Reset).setText("Зняти фільтр")
+        buttons.button(QDialogButtonBox.Reset).clicked.connect(self._clear)
+        buttons.accepted.connect(self._accept)
+        buttons.rejected.connect(self.reject)
+        lay.addWidget(buttons)
+        self._condition = None
+
+    def _check_all(self, state):
+        for i in range(self.levels.count()):
+            self.levels.item(i).setCheckState(state)
+
+    def _clear(self):
+        self._condition = None
+        self.accept()
+
+    def _bound(self, edit: QLineEdit):
+        v = parse_number(edit.text())
+        if v is None:
+            raise ValueError(f"«{edit.text()}» — не число.")
+        return None if v != v else v
+
+    def _accept(self):
+        cond = {}
+        if not self.too_many:
+            items = [self.levels.item(i) for i in range(self.levels.count())]
+            checked = [it.data(Qt.UserRole) for it in items if it.checkState() == Qt.Checked]
+            if len(checked) < len(items):
+                cond["values"] = checked
+        if self.column.kind == NUM:
+            try:
+                lo, hi = self._bound(self.lo), self._bound(self.hi)
+            except ValueError as e:
+                QMessageBox.warning(self, "Фільтр", str(e))
+                return
+            if lo is not None:
+                cond["min"] = lo
+            if hi is not None:
+                cond["max"] = hi
+        self._condition = cond or None
+        self.accept()
+
+    def condition(self):
+        return self._condition
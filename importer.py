@@ -0,0 +1,42 @@
+from PyQt5.QtCore import QObject, QSemaphore, pyqtSignal
+
+from data_input import read_chunks, CHUNK_ROWS
+
+
+class ImportWorker(QObject):
+    """
+    Фонове читання файлу порціями (запускається у QThread).
+    Порції передаються в GUI-потік сигналом chunk; у черзі одночасно
+    не більше max_pending порцій — GUI підтверджує кожну через chunk_consumed().
+    """
+    chunk = pyqtSignal(object)
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(bool)     # True — імпорт скасовано
+    failed = pyqtSignal(str)
+
+    def __init__(self, path: str, chunksize: int = CHUNK_ROWS, max_pending: int = 2):
+        super().__init__()
+        self.path = path
+        self.chunksize = chunksize
+        self._slots = QSemaphore(max_pending)
+        self._cancel = False
+
+    def cancel(self):
+        self._cancel = True
+
+    def chunk_consumed(self):
+        self._slots.release()
+
+    def run(self):
+        try:
+            for df, frac in read_chunks(self.path, self.chunksize):
+                while not self._cancel and not self._slots.tryAcquire(1, 100):
+                    pass
+                if self._cancel:
+                    break
+                self.chunk.emit(df)
+                self.progress.emit(int(frac * 100))
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.finished.emit(self._cancel)
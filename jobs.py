@@ -0,0 +1,111 @@
+import os
+import traceback
+
+from PyQt5.QtCore import QObject, QThreadPool, pyqtSignal
+
+
+class JobCancelled(Exception):
+    """Завдання зупинене користувачем (кидається з JobContext.check())."""
+
+
+class JobContext:
+    """Передається у функцію завдання: звіт про прогрес і перевірка скасування."""
+
+    def __init__(self, job):
+        self._job = job
+
+    def progress(self, percent: int):
+        self._job.signals.progress.emit(self._job.job_id, int(percent))
+
+    def cancelled(self) -> bool:
+        return self._job.cancel_requested
+
+    def check(self):
+        if self._job.cancel_requested:
+            raise JobCancelled()
+
+
+class _JobSignals(QObject):
+    progress = pyqtSignal(str, int)
+    finished = pyqtSignal(str, object)
+    failed = pyqtSignal(str, str)
+    cancelled = pyqtSignal(str)
+
+
+class Job:
+    """
+    Одне завдання пулу: fn(ctx, *args, **kwargs) виконується у робочому потоці.
+    У пул передається лише метод run, тож життям об'єкта керує Python, а не Qt.
+    """
+
+    def __init__(self, job_id: str, fn, *args, **kwargs):
+        self.job_id = job_id
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.cancel_requested = False
+        self.signals = _JobSignals()
+
+    def run(self):
+        if self.cancel_requested:
+            self.signals.cancelled.emit(self.job_id)
+            return
+        try:
+            result = self.fn(JobContext(self), *self.args, **self.kwargs)
+        except JobCancelled:
+            self.signals.cancelled.emit(self.job_id)
+        except Exception:
+            self.signals.failed.emit(self.job_id, traceback.format_exc())
+        else:
+            self.signals.finished.emit(self.job_id, result)
+
+
+class JobRunner(QObject):
+    """
+    Черга фонових завдань на QThreadPool (за замовчуванням — по потоку на ядро).
+    Усі сигнали доставляються в потік, де створено JobRunner (GUI-потік).
+    NumPy/SciPy відпускають GIL у важких обчисленнях, тож кілька показників
+    рахуються паралельно.
+    """
+    job_progress = pyqtSignal(str, int)
+    job_finished = pyqtSignal(str, object)
+    job_failed = pyqtSignal(str, str)
+    job_cancelled = pyqtSignal(str)
+    idle = pyqtSignal()
+
+    def __init__(self, parent=None, max_threads: int = None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads or os.cpu_count() or 1)
+        self._jobs = {}
+
+    def submit(self, job_id: str, fn, *args, **kwargs) -> str:
+        job = Job(job_id, fn, *args, **kwargs)
+        job.signals.progress.connect(self.job_progress)
+        job.signals.finished.connect(lambda jid, res: self._done(jid, self.job_finished, res))
+        job.signals.failed.connect(lambda jid, msg: self._done(jid, self.job_failed, msg))
+        job.signals.cancelled.connect(lambda jid: self._done(jid, self.job_cancelled))
+        self._jobs[job_id] = job
+        self.pool.start(job.run)
+        return job_id
+
+    def cancel(self, job_id: str = None):
+        """
+        Скасовує одне завдання або всі. Запущені зупиняються на найближчому
+        ctx.check(), ще не запущені завершуються одразу, не викликаючи fn.
+        """
+        ids = [job_id] if job_id is not None else list(self._jobs)
+        for jid in ids:
+            job = self._jobs.get(jid)
+            if job is not None:
+                job.cancel_requested = True
+
+    def pending(self) -> int:
+        return len(self._jobs)
+
+    def _done(self, job_id, signal, *payload):
+        if self._jobs.pop(job_id, None) is None:
+            return
+        signal.emit(job_id, *payload)
+        if not self._jobs:
+            self.idle.emit()
@@ -0,0 +1,300 @@
+"""
+Поточні підсумки таблиці, що оновлюються інкрементно при редагуванні.
+
+Для кожного числового стовпця зберігаються n, Σ(x−K), Σ(x−K)² (зсув K —
+середнє на момент перебудови, щоб уникнути втрати точності), для факторів
+з infer_roles — ті самі суми по рівнях. Редагування блоку комірок, вставка
+чи видалення рядків — це «дельта»: внесок старих значень віднімається,
+нових — додається, векторизовано по блоку. Повний перерахунок потрібен
+лише при зміні структури (нова таблиця, зміна типу стовпця, видалення фактора).
+
+Мінімум і максимум — купи з лінивим видаленням: видалене значення
+позначається у лічильнику і викидається з вершини купи при запиті.
+Купи будуються з поточних даних лише при першому запиті після масового
+завантаження, далі підтримуються за O(log n) на комірку.
+
+Модуль не залежить від Qt.
+"""
+import heapq
+from collections import Counter
+
+import numpy as np
+
+from column_store import ColumnStore, NUM, _fmt
+
+# групові суми ведуться для стількох перших факторів
+LIVE_FACTORS = 3
+# більші порції не проштовхуються в купи поштучно — купи перебудовуються при запиті
+HEAP_BATCH = 4096
+
+
+class RunningStats:
+    """Агрегати одного числового стовпця (порожні комірки — NaN — не враховуються)."""
+
+    def __init__(self, values: np.ndarray):
+        valid = values[~np.isnan(values)]
+        self.n = len(valid)
+        self.shift = float(valid.mean()) if self.n else 0.0
+        d = valid - self.shift
+        self.s1 = float(d.sum())
+        self.s2 = float(d @ d)
+        self._lo = self._hi = None
+        self._gone_lo, self._gone_hi = Counter(), Counter()
+
+    def add(self, vals: np.ndarray):
+        vals = vals[~np.isnan(vals)]
+        if not len(vals):
+            return
+        d = vals - self.shift
+        self.n += len(vals)
+        self.s1 += float(d.sum())
+        self.s2 += float(d @ d)
+        if self._lo is None:
+            return
+        if len(vals) > HEAP_BATCH:
+            self._drop_heaps()
+            return
+        for v in vals.tolist():
+            heapq.heappush(self._lo, v)
+            heapq.heappush(self._hi, -v)
+
+    def remove(self, vals: np.ndarray):
+        vals = vals[~np.isnan(vals)]
+        if not len(vals):
+            return
+        d = vals - self.shift
+        self.n -= len(vals)
+        self.s1 -= float(d.sum())
+        self.s2 -= float(d @ d)
+        if self.n == 0:
+            self.s1 = self.s2 = 0.0
+        if self._lo is None:
+            return
+        if len(vals) > HEAP_BATCH:
+            self._drop_heaps()
+            return
+        items = vals.tolist()
+        self._gone_lo.update(items)
+        self._gone_hi.update(items)
+
+    def _drop_heaps(self):
+        self._lo = self._hi = None
+        self._gone_lo.clear()
+        self._gone_hi.clear()
+
+    def _heaps(self, values: np.ndarray):
+        # надто «засмічені» видаленими значеннями купи перебудовуються з поточних даних
+        if self._lo is not None and len(self._lo) > 2 * self.n + 1024:
+            self._drop_heaps()
+        if self._lo is None:
+            valid = values[~np.isnan(values)]
+            self._lo = valid.tolist()
+            self._hi = (-valid).tolist()
+            heapq.heapify(self._lo)
+            heapq.heapify(self._hi)
+
+    @staticmethod
+    def _top(heap, gone, sign):
+        while heap:
+            v = sign * heap[0]
+            if gone[v] > 0:
+                gone[v] -= 1
+                heapq.heappop(heap)
+            else:
+                return v
+        return np.nan
+
+    def min_max(self, values: np.ndarray):
+        """values — поточний масив стовпця (потрібен лише для перебудови куп)."""
+        if self.n == 0:
+            return np.nan, np.nan
+        self._heaps(values)
+        return self._top(self._lo, self._gone_lo, 1), self._top(self._hi, self._gone_hi, -1)
+
+    @property
+    def mean(self) -> float:
+        return self.shift + self.s1 / self.n if self.n else np.nan
+
+    @property
+    def sd(self) -> float:
+        if self.n < 2:
+            return np.nan
+        return float(np.sqrt(max(self.s2 - self.s1 * self.s1 / self.n, 0.0) / (self.n - 1)))
+
+
+def _moments(n, s1, s2, shift):
+    """(середнє, SD) із зсунутих сум."""
+    mean = shift + s1 / n if n else np.nan
+    sd = np.sqrt(max(s2 - s1 * s1 / n, 0.0) / (n - 1)) if n > 1 else np.nan
+    return mean, sd
+
+
+class LiveStats:
+    """
+    Підсумки для ColumnStore. Стан прив'язаний до об'єктів стовпців,
+    тож вставка/видалення стовпців не зсуває його.
+
+    Виклики-дельти (усі — до або після зміни сховища, як зазначено):
+      block_edited(top, left, old)  — після запису блоку; old — масиви стовпців блоку до запису
+      rows_inserted(first, count)   — після вставки рядків
+      rows_removing(first, count)   — до видалення рядків
+      columns_removing(first, count) — до видалення стовпців
+    Повертають True, якщо потрібна повна перебудова (rebuild).
+    """
+
+    def __init__(self, store: ColumnStore = None):
+        self.store = store if store is not None else ColumnStore()
+        self.stats = {}      # _Column -> RunningStats
+        self.factors = []    # _Column-и факторів (≤ LIVE_FACTORS)
+        self.groups = {}     # (фактор, стовпець) -> {рівень: [n, s1, s2]}
+        self._kinds = {}
+
+    # ---- повна перебудова ----
+    def rebuild(self, store: ColumnStore = None):
+        if store is not None:
+            self.store = store
+        cols = self.store.columns
+        self._kinds = {c: c.kind for c in cols}
+        self.stats = {c: RunningStats(c.values) for c in cols if c.kind == NUM}
+        self.factors = []
+        # порожня таблиця — без infer_roles (і без імпорту pandas при старті)
+        if any(not c.is_empty().all() for c in cols):
+            from data_input import infer_roles
+            roles = infer_roles(self.store.to_frame())
+            by_name = {c.name: c for c in cols}
+            self.factors = [by_name[f] for f in roles["factors"][:LIVE_FACTORS] if f in by_name]
+        self.groups = {}
+        for f in self.factors:
+            keys = self._keys(f, slice(None))
+            for c in self.indicators():
+                g = self.groups[(f, c)] = {}
+                self._accumulate(g, keys, c.values, 1, self.stats[c].shift)
+
+    def indicators(self) -> list:
+        """Числові стовпці, що не є факторами, у порядку таблиці."""
+        return [c for c in self.store.columns if c in self.stats and c not in self.factors]
+
+    # ---- допоміжне ----
+    @staticmethod
+    def _keys(f, rows, values=None) -> np.ndarray:
+        """Рівні фактора для рядків: коди (CAT) або значення (NUM); None/NaN → невалідні."""
+        v = f.values[rows] if values is None else values
+        return v.astype(float) if f.kind == NUM else np.where(v < 0, np.nan, v).astype(float)
+
+    @staticmethod
+    def _accumulate(groups: dict, keys: np.ndarray, vals: np.ndarray, sign: int, shift: float):
+        ok = ~np.isnan(keys) & ~np.isnan(vals)
+        if not ok.any():
+            return
+        uk, inv = np.unique(keys[ok], return_inverse=True)
+        d = vals[ok] - shift
+        n = np.bincount(inv, minlength=len(uk))
+        s1 = np.bincount(inv, d, len(uk))
+        s2 = np.bincount(inv, d * d, len(uk))
+        for k, a, b, c in zip(uk.tolist(), n.tolist(), s1.tolist(), s2.tolist()):
+            g = groups.get(k)
+            if g is None:
+                g = groups[k] = [0, 0.0, 0.0]
+            g[0] += sign * a
+            g[1] += sign * b
+            g[2] += sign * c
+            if g[0] <= 0:
+                del groups[k]
+
+    def _apply(self, rows, old_vals: dict, sign_new: bool):
+        """
+        Віднімає внесок старих значень рядків rows і (якщо sign_new) додає нові.
+        old_vals — {стовпець: масив до зміни} для змінених стовпців; решта читається зі сховища.
+        """
+        for c, st in self.stats.items():
+            if c in old_vals:
+                st.remove(old_vals[c])
+                if sign_new:
+                    st.add(c.values[rows])
+            elif not sign_new:
+                st.remove(c.values[rows])
+        for f in self.factors:
+            f_changed = f in old_vals
+            old_keys = self._keys(f, rows, old_vals[f]) if f_changed else self._keys(f, rows)
+            new_keys = self._keys(f, rows) if sign_new else None
+            for c in self.indicators():
+                c_changed = c in old_vals
+                if sign_new and not (f_changed or c_changed):
+                    continue
+                g, shift = self.groups[(f, c)], self.stats[c].shift
+                self._accumulate(g, old_keys, old_vals[c] if c_changed else c.values[rows], -1, shift)
+                if sign_new:
+                    self._accumulate(g, new_keys, c.values[rows], 1, shift)
+
+    # ---- дельти ----
+    def block_edited(self, top: int, left: int, old: list) -> bool:
+        cols = self.store.columns[left:left + len(old)]
+        if any(self._kinds.get(c) != c.kind for c in cols):
+            return True
+        rows = slice(top, top + max((len(o) for o in old), default=0))
+        self._apply(rows, dict(zip(cols, old)), True)
+        return False
+
+    def rows_inserted(self, first: int, count: int) -> bool:
+        rows = slice(first, first + count)
+        for c, st in self.stats.items():
+            st.add(c.values[rows])
+        for f in self.factors:
+            keys = self._keys(f, rows)
+            for c in self.indicators():
+                self._accumulate(self.groups[(f, c)], keys, c.values[rows], 1, self.stats[c].shift)
+        return False
+
+    def rows_removing(self, first: int, count: int) -> bool:
+        self._apply(slice(first, first + count), {}, False)
+        return False
+
+    def columns_removing(self, first: int, count: int) -> bool:
+        cols = self.store.columns[first:first + count]
+        if any(c in self.factors for c in cols):
+            return True
+        for c in cols:
+            self.stats.pop(c, None)
+            self._kinds.pop(c, None)
+            for f in self.factors:
+                self.groups.pop((f, c), None)
+        return False
+
+    def columns_inserted(self, first: int, count: int) -> bool:
+        for c in self.store.columns[first:first + count]:
+            self._kinds[c] = c.kind
+            if c.kind != NUM:
+                return True
+            self.stats[c] = RunningStats(c.values)
+            for f in self.factors:
+                self.groups[(f, c)] = {}
+        return False
+
+    # ---- результати ----
+    def summary(self) -> list:
+        """[{name, n, mean, sd, cv, min, max}] по показниках."""
+        out = []
+        for c in self.indicators():
+            st = self.stats[c]
+            mn, mx = st.min_max(c.values)
+            mean, sd = st.mean, st.sd
+            cv = 100 * sd / abs(mean) if mean == mean and mean != 0 else np.nan
+            out.append({"name": c.name, "n": st.n, "mean": mean, "sd": sd, "cv": cv, "min": mn, "max": mx})
+        return out
+
+    def group_summary(self, indicator: int, factor: int = 0) -> list:
+        """[{level, n, mean, sd}] показника (індекс стовпця) за factor-м фактором."""
+        if factor >= len(self.factors) or not 0 <= indicator < self.store.n_cols:
+            return []
+        f, c = self.factors[factor], self.store.columns[indicator]
+        g = self.groups.get((f, c))
+        if g is None:
+            return []
+        shift = self.stats[c].shift
+        out = []
+        for k in sorted(g):
+            n, s1, s2 = g[k]
+            label = _fmt(k) if f.kind == NUM else f.categories[int(k)]
+            mean, sd = _moments(n, s1, s2, shift)
+            out.append({"level": label, "n": n, "mean": mean, "sd": sd})
+        return out
@@ -1,11 +1,47 @@
+import csv
+import io
+import multiprocessing
+import os
 import sys
-from PyQt5.QtCore import Qt, QRectF
-from PyQt5.QtGui import QIcon, QPixmap, QPainter, QLinearGradient, QColor, QBrush, QPainterPath, QFont, QPen
+import threading
+
+import numpy as np
+from PyQt5.QtCore import Qt, QRectF, QThread, QTimer
+from PyQt5.QtGui import QIcon, QPixmap, QPainter, QLinearGradient, QColor, QBrush, QPainterPath, QFont, QPen, QKeySequence
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QTableWidget, QTableWidgetItem, QAction, QFileDialog,
-    QMessageBox, QMenu, QInputDialog, QToolBar
+    QApplication, QMainWindow, QTableView, QHeaderView, QAction, QFileDialog,
+    QMessageBox, QMenu, QInputDialog, QToolBar, QProgressBar, QPushButton, QLabel
 )
 
+from column_store import ColumnStore
+from table_model import CellDelegate, DataTableModel, RowViewModel
+from jobs import JobRunner
+from cache import ResultCache
+from summary_panel import SummaryPanel
+import profiling
+
+# Вікно показується лише з PyQt і NumPy; модулі аналізу імпортуються у функціях
+# і завчасно підвантажуються у фоні (warm_up), поки користувач працює з таблицею.
+WARM_UP_MODULES = ("pandas", "data_input", "scipy.stats", "matplotlib.figure", "seaborn", "docx", "analysis")
+
+
+def warm_up(modules=WARM_UP_MODULES):
+    """Фоновий імпорт важких модулів. SAD_NO_WARMUP=1 вимикає (для вимірювань)."""
+    if os.environ.get("SAD_NO_WARMUP"):
+        return None
+
+    def run():
+        import importlib
+        for name in modules:
+            try:
+                importlib.import_module(name)
+            except Exception:
+                pass  # помилку покаже перший справжній імпорт модуля
+
+    thread = threading.Thread(target=run, name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
 
 def create_app_icon() -> QIcon:
     """Створює яскраву сучасну іконку 'SAD' динамічно (без зовнішніх файлів)."""
@@ -33,58 +69,235 @@ def create_app_icon() -> QIcon:
     return QIcon(px)
 
 
-class TableWidget(QTableWidget):
+# стільки рядків переглядає autosize_columns; ширший за AUTOSIZE_MAX_WIDTH стовпець не робиться
+AUTOSIZE_SAMPLE = 200
+AUTOSIZE_MAX_WIDTH = 400
+
+
+class TableWidget(QTableView):
+    """
+    Таблиця даних: QTableView над стовпчиковим сховищем (DataTableModel) через
+    подання рядків (RowViewModel: сортування, фільтр, групування без копіювання).
+    model() — подання, номери рядків у ньому — номери показу; data_model() —
+    дані з номерами рядків сховища (сигнали, кеш, підсумки працюють з ними).
+    """
+
     def __init__(self, rows=10, cols=6, parent=None):
-        super().__init__(rows, cols, parent)
-        self.setHorizontalHeaderLabels([f"Колонка {i+1}" for i in range(cols)])
+        super().__init__(parent)
+        self._data = DataTableModel(ColumnStore(rows, cols), self)
+        self.setModel(RowViewModel(self._data, self))
+        self.setItemDelegate(CellDelegate(self.model(), self))
+        self.model().view_changed.connect(self._sync_sort_indicator)
         self.setContextMenuPolicy(Qt.CustomContextMenu)
         self.customContextMenuRequested.connect(self.open_context_menu)
         self.setAlternatingRowColors(True)
         self.setCornerButtonEnabled(True)
-        self.resizeColumnsToContents()
+        self.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        # клік по заголовку сортує (RowViewModel.sort); спершу без сортування
+        self.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.setSortingEnabled(True)
+        self.autosize_columns()
+
+    def data_model(self) -> DataTableModel:
+        return self._data
+
+    # ---- сумісні з QTableWidget допоміжні методи ----
+    def rowCount(self):
+        return self.model().rowCount()
+
+    def columnCount(self):
+        return self.model().columnCount()
+
+    def currentRow(self):
+        return self.currentIndex().row()
+
+    def currentColumn(self):
+        return self.currentIndex().column()
+
+    def insertRow(self, row):
+        """Вставка перед рядком показу row; активне подання скидається, щоб новий рядок було видно."""
+        src = self.model().source_row(row)
+        self.clear_view()
+        self._data.insertRows(src, 1)
+
+    def removeRow(self, row):
+        self._data.removeRows(self.model().source_row(row), 1)
+
+    def insertColumn(self, col):
+        self._data.insertColumns(col, 1)
+
+    def removeColumn(self, col):
+        self._data.removeColumns(col, 1)
+
+    def header_text(self, col):
+        return self._data.headerData(col, Qt.Horizontal)
+
+    def set_header_text(self, col, text):
+        self._data.setHeaderData(col, Qt.Horizontal, text)
+
+    def reset_table(self, rows, cols):
+        self._data.set_store(ColumnStore(rows, cols))
+        self.autosize_columns()
+
+    # ---- подання: сортування, фільтр, групування ----
+    def _current_column(self):
+        """Об'єкт поточного стовпця сховища — ним подання посилаються на стовпці (row_views)."""
+        col = self.currentColumn()
+        return self._data.store.columns[col] if 0 <= col < self._data.store.n_cols else None
+
+    def sort_current_column(self, descending: bool = False):
+        column = self._current_column()
+        if column is not None:
+            self.model().update_spec(sort=(column, descending))
+
+    def group_by_current_column(self):
+        column = self._current_column()
+        if column is not None:
+            self.model().update_spec(group=column)
+
+    def set_column_filter(self, column, cond):
+        """cond — умова row_views.filter_mask для стовпця column; None — прибрати фільтр стовпця."""
+        filters = dict(self.model().spec.get("filter") or {})
+        if cond:
+            filters[column] = cond
+        else:
+            filters.pop(column, None)
+        self.model().update_spec(filter=filters)
+
+    def filter_by_current_value(self):
+        """Лише рядки з тим самим значенням у поточному стовпці, що й у поточній комірці."""
+        column = self._current_column()
+        if column is not None:
+            self.set_column_filter(column, {"values": [self.currentIndex().data()]})
+
+    def edit_current_filter(self):
+        from filter_dialog import FilterDialog
+        col = self.currentColumn()
+        if not 0 <= col < self._data.store.n_cols:
+            QMessageBox.information(self, "Фільтр", "Оберіть стовпчик для фільтра.")
+            return
+        column = self._data.store.columns[col]
+        dlg = FilterDialog(column, (self.model().spec.get("filter") or {}).get(column), self)
+        if dlg.exec_():
+            self.set_column_filter(column, dlg.condition())
+
+    def clear_filter(self):
+        self.model().update_spec(filter=None)
+
+    def clear_view(self):
+        if self.model().spec:
+            self.model().apply({})
+
+    def filtered_rows(self):
+        """Рядки сховища поточного фільтра (для аналізу) або None, якщо фільтра немає."""
+        return self.model().filtered_rows()
+
+    def _sync_sort_indicator(self):
+        sort = self.model().spec.get("sort")
+        columns = self._data.store.columns
+        section = next((j for j, col in enumerate(columns) if sort and col is sort[0]), -1)
+        order = Qt.DescendingOrder if sort and sort[1] else Qt.AscendingOrder
+        header = self.horizontalHeader()
+        header.blockSignals(True)
+        header.setSortIndicator(section, order)
+        header.blockSignals(False)
 
     def keyPressEvent(self, event):
-        if event.matches(event.StandardKey.Copy):
+        if event.matches(QKeySequence.Copy):
             self.copy_selection_to_clipboard()
             return
-        if event.matches(event.StandardKey.Paste):
+        if event.matches(QKeySequence.Paste):
             self.paste_from_clipboard()
             return
         super().keyPressEvent(event)
 
     def copy_selection_to_clipboard(self):
-        ranges = self.selectedRanges()
+        """
+        Копіює виділення як TSV. Кілька діапазонів зводяться в одну таблицю
+        за об'єднанням їх рядків і стовпців; невиділені комірки — порожні.
+        Комірки з табуляцією, переносом рядка чи лапками беруться в лапки,
+        як у Excel, — data_input.read_tsv_text читає їх назад без змін.
+        """
+        ranges = list(self.selectionModel().selection())
         if not ranges:
             return
-        r = ranges[0]
-        rows = []
-        for i in range(r.topRow(), r.bottomRow() + 1):
-            cells = []
-            for j in range(r.leftColumn(), r.rightColumn() + 1):
-                it = self.item(i, j)
-                cells.append("" if it is None else it.text())
-            rows.append("\t".join(cells))
-        text = "\n".join(rows)
-        QApplication.clipboard().setText(text)
+        store = self._data.store
+        n = self.model().rowCount()
+        row_mask = np.zeros(n, dtype=bool)
+        for r in ranges:
+            row_mask[r.top():r.bottom() + 1] = True
+        rows = np.flatnonzero(row_mask)
+        # у порядку показу: рядки подання -> рядки сховища
+        source = self.model().source_rows(rows)
+        cols = sorted({j for r in ranges for j in range(r.left(), r.right() + 1)})
+        out = []
+        for j in cols:
+            texts = store.columns[j].texts(source)
+            picked = np.zeros(n, dtype=bool)
+            for r in ranges:
+                if r.left() <= j <= r.right():
+                    picked[r.top():r.bottom() + 1] = True
+            picked = picked[rows]
+            if not picked.all():
+                texts = [t if p else "" for t, p in zip(texts, picked.tolist())]
+            out.append(texts)
+        buf = io.StringIO()
+        csv.writer(buf, delimiter="\t", quoting=csv.QUOTE_MINIMAL, lineterminator="\r\n").writerows(zip(*out))
+        QApplication.clipboard().setText(buf.getvalue()[:-2])
 
     def paste_from_clipboard(self):
+        """
+        Вставка TSV з буфера: розбір одним викликом read_tsv_text, таблиця
+        збільшується одним кроком, запис — стовпцями одним блоком; на час
+        вставки перемальовування вимкнене. Вставляється у суцільні рядки
+        сховища, тож активне подання спершу скидається.
+        """
+        from data_input import read_tsv_text
         text = QApplication.clipboard().text()
         if not text:
             return
-        start_row = self.currentRow() if self.currentRow() >= 0 else 0
+        start_row = self.model().source_row(self.currentRow()) if self.currentRow() >= 0 else 0
         start_col = self.currentColumn() if self.currentColumn() >= 0 else 0
-        lines = [l for l in text.splitlines() if l.strip() != ""]
-        for r_offset, line in enumerate(lines):
-            cells = line.split("\t")
-            while start_row + r_offset >= self.rowCount():
-                self.insertRow(self.rowCount())
-            while start_col + len(cells) - 1 >= self.columnCount():
-                self.insertColumn(self.columnCount())
-                self.setHorizontalHeaderItem(self.columnCount()-1, QTableWidgetItem(f"Колонка {self.columnCount()}"))
-            for c_offset, value in enumerate(cells):
-                item = QTableWidgetItem(value)
-                self.setItem(start_row + r_offset, start_col + c_offset, item)
-        self.resizeColumnsToContents()
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        self.setUpdatesEnabled(False)
+        try:
+            columns = read_tsv_text(text)
+            if not columns:
+                return
+            self.clear_view()
+            model = self._data
+            need_rows = start_row + len(columns[0]) - model.rowCount()
+            if need_rows > 0:
+                model.insertRows(model.rowCount(), need_rows)
+            need_cols = start_col + len(columns) - model.columnCount()
+            if need_cols > 0:
+                model.insertColumns(model.columnCount(), need_cols)
+            model.set_columns(start_row, start_col, columns)
+            self.autosize_columns(range(start_col, start_col + len(columns)))
+        finally:
+            self.setUpdatesEnabled(True)
+            QApplication.restoreOverrideCursor()
+
+    def autosize_columns(self, columns=None, sample: int = AUTOSIZE_SAMPLE):
+        """
+        Ширина стовпців за заголовком і вибіркою рядків (перші та рівномірно
+        розподілені), а не за всіма — як resizeColumnsToContents, але за O(sample).
+        """
+        store = self._data.store
+        n = store.n_rows
+        if n <= sample:
+            rows = np.arange(n)
+        else:
+            rows = np.unique(np.concatenate([np.arange(sample // 4), np.linspace(0, n - 1, sample).astype(np.int64)]))
+        fm = self.fontMetrics()
+        hfm = self.horizontalHeader().fontMetrics()
+        for c in (range(store.n_cols) if columns is None else columns):
+            col = store.columns[c]
+            width = hfm.horizontalAdvance(col.name) + 24
+            texts = col.texts(rows)
+            if texts:
+                width = max(width, max(fm.horizontalAdvance(t) for t in texts) + 16)
+            self.setColumnWidth(c, min(width, AUTOSIZE_MAX_WIDTH))
 
     def open_context_menu(self, pos):
         menu = QMenu(self)
@@ -97,6 +310,13 @@ class TableWidget(QTableWidget):
         act_del_col = menu.addAction("Видалити стовпчик")
         menu.addSeparator()
         act_rename = menu.addAction("Перейменувати стовпчик…")
+        menu.addSeparator()
+        value = self.currentIndex().data() if self.currentIndex().isValid() else None
+        act_only = menu.addAction(f"Лише «{value or '(порожньо)'}»") if value is not None else None
+        act_filter = menu.addAction("Фільтр за стовпчиком…")
+        act_group = menu.addAction("Групувати за стовпчиком")
+        act_clear = menu.addAction("Скинути фільтр, сортування і групування")
+        act_clear.setEnabled(bool(self.model().spec))
 
         act = menu.exec_(self.viewport().mapToGlobal(pos))
         if act == act_copy:
@@ -111,25 +331,32 @@ class TableWidget(QTableWidget):
         elif act == act_add_col:
             col = self.currentColumn()
             if col < 0:
-                col = self.columnCount()
+                col = self.columnCount() - 1
             self.insertColumn(col + 1)
-            self.setHorizontalHeaderItem(col + 1, QTableWidgetItem(f"Колонка {col + 2}"))
         elif act == act_del_col:
             if self.columnCount() > 0 and self.currentColumn() >= 0:
                 self.removeColumn(self.currentColumn())
         elif act == act_rename:
             self.rename_current_column()
+        elif act is not None and act == act_only:
+            self.filter_by_current_value()
+        elif act == act_filter:
+            self.edit_current_filter()
+        elif act == act_group:
+            self.group_by_current_column()
+        elif act == act_clear:
+            self.clear_view()
 
     def rename_current_column(self):
         col = self.currentColumn()
         if col < 0:
             QMessageBox.information(self, "Перейменування", "Оберіть стовпчик для перейменування.")
             return
-        current = self.horizontalHeaderItem(col).text() if self.horizontalHeaderItem(col) else f"Колонка {col+1}"
+        current = self.header_text(col) or f"Колонка {col+1}"
         new_name, ok = QInputDialog.getText(self, "Перейменувати стовпчик", "Нова назва:", text=current)
         if ok and new_name.strip():
-            self.setHorizontalHeaderItem(col, QTableWidgetItem(new_name.strip()))
-            self.resizeColumnsToContents()
+            self.set_header_text(col, new_name.strip())
+            self.autosize_columns()
 
 
 class MainWindow(QMainWindow):
@@ -141,6 +368,23 @@ class MainWindow(QMainWindow):
         self.table = TableWidget(10, 6, self)
         self.setCentralWidget(self.table)
         self.statusBar().showMessage("Готово")
+        self._import_thread = None
+        self._import_worker = None
+        self.project_path = None
+        self.analysis_settings = {}
+        self.jobs = JobRunner(self)
+        self.jobs.job_progress.connect(self._on_job_progress)
+        self.jobs.job_finished.connect(self._on_job_finished)
+        self.jobs.job_failed.connect(self._on_job_failed)
+        self.jobs.idle.connect(self._on_jobs_idle)
+        self._job_progress = {}
+        self._analysis = None
+        self.result_cache = ResultCache()
+        self._watch_model()
+        profiling.start_from_env()
+        self._build_task_status()
+        self.summary = SummaryPanel(self.table, self)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.summary)
         self._build_menus()
         self._build_toolbar()
 
@@ -150,6 +394,15 @@ class MainWindow(QMainWindow):
         act_new = QAction("Новий", self)
         act_new.triggered.connect(self.new_table)
         m_file.addAction(act_new)
+        act_open = QAction("Відкрити…", self)
+        act_open.triggered.connect(self.open_file)
+        m_file.addAction(act_open)
+        act_save = QAction("Зберегти проєкт", self)
+        act_save.triggered.connect(self.save_project)
+        m_file.addAction(act_save)
+        act_save_as = QAction("Зберегти проєкт як…", self)
+        act_save_as.triggered.connect(self.save_project_as)
+        m_file.addAction(act_save_as)
         act_exit = QAction("Вихід", self)
         act_exit.triggered.connect(self.close)
         m_file.addAction(act_exit)
@@ -171,7 +424,48 @@ class MainWindow(QMainWindow):
         act_rename.triggered.connect(self.table.rename_current_column)
         m_edit.addAction(act_rename)
 
+        m_view = menubar.addMenu("Подання")
+        act_sort_asc = QAction("Сортувати за зростанням", self)
+        act_sort_asc.triggered.connect(lambda: self.table.sort_current_column(False))
+        m_view.addAction(act_sort_asc)
+        act_sort_desc = QAction("Сортувати за спаданням", self)
+        act_sort_desc.triggered.connect(lambda: self.table.sort_current_column(True))
+        m_view.addAction(act_sort_desc)
+        act_group = QAction("Групувати за стовпчиком", self)
+        act_group.triggered.connect(self.table.group_by_current_column)
+        m_view.addAction(act_group)
+        m_view.addSeparator()
+        act_only = QAction("Фільтр за значенням комірки", self)
+        act_only.triggered.connect(self.table.filter_by_current_value)
+        m_view.addAction(act_only)
+        act_filter = QAction("Фільтр за стовпчиком…", self)
+        act_filter.triggered.connect(self.table.edit_current_filter)
+        m_view.addAction(act_filter)
+        act_clear_filter = QAction("Скинути фільтр", self)
+        act_clear_filter.triggered.connect(self.table.clear_filter)
+        m_view.addAction(act_clear_filter)
+        act_clear_view = QAction("Скинути подання", self)
+        act_clear_view.triggered.connect(self.table.clear_view)
+        m_view.addAction(act_clear_view)
+
+        m_analysis = menubar.addMenu("Аналіз")
+        act_run = QAction("Запустити аналіз", self)
+        act_run.triggered.connect(lambda: self.start_analysis())
+        m_analysis.addAction(act_run)
+        self.act_run_filtered = QAction("Аналіз поточного фільтра", self)
+        self.act_run_filtered.triggered.connect(lambda: self.start_analysis(self.table.filtered_rows()))
+        self.act_run_filtered.setEnabled(False)
+        m_analysis.addAction(self.act_run_filtered)
+        act_stop = QAction("Скасувати аналіз", self)
+        act_stop.triggered.connect(self.cancel_analysis)
+        m_analysis.addAction(act_stop)
+        m_analysis.addSeparator()
+        m_analysis.addAction(self.summary.toggleViewAction())
+
         m_help = menubar.addMenu("Довідка")
+        act_diag = QAction("Діагностика продуктивності…", self)
+        act_diag.triggered.connect(self.show_diagnostics)
+        m_help.addAction(act_diag)
         act_about = QAction("Про програму", self)
         act_about.triggered.connect(self.show_about)
         m_help.addAction(act_about)
@@ -187,12 +481,334 @@ class MainWindow(QMainWindow):
         a_del_row.triggered.connect(lambda: (self.table.rowCount() and self.table.currentRow() >= 0 and self.table.removeRow(self.table.currentRow())))
         tb.addAction(a_del_row)
 
+    def _build_task_status(self):
+        """Прогрес і кнопка скасування у рядку стану — спільні для імпорту й аналізу."""
+        self.task_progress = QProgressBar(self)
+        self.task_progress.setRange(0, 100)
+        self.task_progress.setMaximumWidth(200)
+        self.task_cancel = QPushButton("Скасувати", self)
+        self.task_cancel.clicked.connect(lambda: self._task_cancel_fn and self._task_cancel_fn())
+        self._task_cancel_fn = None
+        # час етапів останнього імпорту/аналізу (лише коли ввімкнено вимірювання)
+        self.timing_label = QLabel(self)
+        self.timing_label.hide()
+        self.statusBar().addPermanentWidget(self.timing_label)
+        # поточне подання таблиці (фільтр, сортування, групування)
+        self.view_label = QLabel(self)
+        self.view_label.hide()
+        self.statusBar().addPermanentWidget(self.view_label)
+        self.table.model().view_changed.connect(self._on_view_changed)
+        self.statusBar().addPermanentWidget(self.task_progress)
+        self.statusBar().addPermanentWidget(self.task_cancel)
+        self.task_progress.hide()
+        self.task_cancel.hide()
+
+    @staticmethod
+    def _timing_mark():
+        s = profiling.current()
+        return (s, s.snapshot()) if s is not None else None
+
+    def _show_timings(self, mark):
+        """Час етапів з моменту mark (_timing_mark) у рядку стану."""
+        s = profiling.current()
+        if mark is None or mark[0] is not s:
+            self.timing_label.hide()
+            return
+        times = s.since(mark[1])
+        self.timing_label.setText("⏱ " + profiling.format_times(times))
+        self.timing_label.setToolTip("\n".join(f"{profiling.STAGES.get(k, k)}: {v:.3f} с" for k, v in times.items()))
+        self.timing_label.setVisible(bool(times))
+
+    def _on_view_changed(self):
+        view = self.table.model()
+        self.view_label.setText(view.describe())
+        self.view_label.setVisible(view.rows is not None)
+        self.act_run_filtered.setEnabled(view.is_filtered())
+
+    def _show_task(self, cancel_fn):
+        self._task_cancel_fn = cancel_fn
+        self.task_progress.setValue(0)
+        self.task_progress.show()
+        self.task_cancel.show()
+
+    def _hide_task(self):
+        self._task_cancel_fn = None
+        self.task_progress.hide()
+        self.task_cancel.hide()
+
+    def open_file(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Відкрити", "", "Проєкт SAD або дані (*.sad *.csv *.xlsx *.xls)")
+        if not path:
+            return
+        if path.lower().endswith(".sad"):
+            self.open_project(path)
+        else:
+            self.start_import(path)
+
+    def open_project(self, path):
+        from project import load_project
+        try:
+            store, meta = load_project(path)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Помилка відкриття", str(e))
+            return
+        self.table.data_model().set_store(store)
+        self.table.autosize_columns()
+        self.analysis_settings = meta["settings"]
+        self.project_path = path
+        self.statusBar().showMessage(f"Відкрито проєкт: {path}", 5000)
+
+    def save_project(self):
+        if self.project_path is None:
+            self.save_project_as()
+            return
+        from project import save_project
+        store = self.table.data_model().store
+        try:
+            save_project(self.project_path, store, self.analysis_settings)
+        except OSError as e:
+            QMessageBox.critical(self, "Помилка збереження", str(e))
+            return
+        self.statusBar().showMessage(f"Проєкт збережено: {self.project_path}", 5000)
+
+    def save_project_as(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Зберегти проєкт", "", "Проєкт SAD (*.sad)")
+        if not path:
+            return
+        if not path.lower().endswith(".sad"):
+            path += ".sad"
+        self.project_path = path
+        self.save_project()
+
+    def start_import(self, path):
+        from importer import ImportWorker
+        if self._import_thread is not None:
+            return
+        self.table.data_model().set_store(ColumnStore())
+        self._import_path = path
+        self._import_timing = self._timing_mark()
+        self._import_thread = QThread(self)
+        self._import_worker = ImportWorker(path)
+        self._import_worker.moveToThread(self._import_thread)
+        self._import_thread.started.connect(self._import_worker.run)
+        self._import_worker.chunk.connect(self._on_import_chunk)
+        self._import_worker.progress.connect(self.task_progress.setValue)
+        self._import_worker.finished.connect(self._on_import_finished)
+        self._import_worker.failed.connect(self._on_import_failed)
+        self._show_task(self.cancel_import)
+        self.statusBar().showMessage(f"Імпорт: {path}")
+        self._import_thread.start()
+
+    def cancel_import(self):
+        if self._import_worker is not None:
+            self._import_worker.cancel()
+
+    # слоти імпорту: сигнали, поставлені в чергу до _stop_import (напр. із
+    # closeEvent), можуть прийти вже після нього — тоді імпорту більше немає
+    def _on_import_chunk(self, df):
+        if self._import_worker is None:
+            return
+        self.table.data_model().append_frame(df)
+        self._import_worker.chunk_consumed()
+        self.statusBar().showMessage(f"Імпорт: {self.table.rowCount()} рядків…")
+
+    def _on_import_finished(self, cancelled):
+        if self._import_worker is None:
+            return
+        self._stop_import()
+        # ролі стовпців — за всіма даними, а не лише за першою порцією
+        self.summary.schedule_rebuild()
+        if self.table.columnCount() == 0:
+            self.table.data_model().insertColumns(0, 1)
+        if self.table.rowCount() == 0:
+            self.table.data_model().insertRows(0, 1)
+        self.table.autosize_columns()
+        self._show_timings(self._import_timing)
+        if cancelled:
+            self.statusBar().showMessage(f"Імпорт скасовано, завантажено {self.table.rowCount()} рядків", 5000)
+        else:
+            self.statusBar().showMessage(f"Імпортовано {self.table.rowCount()} рядків: {self._import_path}", 5000)
+
+    def _on_import_failed(self, msg):
+        if self._import_worker is None:
+            return
+        self._stop_import()
+        self.table.reset_table(10, 6)
+        QMessageBox.critical(self, "Помилка імпорту", msg)
+
+    def _stop_import(self):
+        if self._import_worker is None:
+            return
+        worker = self._import_worker
+        for signal in (worker.chunk, worker.progress, worker.finished, worker.failed):
+            signal.disconnect()
+        self._import_thread.quit()
+        self._import_thread.wait()
+        self._import_worker.deleteLater()
+        self._import_thread.deleteLater()
+        self._import_thread = None
+        self._import_worker = None
+        self.project_path = None
+        self.analysis_settings = {}
+        self._hide_task()
+
+    # ---- фоновий аналіз ----
+    def _watch_model(self):
+        """Редагування, вставка і вилучення рядків чи стовпців одразу вилучають з кешу залежні результати."""
+        model = self.table.data_model()
+        model.dataChanged.connect(lambda tl, br, roles=None: self.result_cache.invalidate_columns(
+            model.store.names[tl.column():br.column() + 1]))
+        model.headerDataChanged.connect(lambda orient, first, last: self.result_cache.invalidate_columns(
+            model.store.names[first:last + 1]))
+        # нові чи вилучені рядки змінюють дані кожного стовпця
+        model.rowsInserted.connect(lambda parent, first, last: self.result_cache.invalidate_columns(
+            model.store.names))
+        model.rowsRemoved.connect(lambda parent, first, last: self.result_cache.invalidate_columns(
+            model.store.names))
+        # поки стовпці ще в сховищі, їхні імена відомі
+        model.columnsAboutToBeRemoved.connect(lambda parent, first, last: self.result_cache.invalidate_columns(
+            model.store.names[first:last + 1]))
+        model.modelReset.connect(self.result_cache.clear)
+
+    def _ask_report_path(self) -> str:
+        """Куди зберегти звіт; за замовчуванням — останній шлях або поруч із проєктом."""
+        from export_word import DEFAULT_REPORT
+        default = self.analysis_settings.get("report_path")
+        if not default:
+            base = os.path.dirname(self.project_path) if self.project_path else os.getcwd()
+            default = os.path.join(base, DEFAULT_REPORT)
+        path, _ = QFileDialog.getSaveFileName(self, "Зберегти звіт", default, "Документ Word (*.docx)")
+        if path:
+            if not path.lower().endswith(".docx"):
+                path += ".docx"
+            self.analysis_settings["report_path"] = path
+        return path
+
+    def start_analysis(self, rows=None):
+        """
+        Показники з кешу беруться одразу; решта ділиться на пакети за кількістю
+        потоків. Звіт — після завершення всіх пакетів.
+        rows — лише ці рядки сховища (аналіз поточного фільтра).
+        """
+        from analysis import analyze_indicators, analysis_plan, role_columns, indicator_key
+        from data_input import df_from_table
+        from row_views import fingerprint
+        if self._analysis is not None or self._import_thread is not None:
+            return
+        timing = self._timing_mark()
+        store = self.table.data_model().store
+        with profiling.stage("table"):
+            df = df_from_table(self.table, rows)
+        indicators, roles = analysis_plan(df)
+        if not indicators:
+            QMessageBox.information(self, "Аналіз", "У таблиці немає числових показників."
+                                    if rows is None else "У відфільтрованих рядках немає числових показників.")
+            return
+        report = self._ask_report_path()
+        if not report:
+            return
+        fps = store.fingerprints()
+        subset = fingerprint(rows)
+        keys = {col: indicator_key(fps, col, roles, subset) for col in indicators}
+        parts = {}
+        for col in indicators:
+            hit = self.result_cache.get(keys[col])
+            if hit is not None:
+                parts[col] = hit
+        todo = [c for c in indicators if c not in parts]
+        # знімок даних: таблицю можна редагувати, поки аналіз працює у фоні
+        with profiling.stage("table"):
+            df = df[indicators + [c for c in role_columns(roles) if c not in indicators]].copy()
+        self._analysis = {"df": df, "indicators": indicators, "roles": roles, "keys": keys,
+                          "report": report, "parts": parts, "stage": "indicators", "failed": [],
+                          "timing": timing}
+        self._job_progress = {}
+        self._show_task(self.cancel_analysis)
+        if not todo:
+            self._on_jobs_idle()
+            return
+        n_jobs = min(len(todo), self.jobs.pool.maxThreadCount())
+        for i in range(n_jobs):
+            jid = self.jobs.submit(f"indicators:{i}", analyze_indicators, df, todo[i::n_jobs], roles)
+            self._job_progress[jid] = 0
+        scope = "" if rows is None else f", фільтр: {len(df)} рядків"
+        self.statusBar().showMessage(
+            f"Аналіз: {len(todo)} показників (з кешу: {len(indicators) - len(todo)}{scope})…")
+
+    def cancel_analysis(self):
+        if self._analysis is not None:
+            self._analysis["cancelled"] = True
+            self.jobs.cancel()
+
+    def _on_job_progress(self, job_id, percent):
+        if job_id in self._job_progress:
+            self._job_progress[job_id] = percent
+            self.task_progress.setValue(sum(self._job_progress.values()) // len(self._job_progress))
+
+    def _on_job_finished(self, job_id, result):
+        from analysis import split_results, role_columns
+        state = self._analysis
+        if state is not None and job_id.startswith("indicators:"):
+            deps = role_columns(state["roles"])
+            for col, part in split_results(result).items():
+                state["parts"][col] = part
+                self.result_cache.put(state["keys"][col], part, [col] + deps)
+            self._job_progress[job_id] = 100
+
+    def _on_job_failed(self, job_id, message):
+        if self._analysis is not None:
+            self._analysis["failed"].append((job_id, message))
+
+    def _on_jobs_idle(self):
+        from analysis import build_report, merge_results, resampling_outcome
+        state = self._analysis
+        if state is None:
+            return
+        if state.get("cancelled"):
+            self._finish_analysis("Аналіз скасовано")
+            return
+        if state["failed"]:
+            job_id, message = state["failed"][0]
+            self._finish_analysis("Аналіз завершився з помилкою")
+            QMessageBox.critical(self, "Помилка аналізу", f"{job_id}\n\n{message}")
+            return
+        if state["stage"] == "indicators":
+            state["results"] = merge_results([state["parts"][c] for c in state["indicators"]])
+            state["stage"] = "report"
+            jid = self.jobs.submit("report", build_report, state["df"], state["results"], state["indicators"],
+                                   state["report"])
+            self._job_progress = {jid: 0}
+            self.statusBar().showMessage("Аналіз: формування звіту Word…")
+            return
+        done, skipped = resampling_outcome(state["results"])
+        msg = f"Аналіз завершено. Результати збережено у {os.path.basename(state['report'])}."
+        if done:
+            msg += " Не нормальні: " + ", ".join(map(str, done)) + " (у звіті — бутстреп і перестановочні тести)."
+        if skipped:
+            msg += " Без бутстрепу: " + "; ".join(f"{col} — {why}" for col, why in skipped) + "."
+        self._finish_analysis(msg)
+
+    def _finish_analysis(self, message):
+        if self._analysis is not None:
+            self._show_timings(self._analysis["timing"])
+        self._analysis = None
+        self._job_progress = {}
+        self._hide_task()
+        self.statusBar().showMessage(message, 10000)
+
+    def closeEvent(self, event):
+        if self._import_worker is not None:
+            self._import_worker.cancel()
+            self._stop_import()
+        self.jobs.cancel()
+        self.jobs.pool.waitForDone()
+        super().closeEvent(event)
+
     def new_table(self):
-        self.table.clear()
-        self.table.setRowCount(10)
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels([f"Колонка {i+1}" for i in range(6)])
-        self.table.resizeColumnsToContents()
+        self.table.reset_table(10, 6)
+        self.project_path = None
+        self.analysis_settings = {}
         self.statusBar().showMessage("Створено нову таблицю 10×6", 3000)
 
     def add_column_after_current(self):
@@ -200,8 +816,11 @@ class MainWindow(QMainWindow):
         if col < 0:
             col = self.table.columnCount() - 1
         self.table.insertColumn(col + 1)
-        self.table.setHorizontalHeaderItem(col + 1, QTableWidgetItem(f"Колонка {col + 2}"))
-        self.table.resizeColumnsToContents()
+        self.table.autosize_columns()
+
+    def show_diagnostics(self):
+        from diagnostics_dialog import DiagnosticsDialog
+        DiagnosticsDialog(self).exec_()
 
     def show_about(self):
         QMessageBox.information(
@@ -215,7 +834,12 @@ class MainWindow(QMainWindow):
 
 
 if __name__ == "__main__":
+    # у зібраному exe (PyInstaller) процеси пулу графіків запускають той самий exe —
+    # без цього кожен із них відкрив би ще одне вікно
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     w = MainWindow()
     w.show()
+    # після першого малювання вікна
+    QTimer.singleShot(200, warm_up)
     sys.exit(app.exec_())
@@ -0,0 +1,181 @@
+"""
+Розбір чисел із тексту комірок — одне правило для редагування, вставки,
+імпорту і пакетного режиму.
+
+Крім звичайного запису (float) розуміє:
+  - десяткову кому: "3,14" -> 3.14;
+  - роздільники тисяч: пробіл / нерозривний пробіл / апостроф ("1 234,5"),
+    крапку при десятковій комі ("1.234,5") і кому при десятковій крапці
+    ("1,234.5", "1,234,567"); одиночний роздільник завжди десятковий;
+  - знак відсотка: "12,5 %" -> 0.125 (як в Excel);
+  - типографський мінус "−".
+Порожній текст — NaN (порожня комірка), нерозібраний — None. Те, що float()
+приймає, але в комірці не є числом, відкидається: "1_000", "inf", "nan".
+
+parse_numbers розбирає масив векторно: кожне унікальне значення розбирається
+один раз (після pd.factorize їх зазвичай на порядки менше, ніж комірок),
+результат розкладається по комірках індексуванням numpy. Якщо унікальних
+значень багато, звичайні числа і десяткова кома розбираються ufunc-ами
+numpy.strings, поштучно — лише решта.
+
+Модуль не залежить від Qt; pandas імпортується у функціях.
+"""
+import re
+from numbers import Real
+
+import numpy as np
+
+from profiling import timed
+
+# пробільні роздільники тисяч: лише між цифрою і групою рівно з трьох цифр
+_SPACE_GROUPS = re.compile("(?<=\\d)[ \u00a0\u202f'](?=\\d{3}(?!\\d))")
+_DOT_GROUPS = re.compile(r"[-+]?\d{1,3}(\.\d{3})+(,\d*)?")
+_COMMA_GROUPS = re.compile(r"[-+]?\d{1,3}(,\d{3})+(\.\d*)?")
+# від стількох унікальних значень розбір векторний (numpy.strings), а не поштучний
+VECTOR_MIN = 2_000
+# стільки перших унікальних значень перевіряється поштучно при strict=True
+PROBE = 64
+# частини, менші за цю, після невдалого векторного приведення розбираються поштучно
+CAST_MIN = 256
+# розмір порції parse_numbers, комірок
+CHUNK = 1_000_000
+
+
+def _parse_localized(s: str):
+    """Розбір тексту, який не прийняв float(): відсоток, роздільники, десяткова кома."""
+    scale = 1.0
+    if s.endswith("%"):
+        s, scale = s[:-1].rstrip(), 0.01
+    s = _SPACE_GROUPS.sub("", s.replace("\u2212", "-"))
+    if "," in s:
+        if "." in s or s.count(",") > 1:
+            if _DOT_GROUPS.fullmatch(s):
+                s = s.replace(".", "").replace(",", ".")
+            elif _COMMA_GROUPS.fullmatch(s):
+                s = s.replace(",", "")
+            else:
+                return None
+        else:
+            s = s.replace(",", ".")
+    elif s.count(".") > 1 and _DOT_GROUPS.fullmatch(s):
+        s = s.replace(".", "")
+    try:
+        return float(s) * scale
+    except ValueError:
+        return None
+
+
+def parse_number(value):
+    """float, NaN для порожнього значення або None, якщо це не число."""
+    if value is None or value is np.nan:
+        return np.nan
+    if isinstance(value, (bool, np.bool_)):
+        return None
+    if isinstance(value, Real):
+        return float(value)
+    s = str(value).strip()
+    if not s:
+        return np.nan
+    if "_" in s:
+        return None
+    try:
+        v = float(s)
+    except ValueError:
+        v = _parse_localized(s)
+    # "inf", "nan", "-Infinity" — текст, а не значення комірки
+    return v if v is None or np.isfinite(v) else None
+
+
+def _parse_each(uniques, strict: bool):
+    nums = np.full(len(uniques), np.nan)
+    bad = np.zeros(len(uniques), dtype=bool)
+    for i, u in enumerate(uniques):
+        v = parse_number(u)
+        if v is None:
+            if strict:
+                return None
+            bad[i] = True
+        else:
+            nums[i] = v
+    return nums, bad
+
+
+def _cast(t: np.ndarray, nums: np.ndarray, ok: np.ndarray, lo: int, hi: int):
+    """Приведення t[lo:hi] до float; частини, де приведення не вдалося, діляться навпіл."""
+    try:
+        nums[lo:hi] = t[lo:hi].astype(np.float64)
+        ok[lo:hi] = True
+    except ValueError:
+        if hi - lo > CAST_MIN:
+            mid = (lo + hi) // 2
+            _cast(t, nums, ok, lo, mid)
+            _cast(t, nums, ok, mid, hi)
+
+
+def _parse_strings(u: np.ndarray, strict: bool):
+    """
+    Розбір масиву рядків ufunc-ами numpy.strings (numpy>=2): звичайні числа і числа
+    з десятковою комою. Решту (відсотки, роздільники тисяч, текст) поштучно розбирає
+    parse_number. Приведення рядка до float у numpy має ті самі правила, що й float().
+    """
+    from numpy.dtypes import StringDType
+    st = np.strings
+    t = st.strip(u.astype(StringDType()))
+    empty = st.str_len(t) == 0
+    t[empty] = "nan"
+    comma = np.flatnonzero((st.count(t, ",") == 1) & (st.count(t, ".") == 0))
+    t[comma] = st.replace(t[comma], ",", ".")
+    nums = np.full(len(u), np.nan)
+    ok = np.zeros(len(u), dtype=bool)
+    _cast(t, nums, ok, 0, len(t))
+    # як у parse_number: "1_000", "inf", "nan" — не числа (їх відкине поштучний розбір)
+    ok &= empty | (np.isfinite(nums) & (st.find(t, "_") < 0))
+    rest = np.flatnonzero(~ok)
+    parsed = _parse_each(u[rest], strict)
+    if parsed is None:
+        return None
+    nums[rest], bad = parsed[0], np.zeros(len(u), dtype=bool)
+    bad[rest] = parsed[1]
+    return nums, bad
+
+
+@timed("parse")
+def parse_numbers(values, strict: bool = False):
+    """
+    Векторний розбір масиву (рядки, числа, None/NaN) -> (float64-масив, маска
+    нерозібраних комірок). Порожні комірки — NaN і не вважаються нерозібраними.
+    strict=True — лише для визначення типу стовпця: на першому нерозібраному
+    значенні повертає None, не розбираючи решту.
+    """
+    import pandas as pd
+    arr = values.to_numpy() if isinstance(values, pd.Series) else np.asarray(values)
+    if arr.dtype.kind in "iuf":
+        return arr.astype(np.float64), np.zeros(len(arr), dtype=bool)
+    if arr.dtype.kind == "b":
+        return None if strict else (np.full(len(arr), np.nan), np.ones(len(arr), dtype=bool))
+    nums = np.empty(len(arr))
+    bad = np.empty(len(arr), dtype=bool)
+    # порціями: factorize і numpy.strings на великих масивах об'єктів упираються в кеш
+    for lo in range(0, len(arr), CHUNK):
+        part = _parse_chunk(arr[lo:lo + CHUNK], strict)
+        if part is None:
+            return None
+        nums[lo:lo + CHUNK], bad[lo:lo + CHUNK] = part
+    return nums, bad
+
+
+def _parse_chunk(arr: np.ndarray, strict: bool):
+    import pandas as pd
+    codes, uniques = pd.factorize(arr)
+    uniques = np.asarray(uniques, dtype=object)
+    # текстовий стовпець зазвичай видно вже з перших значень
+    if strict and _parse_each(uniques[:PROBE], strict) is None:
+        return None
+    if len(uniques) >= VECTOR_MIN and hasattr(np, "strings") and pd.api.types.infer_dtype(uniques) == "string":
+        parsed = _parse_strings(uniques, strict)
+    else:
+        parsed = _parse_each(uniques, strict)
+    if parsed is None:
+        return None
+    # останній елемент — для кодів -1 (None/NaN у вхідних даних)
+    return np.append(parsed[0], np.nan)[codes], np.append(parsed[1], False)[codes]
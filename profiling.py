@@ -0,0 +1,228 @@
+"""
+Необов'язкове вимірювання етапів обробки: час кожного етапу, за бажанням —
+профіль cProfile і пік пам'яті tracemalloc.
+
+    with profiling.stage("model"):
+        ...
+
+    @profiling.timed("charts")
+    def render_charts(...): ...
+
+Поки сесію не ввімкнено (Довідка → Діагностика або змінна середовища
+SAD_PROFILE), stage() лише перевіряє, чи вона є.
+
+Етапи виконуються і в потоках пулу завдань, кілька одночасно: час
+підсумовується; cProfile ведеться окремо в кожному потоці (лише для
+зовнішнього етапу потоку) і об'єднується у звіті. Пік tracemalloc — по всьому
+процесу за час етапу. Графіки, що малюються в пулі процесів
+(charts.render_charts), потрапляють у вимірювання лише загальним часом.
+
+Модуль не залежить від Qt.
+"""
+import cProfile
+import functools
+import io
+import json
+import marshal
+import os
+import platform
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+import zipfile
+from contextlib import contextmanager
+
+# етапи у порядку конвеєра: ключ -> назва для рядка стану і діалогу
+STAGES = {
+    "table": "Отримання таблиці",
+    "parse": "Розбір даних і ролей",
+    "normality": "Описова статистика, нормальність",
+    "model": "Моделі (ANOVA, post-hoc, бутстреп)",
+    "charts": "Графіки",
+    "docx": "Звіт Word",
+}
+SHORT = {"table": "таблиця", "parse": "розбір", "normality": "нормальність",
+         "model": "моделі", "charts": "графіки", "docx": "docx"}
+
+
+class Session:
+    """Накопичені вимірювання: {етап: [викликів, секунд, пік байтів]} і профілі cProfile."""
+
+    def __init__(self, cprofile: bool = False, memory: bool = False):
+        self.cprofile = cprofile
+        self.memory = memory
+        self.started = time.time()
+        self.totals = {}
+        self.profiles = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._own_tracing = memory and not tracemalloc.is_tracing()
+        if self._own_tracing:
+            tracemalloc.start()
+
+    def close(self):
+        if self._own_tracing:
+            tracemalloc.stop()
+            self._own_tracing = False
+
+    @contextmanager
+    def measure(self, name: str):
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        prof = None
+        if self.cprofile and depth == 0:
+            prof = cProfile.Profile()
+            try:
+                prof.enable()
+            except ValueError:   # у потоці вже працює інший профайлер
+                prof = None
+        if self.memory and depth == 0 and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - t
+            if prof is not None:
+                prof.disable()
+            peak = tracemalloc.get_traced_memory()[1] if self.memory and tracemalloc.is_tracing() else 0
+            self._local.depth = depth
+            with self._lock:
+                rec = self.totals.setdefault(name, [0, 0.0, 0])
+                rec[0] += 1
+                rec[1] += seconds
+                rec[2] = max(rec[2], peak)
+                if prof is not None:
+                    self.profiles.append(prof)
+
+    def snapshot(self) -> dict:
+        """Копія лічильників — щоб потім отримати час одного запуску (since)."""
+        with self._lock:
+            return {k: list(v) for k, v in self.totals.items()}
+
+    def since(self, mark: dict) -> dict:
+        """{етап: секунд} з моменту snapshot()."""
+        with self._lock:
+            out = {k: v[1] - mark.get(k, [0, 0.0])[1] for k, v in self.totals.items()}
+        return {k: out[k] for k in _ordered(out) if out[k] > 0}
+
+    def summary(self) -> list:
+        """[{stage, title, calls, seconds, mean, peak_mb}] у порядку STAGES."""
+        with self._lock:
+            totals = {k: list(v) for k, v in self.totals.items()}
+        return [{"stage": k, "title": STAGES.get(k, k), "calls": totals[k][0], "seconds": totals[k][1],
+                 "mean": totals[k][1] / totals[k][0], "peak_mb": totals[k][2] / 2**20 if self.memory else None}
+                for k in _ordered(totals)]
+
+    def stats(self):
+        """Об'єднаний pstats.Stats або None, якщо профілів немає."""
+        with self._lock:
+            profiles = list(self.profiles)
+        return pstats.Stats(*profiles) if profiles else None
+
+    def profile_text(self, limit: int = 40, sort: str = "cumulative") -> str:
+        st = self.stats()
+        if st is None:
+            return ""
+        buf = io.StringIO()
+        st.stream = buf
+        st.strip_dirs().sort_stats(sort).print_stats(limit)
+        return buf.getvalue()
+
+    def memory_text(self, limit: int = 30) -> str:
+        if not (self.memory and tracemalloc.is_tracing()):
+            return ""
+        top = tracemalloc.take_snapshot().statistics("lineno")[:limit]
+        return "\n".join(str(s) for s in top)
+
+    def export(self, path: str) -> str:
+        """
+        Zip для звіту про помилку: report.json (середовище, етапи), profile.txt
+        і profile.prof (pstats, відкривається snakeviz/pstats), memory.txt.
+        """
+        report = {"environment": environment(), "started": time.strftime("%Y-%m-%dT%H:%M:%S",
+                                                                          time.localtime(self.started)),
+                  "options": {"cprofile": self.cprofile, "memory": self.memory}, "stages": self.summary()}
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+            z.writestr("report.json", json.dumps(report, ensure_ascii=False, indent=1))
+            st = self.stats()
+            if st is not None:
+                z.writestr("profile.txt", self.profile_text(limit=150))
+                z.writestr("profile.prof", marshal.dumps(st.stats))
+            mem = self.memory_text()
+            if mem:
+                z.writestr("memory.txt", mem)
+        return path
+
+
+def _ordered(keys) -> list:
+    return [k for k in STAGES if k in keys] + sorted(k for k in keys if k not in STAGES)
+
+
+def environment() -> dict:
+    env = {"python": sys.version.split()[0], "platform": platform.platform(), "cpus": os.cpu_count()}
+    for name in ("numpy", "pandas", "scipy", "matplotlib", "docx", "PyQt5.QtCore"):
+        mod = sys.modules.get(name)
+        if mod is not None:
+            env[name] = getattr(mod, "__version__", None) or getattr(mod, "PYQT_VERSION_STR", None)
+    return env
+
+
+_session = None
+
+
+def start(cprofile: bool = False, memory: bool = False) -> Session:
+    """Нова сесія вимірювань (попередня закривається)."""
+    global _session
+    stop()
+    _session = Session(cprofile, memory)
+    return _session
+
+
+def start_from_env(var: str = "SAD_PROFILE"):
+    """SAD_PROFILE=1 — лише час; SAD_PROFILE=cprofile,memory — ще профіль і пам'ять."""
+    value = os.environ.get(var, "").lower()
+    if value and value != "0":
+        return start("cprofile" in value, "memory" in value)
+    return None
+
+
+def stop():
+    global _session
+    if _session is not None:
+        _session.close()
+    _session = None
+
+
+def current():
+    return _session
+
+
+@contextmanager
+def stage(name: str):
+    s = _session
+    if s is None:
+        yield
+        return
+    with s.measure(name):
+        yield
+
+
+def timed(name: str):
+    """Декоратор: уся функція — етап name."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if _session is None:
+                return fn(*args, **kwargs)
+            with stage(name):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def format_times(times: dict) -> str:
+    """Короткий рядок для рядка стану: «таблиця 0.01 с · моделі 0.4 с»."""
+    return " · ".join(f"{SHORT.get(k, k)} {v:.2f} с" for k, v in times.items())
@@ -0,0 +1,109 @@
+"""
+Файл проєкту SAD (*.sad): заголовки, налаштування аналізу та самі дані
+стовпців у сирому вигляді. Ролі стовпців не зберігаються — їх щоразу
+визначає data_input.infer_roles за поточними даними.
+
+Формат:
+  8 байт   — сигнатура MAGIC
+  8 байт   — довжина JSON-заголовка (uint64, little-endian)
+  JSON     — метадані; зміщення стовпців відраховуються від початку блоку даних
+  дані     — масиви стовпців підряд, кожен вирівняний на ALIGN байт
+
+Завдяки вирівнюванню стовпці відкриваються через np.memmap без розбору —
+великий проєкт відкривається майже миттєво, а сторінки читаються з диска
+лише тоді, коли до них звертаються.
+"""
+import json
+import os
+import struct
+
+import numpy as np
+
+from column_store import ColumnStore, _Column, NUM
+
+MAGIC = b"SADPROJ\x01"
+ALIGN = 64
+EXT = ".sad"
+
+
+def _align(n: int) -> int:
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _release_mapping(store: ColumnStore, path: str):
+    """Переносить у пам'ять стовпці, відображені з path (щоб його можна було перезаписати)."""
+    target = os.path.abspath(path)
+    for col in store.columns:
+        base = col.values
+        while base is not None and not isinstance(base, np.memmap):
+            base = base.base
+        if base is not None and base.filename and os.path.abspath(base.filename) == target:
+            col.replace_values(np.array(col.values))
+
+
+def save_project(path: str, store: ColumnStore, settings: dict = None):
+    columns, offset = [], 0
+    for col in store.columns:
+        columns.append({
+            "name": col.name,
+            "kind": col.kind,
+            "dtype": col.values.dtype.str,
+            "offset": offset,
+            "categories": col.categories if col.kind != NUM else [],
+        })
+        offset = _align(offset + col.values.nbytes)
+    header = json.dumps({
+        "version": 1,
+        "n_rows": store.n_rows,
+        "columns": columns,
+        "settings": settings or {},
+    }, ensure_ascii=False).encode("utf-8")
+    data_start = _align(len(MAGIC) + 8 + len(header))
+
+    _release_mapping(store, path)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for col, meta in zip(store.columns, columns):
+            f.seek(data_start + meta["offset"])
+            # без tobytes(): запис прямо з масиву, без другої копії стовпця в пам'яті
+            f.write(np.ascontiguousarray(col.values).data)
+        f.truncate(data_start + offset)
+    os.replace(tmp, path)
+
+
+def load_project(path: str):
+    """
+    Відкриває проєкт. Повертає (store, meta), де meta містить 'settings'
+    ('roles' у файлах старіших версій ігнорується).
+    Стовпці відображаються у пам'ять у режимі copy-on-write: редагування
+    в таблиці не змінюють файл, доки проєкт не буде збережено.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("Файл не є проєктом SAD або пошкоджений.")
+        (hlen,) = struct.unpack("<Q", f.read(8))
+        meta = json.loads(f.read(hlen).decode("utf-8"))
+    data_start = _align(len(MAGIC) + 8 + hlen)
+
+    n = meta["n_rows"]
+    store = ColumnStore(n, 0)
+    for c in meta["columns"]:
+        # порожній стовпець: значення — одразу відображення файлу, без заповнення NaN
+        col = _Column(store.unique_name(c["name"]), 0)
+        dtype = np.dtype(c["dtype"])
+        if n:
+            values = np.memmap(path, dtype=dtype, mode="c", offset=data_start + c["offset"], shape=(n,))
+        else:
+            values = np.empty(0, dtype=dtype)
+        if c["kind"] == NUM:
+            col.replace_values(values)
+        else:
+            col.kind = c["kind"]
+            col.categories = list(c["categories"])
+            col._lookup = {s: i for i, s in enumerate(col.categories)}
+            col.replace_values(values)
+        store.columns.append(col)
+    return store, {"settings": meta.get("settings", {})}
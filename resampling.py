@@ -0,0 +1,179 @@
+"""
+Бутстреп і перестановочні тести за рівнями фактора (ролі з data_input.infer_roles,
+коди рівнів — з anova.Design): для невеликих дослідів із ненормальним розподілом,
+де класичні інтервали і F-тест ненадійні.
+
+  - bootstrap: стратифікований бутстреп (вибірка з поверненням у межах кожної
+    групи) — перцентильні інтервали середніх і попарних різниць середніх;
+  - permutation_test: перестановка міток груп — глобальний тест (міжгрупова
+    сума квадратів, еквівалентна F) і попарні різниці середніх з поправкою
+    на множинність за максимумом |різниці| (Westfall–Young).
+
+Повторні вибірки будуються пакетами як матриці індексів numpy (повтор × рядок),
+порціями не більше CHUNK_CELLS комірок, і обчислюються в потоках (numpy
+відпускає GIL). Пул потоків один на процес: фонові роботи, що йдуть
+одночасно, ділять ті самі cpu_count потоків, тож у пам'яті не більше
+cpu_count порцій незалежно від кількості робіт. Кожна порція має власне
+зерно (SeedSequence.spawn), а межі порцій залежать лише від розміру даних,
+тож результат із тим самим seed не залежить від кількості потоків.
+"""
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+N_RESAMPLES = 10_000
+SEED = 20250101
+CI = 0.95
+# елементів матриці індексів в одній порції (≈ 32 МБ на матрицю float64/int64)
+CHUNK_CELLS = 4_000_000
+
+
+def _chunks(n_resamples: int, width: int, seed):
+    """[(кількість повторів, зерно порції)]; розмір порції — за шириною рядка матриці."""
+    size = max(1, CHUNK_CELLS // max(width, 1))
+    counts = [min(size, n_resamples - lo) for lo in range(0, n_resamples, size)]
+    return list(zip(counts, np.random.SeedSequence(seed).spawn(len(counts))))
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _shared_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(os.cpu_count() or 1, thread_name_prefix="resampling")
+        return _pool
+
+
+def _map(fn, jobs, workers):
+    """
+    [fn(*job)] у порядку jobs. Порції йдуть у спільний пул, і від одного
+    виклику в ньому не більше workers порцій — наступна подається, коли
+    завершиться якась попередня.
+    """
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        return [fn(*job) for job in jobs]
+    pool = _shared_pool()
+    results = [None] * len(jobs)
+    pending = {}
+    for i, job in enumerate(jobs):
+        if len(pending) >= workers:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                results[pending.pop(f)] = f.result()
+        pending[pool.submit(fn, *job)] = i
+    for f, i in pending.items():
+        results[i] = f.result()
+    return results
+
+
+def _groups(d, factor: int):
+    """(значення, коди 0..k-1 лише непорожніх рівнів, назви рівнів)."""
+    codes = d.codes[factor]
+    n = np.bincount(codes, minlength=len(d.levels[factor]))
+    present = np.flatnonzero(n)
+    remap = np.full(len(n), -1)
+    remap[present] = np.arange(len(present))
+    return d.y, remap[codes], [d.levels[factor][i] for i in present]
+
+
+def _pairs(k: int):
+    return np.triu_indices(k, 1)
+
+
+def bootstrap(d, factor: int = 0, n_resamples: int = N_RESAMPLES, ci: float = CI, seed=SEED,
+              workers: int = None):
+    """
+    (таблиця середніх з інтервалами, таблиця попарних різниць з інтервалами).
+    Інтервали перцентильні; різниця значуща, якщо інтервал не містить нуля.
+    """
+    y, codes, levels = _groups(d, factor)
+    k = len(levels)
+    order = np.argsort(codes, kind="stable")
+    ys = y[order]
+    n = np.bincount(codes, minlength=k)
+    starts = np.concatenate(([0], np.cumsum(n)[:-1]))
+    row_start = np.repeat(starts, n)
+    row_n = np.repeat(n, n).astype(np.float64)
+
+    def resample(count, ss):
+        rng = np.random.default_rng(ss)
+        # індекс у межах своєї групи: початок групи + ціла частина U·n_g
+        idx = row_start + (rng.random((count, len(ys))) * row_n).astype(np.int64)
+        return np.add.reduceat(ys[idx], starts, axis=1) / n
+
+    # група × повтор: квантилі по неперервних рядках у кілька разів швидші
+    boot = np.vstack(_map(resample, _chunks(n_resamples, len(ys), seed), workers)).T.copy()
+    mean = np.bincount(codes, weights=y, minlength=k) / n
+    q = [(1 - ci) / 2, 1 - (1 - ci) / 2]
+    lo, hi = np.quantile(boot, q, axis=1)
+    f = str(d.factors[factor])
+    means = pd.DataFrame({"factor": f, "level": levels, "n": n, "mean": mean, "ci_low": lo, "ci_high": hi})
+
+    a, b = _pairs(k)
+    step = max(1, CHUNK_CELLS // n_resamples)
+    blocks = [(a[s:s + step], b[s:s + step]) for s in range(0, len(a), step)]
+    parts = _map(lambda ia, ib: np.quantile(boot[ia] - boot[ib], q, axis=1), blocks, workers)
+    d_lo, d_hi = np.hstack(parts) if parts else np.empty((2, 0))
+    diffs = pd.DataFrame({"factor": f, "level_a": [levels[i] for i in a], "level_b": [levels[i] for i in b],
+                          "diff": mean[a] - mean[b], "ci_low": d_lo, "ci_high": d_hi,
+                          "significant": (d_lo > 0) | (d_hi < 0)})
+    return means, diffs
+
+
+def permutation_test(d, factor: int = 0, n_resamples: int = N_RESAMPLES, seed=SEED, workers: int = None):
+    """
+    (глобальний тест, попарні порівняння). p = (1 + кількість перестановок зі
+    статистикою не меншою за спостережувану) / (1 + n_resamples).
+    """
+    y, codes, levels = _groups(d, factor)
+    k, N = len(levels), len(y)
+    n = np.bincount(codes, minlength=k).astype(np.float64)
+    a, b = _pairs(k)
+
+    def stats_of(sums):
+        means = sums / n
+        return (sums ** 2 / n).sum(axis=-1), np.abs(means[..., a] - means[..., b])
+
+    obs_ss, obs_diff = stats_of(np.bincount(codes, weights=y, minlength=k))
+    # допуск на похибку округлення: рівні статистики рахуються як «не менші»
+    tol = 1e-9 * max(abs(obs_ss), 1.0)
+
+    def resample(count, ss):
+        rng = np.random.default_rng(ss)
+        perm = rng.permuted(np.broadcast_to(np.arange(N), (count, N)), axis=1)
+        flat = (np.arange(count)[:, None] * k + codes[None, :]).ravel()
+        sums = np.bincount(flat, weights=y[perm].ravel(), minlength=count * k).reshape(count, k)
+        ss_, diff = stats_of(sums)
+        top = diff.max(axis=1) if len(a) else np.zeros(count)
+        return (int(np.sum(ss_ >= obs_ss - tol)), np.sum(diff >= obs_diff - tol, axis=0),
+                np.sum(top[:, None] >= obs_diff - tol, axis=0))
+
+    parts = _map(resample, _chunks(n_resamples, max(N, len(a)), seed), workers)
+    denom = n_resamples + 1
+    p_global = (1 + sum(p[0] for p in parts)) / denom
+    p_pair = (1 + sum(p[1] for p in parts)) / denom
+    p_adj = (1 + sum(p[2] for p in parts)) / denom
+    f = str(d.factors[factor])
+    global_ = pd.DataFrame({"factor": [f], "groups": [k], "ss_between": [obs_ss - y.sum() ** 2 / N],
+                            "n_resamples": [n_resamples], "p": [p_global]})
+    mean = np.bincount(codes, weights=y, minlength=k) / n
+    pairs = pd.DataFrame({"factor": f, "level_a": [levels[i] for i in a], "level_b": [levels[i] for i in b],
+                          "diff": mean[a] - mean[b], "p": p_pair, "p_adj": p_adj})
+    return global_, pairs
+
+
+def resampling_tests(d, factor: int = 0, n_resamples: int = N_RESAMPLES, ci: float = CI, seed=SEED,
+                     workers: int = None) -> dict:
+    """Таблиці для звіту (ключі як у anova.run_tests) або {}, якщо груп менше двох."""
+    if not d.factors or d.N < 3 or np.count_nonzero(np.bincount(d.codes[factor])) < 2:
+        return {}
+    means, diffs = bootstrap(d, factor, n_resamples, ci, seed, workers)
+    global_, pairs = permutation_test(d, factor, n_resamples, seed, workers)
+    return {"bootstrap": means, "bootstrap_diff": diffs, "permutation": global_, "permutation_pairs": pairs}
@@ -0,0 +1,125 @@
+"""
+Подання рядків таблиці — сортування, фільтр і групування над ColumnStore.
+Дані не копіюються: подання — це лише масив номерів рядків сховища в
+порядку показу. Порядок за стовпцем (_Column.sort_index) і коди рівнів
+(_Column.group_codes) обчислюються раз на версію стовпця, тож перемикання
+подань — вибірка з готових масивів.
+
+spec (усі ключі необов'язкові; стовпці — самі об'єкти store.columns[j], а не
+назви чи номери: назви можуть повторюватися, номери зсуваються вставкою, а
+об'єкт стовпця переживає і перейменування, і вставку інших стовпців):
+    {
+      "sort": (урожай, True),          # стовпець і чи за спаданням
+      "group": рік,                    # рядки за рівнями, всередині рівня — за sort
+      "filter": {сорт: {"values": ["Айдаред", "Голден"]},   # "" — порожні комірки
+                 урожай: {"min": 10, "max": None}},         # лише для числових
+    }
+Посилання на видалені стовпці ігноруються.
+
+Модуль не залежить від Qt (модель — table_model.RowViewModel).
+"""
+import hashlib
+
+import numpy as np
+
+from column_store import NUM
+
+
+def _find(store, column):
+    """column, якщо він ще є у сховищі (порівняння за тотожністю, не за назвою)."""
+    for col in store.columns:
+        if col is column:
+            return col
+    return None
+
+
+def is_identity(spec: dict) -> bool:
+    return not (spec.get("sort") or spec.get("group") or spec.get("filter"))
+
+
+def filter_mask(store, filters: dict):
+    """Маска рядків, що проходять усі умови filters, або None, якщо умов немає."""
+    mask = None
+    for column, cond in filters.items():
+        col = _find(store, column)
+        if col is None:
+            continue
+        m = np.ones(store.n_rows, dtype=bool)
+        if cond.get("values") is not None:
+            codes, labels = col.group_codes()
+            allowed = set(cond["values"])
+            # код -1 (порожньо) бере останній елемент таблиці
+            lut = np.array([lv in allowed for lv in labels] + ["" in allowed], dtype=bool)
+            m &= lut[codes]
+        if col.kind == NUM:
+            # NaN не проходить жодне порівняння — порожні відкидаються межами
+            if cond.get("min") is not None:
+                m &= col.values >= cond["min"]
+            if cond.get("max") is not None:
+                m &= col.values <= cond["max"]
+        mask = m if mask is None else mask & m
+    return mask
+
+
+def view_rows(store, spec: dict):
+    """Номери рядків сховища в порядку показу; None — усі рядки у вихідному порядку."""
+    if is_identity(spec):
+        return None
+    rows = None
+    sort = spec.get("sort")
+    col = _find(store, sort[0]) if sort else None
+    if col is not None:
+        rows = col.sort_index(bool(sort[1]))
+    gcol = _find(store, spec["group"]) if spec.get("group") else None
+    if gcol is not None:
+        if rows is None:
+            # порядок рівнів збігається з порядком значень стовпця
+            rows = gcol.sort_index()
+        else:
+            codes, labels = gcol.group_codes()
+            key = np.where(codes < 0, len(labels), codes)[rows]
+            rows = rows[np.argsort(key, kind="stable")]
+    mask = filter_mask(store, spec.get("filter") or {})
+    if mask is not None:
+        rows = np.flatnonzero(mask) if rows is None else rows[mask[rows]]
+    return rows
+
+
+def group_starts(store, spec: dict, rows):
+    """
+    (початки груп у поданні, назви рівнів) для групованого подання або None.
+    Порожні комірки — остання група з назвою "".
+    """
+    gcol = _find(store, spec["group"]) if spec.get("group") else None
+    if gcol is None or rows is None:
+        return None
+    codes, labels = gcol.group_codes()
+    codes = codes[rows]
+    if not len(codes):
+        return np.zeros(0, dtype=np.int64), []
+    starts = np.concatenate(([0], np.flatnonzero(codes[1:] != codes[:-1]) + 1))
+    return starts, [labels[c] if c >= 0 else "" for c in codes[starts].tolist()]
+
+
+def fingerprint(rows) -> str:
+    """Хеш набору рядків (без урахування порядку) — для ключів кешу аналізу фільтра."""
+    if rows is None:
+        return None
+    return hashlib.blake2b(np.unique(rows).astype(np.int64).data, digest_size=16).hexdigest()
+
+
+def describe(store, spec: dict, rows) -> str:
+    """Короткий опис подання для рядка стану: «Показано 12 з 240 · фільтр: Сорт · …»."""
+    if rows is None:
+        return ""
+    parts = [f"Показано {len(rows)} з {store.n_rows}"]
+    filters = [col.name for col in (spec.get("filter") or {}) if _find(store, col) is not None]
+    if filters:
+        parts.append("фільтр: " + ", ".join(filters))
+    sort = spec.get("sort")
+    if sort and _find(store, sort[0]) is not None:
+        parts.append(f"сортування: {sort[0].name} {'↓' if sort[1] else '↑'}")
+    groups = group_starts(store, spec, rows)
+    if groups is not None:
+        parts.append(f"групування: {spec['group'].name} ({len(groups[1])})")
+    return " · ".join(parts)
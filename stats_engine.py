@@ -0,0 +1,269 @@
+"""
+Пакетна описова статистика за всіма числовими показниками і всіма групами
+за один векторизований прохід: n, середнє, SD, SE, CV, квантилі, асиметрія,
+ексцес, тести Шапіро–Уілка і Д'Агостіно, однорідність дисперсій
+(Левене, Бартлетт). Результат — охайні таблиці pandas, без діалогів.
+
+Значення всіх (показник, група) сортуються один раз, далі кожна
+статистика — це np.bincount або індексування по відсортованих сегментах.
+"""
+import numpy as np
+import pandas as pd
+from scipy import special
+
+from data_input import numeric_columns
+
+SW_MAX_N = 5000
+
+
+class Grouping:
+    """
+    Коди груп за одним або кількома факторами. Обчислюються один раз
+    і використовуються всіма тестами; -1 — рядок із пропущеним фактором.
+    """
+
+    def __init__(self, df: pd.DataFrame, by=None):
+        if by is None:
+            by = []
+        elif isinstance(by, str):
+            by = [by]
+        self.by = list(by)
+        if self.by:
+            g = df.groupby(self.by, sort=True, observed=True, dropna=True)
+            self.codes = g.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+            self.keys = g.size().index
+        else:
+            self.codes = np.zeros(len(df), dtype=np.int64)
+            self.keys = pd.Index([None])
+        self.n_groups = len(self.keys)
+
+    def key_frame(self) -> pd.DataFrame:
+        """Таблиця рівнів факторів по одному рядку на групу (порядок — як у кодах)."""
+        if not self.by:
+            return pd.DataFrame(index=range(self.n_groups))
+        if isinstance(self.keys, pd.MultiIndex):
+            return self.keys.to_frame(index=False)
+        return pd.DataFrame({self.by[0]: self.keys.to_numpy()})
+
+
+class _Segments:
+    """Значення, відсортовані за (показник, група, значення), і суми по сегментах."""
+
+    def __init__(self, X: np.ndarray, codes: np.ndarray, n_groups: int):
+        n_rows, k = X.shape
+        # сортуємо кожен стовпець за значенням, потім стабільно — за кодом групи;
+        # пропуски і рядки без групи отримують код n_groups і відкидаються
+        order = np.argsort(X, axis=0)
+        ys = np.take_along_axis(X, order, axis=0)
+        cs = codes[order]
+        cs[np.isnan(ys) | (cs < 0)] = n_groups
+        order = np.argsort(cs, axis=0, kind="stable")
+        ys = np.take_along_axis(ys, order, axis=0).T
+        cs = np.take_along_axis(cs, order, axis=0).T
+        valid = cs < n_groups
+        self.seg = (cs + (np.arange(k) * n_groups)[:, None])[valid]
+        self.y = ys[valid]
+        self.size = k * n_groups
+        self.n = np.bincount(self.seg, minlength=self.size)
+        self.start = np.concatenate(([0], np.cumsum(self.n)[:-1]))
+
+    def sum(self, w):
+        return np.bincount(self.seg, weights=w, minlength=self.size)
+
+
+def _norm_ppf(p):
+    return -np.sqrt(2) * special.erfcinv(2 * p)
+
+
+def _norm_sf(z):
+    return 0.5 * special.erfc(z / np.sqrt(2))
+
+
+def _sw_coefficients(n: int) -> np.ndarray:
+    """Коефіцієнти Шапіро–Уілка (алгоритм Ройстона AS R94, як у scipy)."""
+    if n == 3:
+        return np.array([-np.sqrt(0.5), 0.0, np.sqrt(0.5)])
+    m = _norm_ppf((np.arange(1, n + 1) - 0.375) / (n + 0.25))
+    mm = np.sum(m ** 2)
+    u = 1 / np.sqrt(n)
+    a = m / np.sqrt(mm)
+    an = a[-1] + np.polyval([-2.706056, 4.434685, -2.071190, -0.147981, 0.221157, 0.0], u)
+    if n > 5:
+        an1 = a[-2] + np.polyval([-3.582633, 5.682633, -1.752461, -0.293762, 0.042981, 0.0], u)
+        phi = (mm - 2 * m[-1] ** 2 - 2 * m[-2] ** 2) / (1 - 2 * an ** 2 - 2 * an1 ** 2)
+        a = m / np.sqrt(phi)
+        a[-1], a[-2], a[0], a[1] = an, an1, -an, -an1
+    else:
+        phi = (mm - 2 * m[-1] ** 2) / (1 - 2 * an ** 2)
+        a = m / np.sqrt(phi)
+        a[-1], a[0] = an, -an
+    return a
+
+
+def _sw_pvalue(w: np.ndarray, n: int) -> np.ndarray:
+    if n == 3:
+        return np.clip(6 / np.pi * (np.arcsin(np.sqrt(w)) - np.arcsin(np.sqrt(0.75))), 0, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if n <= 11:
+            gamma = 0.459 * n - 2.273
+            mu = 0.5440 - 0.39978 * n + 0.025054 * n ** 2 - 0.0006714 * n ** 3
+            sigma = np.exp(1.3822 - 0.77857 * n + 0.062767 * n ** 2 - 0.0020322 * n ** 3)
+            z = (-np.log(gamma - np.log1p(-w)) - mu) / sigma
+        else:
+            ln = np.log(n)
+            mu = -1.5861 - 0.31082 * ln - 0.083751 * ln ** 2 + 0.0038915 * ln ** 3
+            sigma = np.exp(-0.4803 - 0.082676 * ln + 0.0030302 * ln ** 2)
+            z = (np.log1p(-w) - mu) / sigma
+    return _norm_sf(z)
+
+
+def _shapiro(sg: _Segments, m2: np.ndarray):
+    """W і p для всіх сегментів: сегменти однакового розміру — однією матрицею."""
+    w = np.full(sg.size, np.nan)
+    p = np.full(sg.size, np.nan)
+    for n in np.unique(sg.n):
+        if n < 3 or n > SW_MAX_N:
+            continue
+        idx = np.flatnonzero(sg.n == n)
+        idx = idx[m2[idx] > 0]
+        if len(idx) == 0:
+            continue
+        Y = sg.y[sg.start[idx][:, None] + np.arange(n)]
+        wn = np.minimum((Y @ _sw_coefficients(n)) ** 2 / m2[idx], 1.0)
+        w[idx] = wn
+        p[idx] = _sw_pvalue(wn, n)
+    return w, p
+
+
+def _dagostino(n, g1, b2):
+    """K² Д'Агостіно–Пірсона (як scipy.stats.normaltest); потрібно n ≥ 8."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # асиметрія
+        y = g1 * np.sqrt((n + 1) * (n + 3) / (6.0 * (n - 2)))
+        beta2 = 3.0 * (n * n + 27 * n - 70) * (n + 1) * (n + 3) / ((n - 2.0) * (n + 5) * (n + 7) * (n + 9))
+        w2 = -1 + np.sqrt(2 * (beta2 - 1))
+        delta = 1 / np.sqrt(0.5 * np.log(w2))
+        alpha = np.sqrt(2.0 / (w2 - 1))
+        y = np.where(y == 0, 1, y)
+        zs = delta * np.log(y / alpha + np.sqrt((y / alpha) ** 2 + 1))
+        # ексцес
+        e = 3.0 * (n - 1) / (n + 1)
+        varb2 = 24.0 * n * (n - 2) * (n - 3) / ((n + 1) * (n + 1.0) * (n + 3) * (n + 5))
+        x = (b2 - e) / np.sqrt(varb2)
+        sqrtbeta1 = 6.0 * (n * n - 5 * n + 2) / ((n + 7) * (n + 9)) * np.sqrt(6.0 * (n + 3) * (n + 5) / (n * (n - 2) * (n - 3)))
+        a = 6.0 + 8.0 / sqrtbeta1 * (2.0 / sqrtbeta1 + np.sqrt(1 + 4.0 / sqrtbeta1 ** 2))
+        term1 = 1 - 2 / (9.0 * a)
+        denom = 1 + x * np.sqrt(2 / (a - 4.0))
+        term2 = np.sign(denom) * np.cbrt((1 - 2.0 / a) / np.abs(denom))
+        zk = (term1 - term2) / np.sqrt(2 / (9.0 * a))
+        k2 = zs ** 2 + zk ** 2
+    k2 = np.where(n >= 8, k2, np.nan)
+    return k2, special.chdtrc(2, k2)
+
+
+def _homogeneity(sg: _Segments, k: int, n_groups: int, mean, var, median):
+    """Левене (центр — медіана, як у scipy) і Бартлетт для кожного показника."""
+    n = sg.n.reshape(k, n_groups).astype(float)
+    has = n > 0
+    n_eff = has.sum(axis=1)
+    N = n.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.abs(sg.y - median[sg.seg])
+        zbar_g = (sg.sum(z) / sg.n).reshape(k, n_groups)
+        zbar = np.nansum(zbar_g * n, axis=1) / N
+        num = np.nansum(n * (zbar_g - zbar[:, None]) ** 2, axis=1)
+        den = sg.sum((z - zbar_g.ravel()[sg.seg]) ** 2).reshape(k, n_groups).sum(axis=1)
+        lev = (N - n_eff) / (n_eff - 1) * num / den
+        lev_p = special.fdtrc(n_eff - 1, N - n_eff, lev)
+
+        ok = n >= 2
+        kb = ok.sum(axis=1)
+        nb = np.where(ok, n, 0).sum(axis=1)
+        v = np.where(ok, var.reshape(k, n_groups), 1.0)
+        sp2 = np.where(ok, (n - 1) * v, 0).sum(axis=1) / (nb - kb)
+        num_b = (nb - kb) * np.log(sp2) - np.where(ok, (n - 1) * np.log(v), 0).sum(axis=1)
+        corr = 1 + (np.where(ok, 1 / (n - 1), 0).sum(axis=1) - 1 / (nb - kb)) / (3 * (kb - 1))
+        bart = num_b / corr
+        bart_p = special.chdtrc(kb - 1, bart)
+    bad = n_eff < 2
+    lev[bad] = lev_p[bad] = np.nan
+    bad = kb < 2
+    bart[bad] = bart_p[bad] = np.nan
+    return lev, lev_p, bart, bart_p
+
+
+def batch_statistics(df: pd.DataFrame, columns=None, by=None,
+                     quantiles=(0.25, 0.5, 0.75), grouping: Grouping = None) -> dict:
+    """
+    Повертає {"describe": DataFrame, "homogeneity": DataFrame}.
+
+    describe — по рядку на (показник, група): n, mean, sd, se, cv (%), min,
+    квантилі (q25, q50, q75…), max, skew, kurtosis (виправлені, як у pandas),
+    shapiro_w/p, dagostino_k2/p.
+    homogeneity — по рядку на показник: levene_w/p, bartlett_t/p
+    (лише якщо задано by і груп щонайменше дві).
+    """
+    grouping = grouping or Grouping(df, by)
+    if columns is None:
+        columns = [c for c in numeric_columns(df) if c not in grouping.by]
+    columns = list(columns)
+    k, G = len(columns), grouping.n_groups
+    X = np.column_stack([df[c].to_numpy(dtype=np.float64, na_value=np.nan) for c in columns]) if k else np.empty((len(df), 0))
+    sg = _Segments(X, grouping.codes, G)
+
+    n = sg.n.astype(float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = sg.sum(sg.y) / n
+        d = sg.y - mean[sg.seg]
+        d2 = d * d
+        m2 = sg.sum(d2)
+        m3 = sg.sum(d2 * d)
+        m4 = sg.sum(d2 * d2)
+        var = np.where(n > 1, m2 / (n - 1), np.nan)
+        sd = np.sqrt(var)
+        se = sd / np.sqrt(n)
+        cv = sd / mean * 100
+        g1 = (m3 / n) / (m2 / n) ** 1.5
+        b2 = (m4 / n) / (m2 / n) ** 2
+        skew = np.where(n > 2, g1 * np.sqrt(n * (n - 1)) / (n - 2), np.nan)
+        kurt = np.where(n > 3, ((n + 1) * (b2 - 3) + 6) * (n - 1) / ((n - 2) * (n - 3)), np.nan)
+
+    has = sg.n > 0
+    last = sg.start + np.maximum(sg.n - 1, 0)
+    y = sg.y if len(sg.y) else np.array([np.nan])
+
+    def at(i):
+        return np.where(has, y[np.clip(i, 0, len(y) - 1)], np.nan)
+
+    def quantile(q):
+        # лінійна інтерполяція, як np.quantile за замовчуванням
+        pos = q * np.maximum(sg.n - 1, 0)
+        lo = np.floor(pos).astype(np.int64)
+        v_lo = at(sg.start + lo)
+        return v_lo + (pos - lo) * (at(np.minimum(sg.start + lo + 1, last)) - v_lo)
+
+    out = {"n": sg.n, "mean": mean, "sd": sd, "se": se, "cv": cv, "min": at(sg.start)}
+    for q in quantiles:
+        out[f"q{int(round(q * 100))}"] = quantile(q)
+    out["max"] = at(last)
+    median = quantile(0.5)
+    out["skew"] = skew
+    out["kurtosis"] = kurt
+    out["shapiro_w"], out["shapiro_p"] = _shapiro(sg, m2)
+    out["dagostino_k2"], out["dagostino_p"] = _dagostino(n, g1, b2)
+
+    table = {"indicator": np.repeat(np.asarray(columns, dtype=object), G)}
+    for name, level in grouping.key_frame().items():
+        table[name] = np.tile(level.to_numpy(), k)
+    table.update(out)
+    describe = pd.DataFrame(table)
+    describe = describe[describe["n"] > 0].reset_index(drop=True)
+
+    homogeneity = None
+    if grouping.by and G >= 2:
+        lev, lev_p, bart, bart_p = _homogeneity(sg, k, G, mean, var, median)
+        homogeneity = pd.DataFrame({
+            "indicator": columns, "groups": (sg.n.reshape(k, G) > 0).sum(axis=1),
+            "levene_w": lev, "levene_p": lev_p, "bartlett_t": bart, "bartlett_p": bart_p,
+        })
+    return {"describe": describe, "homogeneity": homogeneity}
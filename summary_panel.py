@@ -0,0 +1,110 @@
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import QDockWidget, QLabel, QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget, QHeaderView
+
+from live_stats import LiveStats
+
+# підсумки оновлюються не частіше ніж раз на стільки мс (вставка блоку — одне оновлення)
+REFRESH_MS = 150
+
+
+def _num(v, digits=4) -> str:
+    return "" if v != v else f"{v:.{digits}g}"
+
+
+class SummaryPanel(QDockWidget):
+    """
+    Бічна панель «Поточні підсумки»: n, середнє, SD, CV, мін/макс по показниках
+    і середні за першим фактором для поточного стовпця. Агрегати (LiveStats)
+    оновлюються дельтою на кожну зміну моделі; перемальовування відкладається.
+    """
+
+    def __init__(self, table, parent=None):
+        super().__init__("Поточні підсумки", parent)
+        self.setObjectName("summary_panel")
+        self.table = table
+        self.live = LiveStats()
+        self._needs_rebuild = True
+
+        body = QWidget(self)
+        lay = QVBoxLayout(body)
+        lay.setContentsMargins(4, 4, 4, 4)
+        self.overview = self._make_table(["Показник", "n", "Середнє", "SD", "CV, %", "Мін", "Макс"])
+        self.groups_label = QLabel("", body)
+        self.groups = self._make_table(["Рівень", "n", "Середнє", "SD"])
+        lay.addWidget(self.overview, 3)
+        lay.addWidget(self.groups_label)
+        lay.addWidget(self.groups, 2)
+        self.setWidget(body)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(REFRESH_MS)
+        self._timer.timeout.connect(self.refresh)
+
+        model = table.data_model()
+        model.block_edited.connect(lambda top, left, old: self._delta(self.live.block_edited, top, left, old))
+        model.rowsInserted.connect(lambda parent, first, last: self._delta(self.live.rows_inserted, first, last - first + 1))
+        model.rowsAboutToBeRemoved.connect(
+            lambda parent, first, last: self._delta(self.live.rows_removing, first, last - first + 1))
+        model.rowsRemoved.connect(lambda *a: self._schedule())
+        model.columnsInserted.connect(
+            lambda parent, first, last: self._delta(self.live.columns_inserted, first, last - first + 1))
+        model.columnsAboutToBeRemoved.connect(
+            lambda parent, first, last: self._delta(self.live.columns_removing, first, last - first + 1))
+        model.columnsRemoved.connect(lambda *a: self._schedule())
+        model.headerDataChanged.connect(lambda *a: self._schedule())
+        model.modelReset.connect(self.schedule_rebuild)
+        table.selectionModel().currentColumnChanged.connect(lambda *a: self._schedule())
+        self.visibilityChanged.connect(lambda visible: visible and self._schedule())
+        self._schedule()
+
+    @staticmethod
+    def _make_table(headers):
+        t = QTableWidget(0, len(headers))
+        t.setHorizontalHeaderLabels(headers)
+        t.verticalHeader().hide()
+        t.setEditTriggers(QTableWidget.NoEditTriggers)
+        t.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        return t
+
+    def _delta(self, fn, *args):
+        if not self._needs_rebuild and self.live.store is self.table.data_model().store and fn(*args):
+            self._needs_rebuild = True
+        self._schedule()
+
+    def schedule_rebuild(self):
+        """Повний перерахунок при наступному оновленні (нова таблиця, завершення імпорту)."""
+        self._needs_rebuild = True
+        self._schedule()
+
+    def _schedule(self):
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def refresh(self):
+        if not self.isVisible():
+            return
+        if self._needs_rebuild or self.live.store is not self.table.data_model().store:
+            self.live.rebuild(self.table.data_model().store)
+            self._needs_rebuild = False
+        self._fill(self.overview, [
+            [r["name"], str(r["n"]), _num(r["mean"]), _num(r["sd"]), _num(r["cv"], 3), _num(r["min"]), _num(r["max"])]
+            for r in self.live.summary()
+        ])
+        col = self.table.currentColumn()
+        rows = self.live.group_summary(col) if col >= 0 else []
+        if rows:
+            self.groups_label.setText(f"{self.table.header_text(col)} за «{self.live.factors[0].name}»:")
+        else:
+            self.groups_label.setText("Середні за фактором — виберіть числовий стовпець")
+        self._fill(self.groups, [[r["level"], str(r["n"]), _num(r["mean"]), _num(r["sd"])] for r in rows])
+
+    @staticmethod
+    def _fill(widget, rows):
+        widget.setRowCount(len(rows))
+        for i, cells in enumerate(rows):
+            for j, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                if j:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                widget.setItem(i, j, item)
@@ -0,0 +1,434 @@
+import numpy as np
+from PyQt5.QtCore import Qt, QAbstractProxyModel, QAbstractTableModel, QModelIndex, pyqtSignal
+from PyQt5.QtGui import QBrush, QColor, QPalette, QStaticText, QTransform
+from PyQt5.QtWidgets import QStyle, QStyledItemDelegate, QStyleOptionViewItem
+
+import row_views
+from column_store import ColumnStore
+
+# тло рядків кожної другої групи у групованому поданні
+GROUP_BAND = QBrush(QColor(232, 240, 254))
+
+# data() і flags() викликаються для кожної видимої комірки (data — по ролі на
+# кожен атрибут делегата), тож ролі порівнюються як звичайні int, без
+# звертання до Qt.* на кожному виклику
+_DISPLAY = int(Qt.DisplayRole)
+_EDIT = int(Qt.EditRole)
+_BACKGROUND = int(Qt.BackgroundRole)
+_TOOLTIP = int(Qt.ToolTipRole)
+_CELL_FLAGS = Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
+_HAS_DISPLAY = QStyleOptionViewItem.HasDisplay
+# int(features) -> features | HasDisplay: операції над прапорцями Qt у PyQt дорогі
+_WITH_DISPLAY = {}
+_SELECTED = int(QStyle.State_Selected)
+_ENABLED = int(QStyle.State_Enabled)
+_ACTIVE = int(QStyle.State_Active)
+_HAS_FOCUS = int(QStyle.State_HasFocus)
+# розкладених текстів у кеші CellDelegate (далі кеш починається заново)
+TEXT_LAYOUTS = 8192
+
+
+class DataTableModel(QAbstractTableModel):
+    """Qt-модель над ColumnStore: комірки формуються ліниво у data()."""
+    # (верхній рядок, лівий стовпець, [масиви стовпців блоку до запису]) — після dataChanged;
+    # дає змогу оновлювати агрегати дельтою (live_stats) без повного перерахунку
+    block_edited = pyqtSignal(int, int, object)
+
+    def __init__(self, store: ColumnStore = None, parent=None):
+        super().__init__(parent)
+        self.store = store if store is not None else ColumnStore()
+
+    def set_store(self, store: ColumnStore):
+        self.beginResetModel()
+        self.store = store
+        self.endResetModel()
+
+    # ---- читання ----
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.store.n_rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.store.n_cols
+
+    def data(self, index, role=Qt.DisplayRole):
+        # викликається для кожної видимої комірки і кожної ролі — лише найдешевші перевірки
+        if role != _DISPLAY and role != _EDIT:
+            return None
+        return self.store.columns[index.column()].text(index.row())
+
+    def cell(self, row: int, column: int):
+        """(текст, тло або None) комірки — для CellDelegate."""
+        return self.store.columns[column].text(row), None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != _DISPLAY:
+            return None
+        if orientation == Qt.Horizontal:
+            if 0 <= section < self.store.n_cols:
+                return self.store.columns[section].name
+            return None
+        return str(section + 1)
+
+    def flags(self, index):
+        return _CELL_FLAGS if index.isValid() else Qt.NoItemFlags
+
+    # ---- редагування ----
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        r, c = index.row(), index.column()
+        old = [self.store.columns[c].values[r:r + 1].copy()]
+        self.store.set_text(r, c, "" if value is None else str(value))
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        self.block_edited.emit(r, c, old)
+        return True
+
+    def setHeaderData(self, section, orientation, value, role=Qt.EditRole):
+        if orientation != Qt.Horizontal or role not in (Qt.DisplayRole, Qt.EditRole):
+            return False
+        self.store.rename(section, str(value))
+        self.headerDataChanged.emit(orientation, section, section)
+        return True
+
+    def set_block(self, top: int, left: int, rows: list):
+        """Записує прямокутний блок рядків (список списків тексту), одним сигналом."""
+        if not rows:
+            return
+        width = max(len(cells) for cells in rows)
+        columns = [np.array([cells[j] if j < len(cells) else "" for cells in rows], dtype=object)
+                   for j in range(width)]
+        self.set_columns(top, left, columns)
+
+    def set_columns(self, top: int, left: int, columns: list):
+        """
+        Записує блок стовпцями (масиви однакової довжини, див. data_input.read_tsv_text).
+        Кожен стовпець записується векторно; на весь блок — один dataChanged і один block_edited.
+        """
+        if not columns or not len(columns[0]):
+            return
+        height = len(columns[0])
+        old = [col.values[top:top + height].copy() for col in self.store.columns[left:left + len(columns)]]
+        self.store.set_block(top, left, columns)
+        self.dataChanged.emit(self.index(top, left), self.index(top + height - 1, left + len(columns) - 1))
+        self.block_edited.emit(top, left, old)
+
+    def append_frame(self, df):
+        """Дописує порцію рядків (потоковий імпорт)."""
+        if df.shape[0] == 0 and df.shape[1] <= self.store.n_cols:
+            return
+        if df.shape[1] > self.store.n_cols:
+            self.beginResetModel()
+            self.store.append_frame(df)
+            self.endResetModel()
+            return
+        n = self.store.n_rows
+        self.beginInsertRows(QModelIndex(), n, n + df.shape[0] - 1)
+        self.store.append_frame(df)
+        self.endInsertRows()
+
+    # ---- структура ----
+    def insertRows(self, row, count=1, parent=QModelIndex()):
+        if count <= 0 or not 0 <= row <= self.store.n_rows:
+            return False
+        self.beginInsertRows(QModelIndex(), row, row + count - 1)
+        self.store.insert_rows(row, count)
+        self.endInsertRows()
+        return True
+
+    def removeRows(self, row, count=1, parent=QModelIndex()):
+        if count <= 0 or row < 0 or row + count > self.store.n_rows:
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row + count - 1)
+        self.store.remove_rows(row, count)
+        self.endRemoveRows()
+        return True
+
+    def insertColumns(self, column, count=1, parent=QModelIndex()):
+        if count <= 0 or not 0 <= column <= self.store.n_cols:
+            return False
+        self.beginInsertColumns(QModelIndex(), column, column + count - 1)
+        self.store.insert_columns(column, count)
+        self.endInsertColumns()
+        return True
+
+    def removeColumns(self, column, count=1, parent=QModelIndex()):
+        if count <= 0 or column < 0 or column + count > self.store.n_cols:
+            return False
+        self.beginRemoveColumns(QModelIndex(), column, column + count - 1)
+        self.store.remove_columns(column, count)
+        self.endRemoveColumns()
+        return True
+
+
+class RowViewModel(QAbstractProxyModel):
+    """
+    Подання рядків DataTableModel (сортування, фільтр, групування — row_views.py):
+    рядок подання -> рядок сховища через масив rows, без копіювання даних.
+    Без подання (rows is None) відображення тотожне і структурні зміни джерела
+    передаються як є; з активним поданням воно перераховується (скидання моделі).
+    Редагування комірок не змінює порядок і склад подання до наступного apply().
+    """
+    view_changed = pyqtSignal()
+
+    def __init__(self, source: DataTableModel, parent=None):
+        super().__init__(parent)
+        self._source = source   # sourceModel() — виклик у C++, а index() і cell() йдуть на кожну комірку
+        self.spec = {}
+        self.rows = None
+        self._inverse = None
+        self._groups = None
+        self._band = None
+        self._reset_pending = False
+        self.setSourceModel(source)
+        source.dataChanged.connect(self._on_data_changed)
+        source.headerDataChanged.connect(self._on_header_changed)
+        source.modelAboutToBeReset.connect(self.beginResetModel)
+        source.modelReset.connect(self._on_reset)
+        for about, done, begin, end in (
+                (source.rowsAboutToBeInserted, source.rowsInserted, self.beginInsertRows, self.endInsertRows),
+                (source.rowsAboutToBeRemoved, source.rowsRemoved, self.beginRemoveRows, self.endRemoveRows),
+                (source.columnsAboutToBeInserted, source.columnsInserted, self.beginInsertColumns,
+                 self.endInsertColumns),
+                (source.columnsAboutToBeRemoved, source.columnsRemoved, self.beginRemoveColumns,
+                 self.endRemoveColumns)):
+            about.connect(lambda parent, first, last, begin=begin: self._before_change(begin, first, last))
+            done.connect(lambda parent, first, last, end=end: self._after_change(end))
+
+    @property
+    def store(self) -> ColumnStore:
+        return self.sourceModel().store
+
+    # ---- подання ----
+    def apply(self, spec: dict):
+        """Нове подання (див. row_views); {} — усі рядки у вихідному порядку."""
+        self.beginResetModel()
+        self.spec = dict(spec)
+        self._recompute()
+        self.endResetModel()
+        self.view_changed.emit()
+
+    def update_spec(self, **parts):
+        """Змінює частини подання: update_spec(sort=None) прибирає сортування."""
+        spec = dict(self.spec)
+        for key, value in parts.items():
+            if value:
+                spec[key] = value
+            else:
+                spec.pop(key, None)
+        self.apply(spec)
+
+    def _recompute(self):
+        self.rows = row_views.view_rows(self.store, self.spec)
+        self._inverse = None
+        self._groups = row_views.group_starts(self.store, self.spec, self.rows)
+        self._band = None
+        if self._groups is not None and len(self.rows):
+            starts = self._groups[0]
+            counts = np.diff(np.append(starts, len(self.rows)))
+            self._band = np.repeat(np.arange(len(starts)) % 2 == 1, counts)
+
+    def is_filtered(self) -> bool:
+        return self.rows is not None and bool(self.spec.get("filter"))
+
+    def filtered_rows(self):
+        """Рядки сховища, що проходять фільтр (у вихідному порядку), або None без фільтра."""
+        return np.sort(self.rows) if self.is_filtered() else None
+
+    def source_row(self, row: int) -> int:
+        """Рядок сховища для рядка подання; row == rowCount() — кінець сховища."""
+        if self.rows is None:
+            return row
+        return int(self.rows[row]) if row < len(self.rows) else self.store.n_rows
+
+    def source_rows(self, rows: np.ndarray) -> np.ndarray:
+        return rows if self.rows is None else self.rows[rows]
+
+    def describe(self) -> str:
+        return row_views.describe(self.store, self.spec, self.rows)
+
+    # ---- сигнали джерела ----
+    def _before_change(self, begin, first, last):
+        self._reset_pending = self.rows is not None
+        if self._reset_pending:
+            self.beginResetModel()
+        else:
+            begin(QModelIndex(), first, last)
+
+    def _after_change(self, end):
+        if self._reset_pending:
+            self._reset_pending = False
+            self._recompute()
+            self.endResetModel()
+            self.view_changed.emit()
+        else:
+            end()
+
+    def _on_reset(self):
+        # нова таблиця — подання попередньої до неї не стосується
+        self.spec = {}
+        self._recompute()
+        self.endResetModel()
+        self.view_changed.emit()
+
+    def _on_data_changed(self, top_left, bottom_right, roles=()):
+        if self.rows is None:
+            self.dataChanged.emit(self.index(top_left.row(), top_left.column()),
+                                  self.index(bottom_right.row(), bottom_right.column()), roles)
+        elif len(self.rows):
+            # змінені рядки розкидані поданням — перемальовуються видимі комірки стовпців
+            self.dataChanged.emit(self.index(0, top_left.column()),
+                                  self.index(len(self.rows) - 1, bottom_right.column()), roles)
+
+    def _on_header_changed(self, orientation, first, last):
+        if orientation == Qt.Horizontal:
+            self.headerDataChanged.emit(orientation, first, last)
+
+    # ---- QAbstractProxyModel ----
+    def mapToSource(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        return self.sourceModel().index(self.source_row(index.row()), index.column())
+
+    def mapFromSource(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        if self.rows is None:
+            return self.index(index.row(), index.column())
+        if self._inverse is None:
+            self._inverse = np.full(self.store.n_rows, -1, dtype=np.int64)
+            self._inverse[self.rows] = np.arange(len(self.rows))
+        row = int(self._inverse[index.row()])
+        return self.index(row, index.column()) if row >= 0 else QModelIndex()
+
+    def index(self, row, column, parent=QModelIndex()):
+        # на кожну видиму комірку — розміри без викликів rowCount()/columnCount()
+        store = self._source.store
+        n = store.n_rows if self.rows is None else len(self.rows)
+        if not (0 <= row < n and 0 <= column < store.n_cols) or parent.isValid():
+            return QModelIndex()
+        # з числовим id: перевантаження з вказівником на об'єкт Python помітно повільніше
+        return self.createIndex(row, column, 0)
+
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.store.n_rows if self.rows is None else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.store.n_cols
+
+    def data(self, index, role=Qt.DisplayRole):
+        # як у DataTableModel.data — без mapToSource і створення індексів джерела
+        if role == _DISPLAY or role == _EDIT:
+            r = index.row() if self.rows is None else int(self.rows[index.row()])
+            return self._source.store.columns[index.column()].text(r)
+        if role == _BACKGROUND and self._band is not None and self._band[index.row()]:
+            return GROUP_BAND
+        return None
+
+    def cell(self, row: int, column: int):
+        """(текст, тло або None) комірки — для CellDelegate."""
+        if self.rows is None:
+            return self._source.store.columns[column].text(row), None
+        text = self._source.store.columns[column].text(int(self.rows[row]))
+        return text, (GROUP_BAND if self._band is not None and self._band[row] else None)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        # заголовок рядків питає кожну роль для кожного видимого рядка
+        if role != _DISPLAY and role != _TOOLTIP:
+            return None
+        if orientation == Qt.Horizontal:
+            return self._source.headerData(section, orientation, role)
+        if role == _DISPLAY:
+            # номер рядка у вихідній таблиці — незмінний у будь-якому поданні
+            return str(self.source_row(section) + 1)
+        if self._groups is not None:
+            starts, labels = self._groups
+            g = int(np.searchsorted(starts, section, side="right")) - 1
+            end = starts[g + 1] if g + 1 < len(starts) else len(self.rows)
+            return f"{self.spec['group'].name}: {labels[g] or '(порожньо)'} — {end - starts[g]} рядків"
+        return None
+
+    def flags(self, index):
+        return _CELL_FLAGS if index.isValid() else Qt.NoItemFlags
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Сортування кліком по заголовку (QTableView.setSortingEnabled)."""
+        if 0 <= column < self.store.n_cols:
+            self.update_spec(sort=(self.store.columns[column], order == Qt.DescendingOrder))
+        elif self.spec.get("sort"):
+            self.update_spec(sort=None)
+
+
+class CellDelegate(QStyledItemDelegate):
+    """
+    Делегат комірок таблиці. Стандартне малювання на кожну видиму комірку
+    питає модель про сім ролей (шрифт, вирівнювання, колір, позначка,
+    піктограма, текст, тло) і щоразу заново розкладає текст (QTextLayout) —
+    це дорожче за саме малювання. Моделі цього модуля задають лише текст і
+    тло, тож тут — один прямий виклик model.cell() (model — DataTableModel
+    або RowViewModel, показана у view) і текст, розкладений раз (QStaticText,
+    кеш за текстом). Комірки з фокусом, з переносом рядка і ті, що не
+    вміщаються, малюються стандартно (рамка фокуса, перенесення, «…»).
+    """
+
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self._cell = model.cell
+        self._layouts = {}      # текст -> (QStaticText, ширина, висота)
+        self._margin = None
+
+    def _layout(self, text: str, font):
+        if len(self._layouts) >= TEXT_LAYOUTS:
+            self._layouts.clear()
+        static = QStaticText(text)
+        static.setTextFormat(Qt.PlainText)
+        static.prepare(QTransform(), font)
+        size = static.size()
+        entry = self._layouts[text] = (static, size.width(), int(size.height()))
+        return entry
+
+    def paint(self, painter, option, index):
+        text, background = self._cell(index.row(), index.column())
+        state = int(option.state)
+        if state & _HAS_FOCUS or "\n" in text:
+            return super().paint(painter, option, index)
+        static, width, height = self._layouts.get(text) or self._layout(text, option.font)
+        if self._margin is None:
+            # як QCommonStyle: відступ тексту від країв комірки
+            widget = option.widget
+            self._margin = widget.style().pixelMetric(QStyle.PM_FocusFrameHMargin, None, widget) + 1
+        rect = option.rect
+        x, y, w, h = rect.getRect()
+        if width > w - 2 * self._margin:
+            return super().paint(painter, option, index)
+        group = QPalette.Active if state & _ACTIVE else QPalette.Inactive
+        if not state & _ENABLED:
+            group = QPalette.Disabled
+        palette = option.palette
+        if state & _SELECTED:
+            painter.fillRect(rect, palette.brush(group, QPalette.Highlight))
+            painter.setPen(palette.color(group, QPalette.HighlightedText))
+        else:
+            if background is not None:
+                painter.fillRect(rect, background)
+            painter.setPen(palette.color(group, QPalette.Text))
+        if text:
+            painter.drawStaticText(x + self._margin, y + (h - height + 1) // 2, static)
+
+    def initStyleOption(self, option, index):
+        # стандартний шлях paint() і розміри (sizeHint) — без семи викликів data()
+        text, background = self._cell(index.row(), index.column())
+        option.index = index
+        if text:
+            features = _WITH_DISPLAY.get(int(option.features))
+            if features is None:
+                features = _WITH_DISPLAY[int(option.features)] = option.features | _HAS_DISPLAY
+            option.features = features
+            # як QStyledItemDelegate.displayText: перенесення рядка в комірці
+            option.text = text.replace("\n", "\u2028") if "\n" in text else text
+        if background is not None:
+            option.backgroundBrush = background
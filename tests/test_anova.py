@@ -0,0 +1,77 @@
+"""factorial_anova проти statsmodels: збалансовані, незбалансовані і з порожніми комірками."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from anova import Design, factorial_anova, run_tests
+
+sm = pytest.importorskip("statsmodels.api")
+smf = pytest.importorskip("statsmodels.formula.api")
+
+FACTORS = ["P", "Q", "R"]
+
+
+def make_frame(sizes, shape, seed=0) -> pd.DataFrame:
+    """По sizes[c] спостережень у комірці c (порядок комірок — як у Design.cell)."""
+    rng = np.random.default_rng(seed)
+    cells = [idx for idx, n in np.ndenumerate(np.asarray(sizes).reshape(shape)) for _ in range(n)]
+    df = pd.DataFrame(cells, columns=FACTORS[:len(shape)]).astype(str)
+    df["y"] = rng.normal(10, 2, len(df)) + 3 * df["P"].astype(int)
+    return df
+
+
+def anova_for(df: pd.DataFrame) -> pd.DataFrame:
+    factors = [f for f in FACTORS if f in df]
+    return factorial_anova(Design(df, "y", factors)).set_index("source")
+
+
+def statsmodels_type2(df: pd.DataFrame) -> pd.DataFrame:
+    factors = [f for f in FACTORS if f in df]
+    fit = smf.ols("y ~ " + " * ".join(f"C({f}, Sum)" for f in factors), df).fit()
+    table = sm.stats.anova_lm(fit, typ=2)
+    table.index = [" × ".join(part[2] for part in name.split(":")) if name != "Residual" else "Залишок"
+                   for name in table.index]
+    return table
+
+
+@pytest.mark.parametrize("sizes, shape", [
+    ([10, 2, 2, 10], (2, 2)),
+    ([5, 3, 7, 4, 6, 2], (2, 3)),
+    ([3, 4, 2, 5, 6, 2, 3, 4], (2, 2, 2)),
+    ([4, 4, 4, 4, 4, 4], (3, 2)),
+])
+def test_matches_statsmodels(sizes, shape):
+    df = make_frame(sizes, shape)
+    ours, ref = anova_for(df), statsmodels_type2(df)
+    for source, row in ref.iterrows():
+        assert ours.loc[source, "ss"] == pytest.approx(row["sum_sq"], rel=1e-8, abs=1e-10)
+        assert ours.loc[source, "df"] == row["df"]
+        if source != "Залишок":
+            assert ours.loc[source, "p"] == pytest.approx(row["PR(>F)"], rel=1e-6)
+
+
+def test_unbalanced_interaction_is_small():
+    # комірки 10/2/2/10 без взаємодії: класичні суми давали від'ємну SS взаємодії
+    df = make_frame([10, 2, 2, 10], (2, 2), seed=3)
+    ours = anova_for(df)
+    assert (ours["ss"].dropna() >= 0).all()
+    assert 0 <= ours.loc["P × Q", "p"] <= 1
+
+
+def test_empty_cell_model_comparison():
+    # порожня комірка: SS(P | Q) — різниця залишків адитивних моделей, df взаємодії — 1
+    df = make_frame([5, 3, 0, 4, 6, 2], (2, 3))
+    ours = anova_for(df)
+    rss = {f: smf.ols(f"y ~ {f}", df).fit().ssr for f in ("C(Q)", "C(P)", "C(P) + C(Q)")}
+    assert ours.loc["P", "ss"] == pytest.approx(rss["C(Q)"] - rss["C(P) + C(Q)"], rel=1e-8)
+    assert ours.loc["Q", "ss"] == pytest.approx(rss["C(P)"] - rss["C(P) + C(Q)"], rel=1e-8)
+    assert ours.loc["P × Q", "df"] == 1
+    assert ours.loc["Залишок", "df"] == len(df) - 5
+
+
+def test_design_in_results():
+    res = run_tests(make_frame([10, 2, 2, 10], (2, 2)), "y", {"response": "y", "factors": ["P", "Q"]})
+    assert not res["balanced"] and res["ss_type"] == "II"
+    assert res["design"]["ss_type"].iloc[0] == "II"
+    res = run_tests(make_frame([4, 4, 4, 4], (2, 2)), "y", {"response": "y", "factors": ["P", "Q"]})
+    assert res["balanced"] and res["design"]["balanced"].iloc[0]
@@ -0,0 +1,40 @@
+"""ColumnStore: подання to_frame() після редагування комірок."""
+import numpy as np
+import pandas as pd
+
+from column_store import CAT, ColumnStore
+
+
+def make_store() -> ColumnStore:
+    return ColumnStore.from_frame(pd.DataFrame({"g": ["a", "b", "a"], "y": [1.0, 2.0, 3.0]}))
+
+
+def test_frame_survives_new_category():
+    store = make_store()
+    df = store.to_frame()
+    store.set_text(0, 0, "c")
+    assert df["g"].tolist() == ["a", "b", "a"]
+    assert store.to_frame()["g"].tolist() == ["c", "b", "a"]
+
+
+def test_frame_sees_edits_with_existing_categories():
+    store = make_store()
+    df = store.to_frame()
+    store.set_text(0, 0, "b")
+    store.set_text(2, 1, "5")
+    assert df["g"].tolist() == ["b", "b", "a"]
+    assert df["y"].tolist() == [1.0, 2.0, 5.0]
+
+
+def test_many_new_categories_after_frame():
+    store = make_store()
+    old = store.to_frame()
+    for i in range(300):
+        store.set_text(i % 3, 0, f"level {i}")
+        if i % 50 == 0:
+            old = store.to_frame()
+            assert old["g"].notna().all()
+    col = store.columns[0]
+    assert col.kind == CAT and len(col.categories) == 302
+    assert store.to_frame()["g"].tolist() == ["level 297", "level 298", "level 299"]
+    assert np.all(old["g"].cat.codes.to_numpy() < len(old["g"].cat.categories))
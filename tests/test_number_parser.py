@@ -0,0 +1,112 @@
+"""Крайні випадки number_parser: локальні роздільники, відсотки, мінус, порожні і змішані стовпці."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from column_store import CAT, NUM, ColumnStore
+from number_parser import VECTOR_MIN, parse_number, parse_numbers
+
+NBSP = "\u00a0"
+NNBSP = "\u202f"
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("3,14", 3.14),
+    ("1 234,5", 1234.5),
+    ("1.234,5", 1234.5),
+    ("1,234.5", 1234.5),
+    ("1,234,567", 1234567.0),
+    ("1.234.567", 1234567.0),
+    (f"1{NBSP}234,5", 1234.5),
+    (f"12{NNBSP}345{NNBSP}678", 12345678.0),
+    ("1'234", 1234.0),
+    ("12 %", 0.12),
+    ("12,5%", 0.125),
+    ("\u22123,5", -3.5),
+    ("-3,5", -3.5),
+    ("\u22121 234,5", -1234.5),
+    ("  7 ", 7.0),
+    ("1e3", 1000.0),
+])
+def test_parse_number(text, expected):
+    assert parse_number(text) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("text", ["1,2,3.4", "12 34", "1.23.4,5", "abc", "5 кг", "1,2.3", "%",
+                                  "1_000", "1_000,5", "inf", "-Infinity", "+inf", "−inf", "nan", "NaN", "inf %"])
+def test_not_a_number(text):
+    assert parse_number(text) is None
+
+
+@pytest.mark.parametrize("value", ["", "   ", None, np.nan, float("nan")])
+def test_empty_is_nan(value):
+    v = parse_number(value)
+    assert v is not None and np.isnan(v)
+
+
+def test_bool_is_not_a_number():
+    assert parse_number(True) is None
+
+
+def test_parse_numbers_matches_parse_number():
+    values = ["1 234,5", "1.234,5", "12 %", f"1{NBSP}000", "\u22122", "-2", "", None, np.nan, "x", "3,0"]
+    nums, bad = parse_numbers(pd.Series(values, dtype=object))
+    for v, num, b in zip(values, nums, bad):
+        one = parse_number(v)
+        assert b == (one is None)
+        if one is not None:
+            assert num == pytest.approx(one, nan_ok=True)
+
+
+def test_parse_numbers_vector_path():
+    # унікальних значень більше VECTOR_MIN — розбір через numpy.strings
+    rng = np.random.default_rng(0)
+    x = np.round(rng.normal(0, 1000, 3 * VECTOR_MIN), 2)
+    text = np.array([f"{v:.2f}".replace(".", ",") for v in x], dtype=object)
+    text[::7] = [f"{v:,.2f}".replace(",", NBSP).replace(".", ",") for v in x[::7]]
+    text[::11] = ""
+    nums, bad = parse_numbers(text)
+    assert not bad.any()
+    expected = x.copy()
+    expected[::11] = np.nan
+    np.testing.assert_allclose(nums, expected)
+
+
+def test_mixed_column_strict():
+    values = pd.Series(["1,5", "2", "немає", "3"], dtype=object)
+    assert parse_numbers(values, strict=True) is None
+    nums, bad = parse_numbers(values)
+    assert bad.tolist() == [False, False, True, False]
+    assert np.isnan(nums[2])
+
+
+def test_mixed_columns_stay_text():
+    df = pd.DataFrame({
+        "num": ["1 234,5", "12 %", "−1", "", None],
+        "mixed": ["1,5", "2", "н/д", "", None],
+        "codes": ["001", "002", "A3", "004", "005"],
+    })
+    store = ColumnStore.from_frame(df)
+    num, mixed, codes = store.columns
+    assert num.kind == NUM
+    np.testing.assert_allclose(num.values, [1234.5, 0.12, -1.0, np.nan, np.nan])
+    assert mixed.kind == CAT
+    assert [mixed.text(r) for r in range(5)] == ["1,5", "2", "н/д", "", ""]
+    assert codes.kind == CAT
+    assert codes.text(0) == "001"
+
+
+@pytest.mark.parametrize("n_unique", [10, 3 * VECTOR_MIN])
+def test_non_finite_and_underscores_rejected(n_unique):
+    # обидва шляхи: поштучний і numpy.strings
+    values = np.array([f"{i},5" for i in range(n_unique)] + ["1_000", "inf", "-Infinity", "nan", ""], dtype=object)
+    nums, bad = parse_numbers(values)
+    assert bad[-5:].tolist() == [True, True, True, True, False]
+    assert np.isnan(nums[-5:]).all()
+    assert not bad[:-5].any() and np.isfinite(nums[:-5]).all()
+    assert parse_numbers(values, strict=True) is None
+
+
+def test_inf_column_stays_text():
+    store = ColumnStore.from_frame(pd.DataFrame({"x": ["1", "inf", "2"]}))
+    assert store.columns[0].kind == CAT
@@ -0,0 +1,34 @@
+"""Збереження і відкриття проєкту SAD."""
+import numpy as np
+import pandas as pd
+
+from column_store import CAT, NUM, ColumnStore
+from project import load_project, save_project
+
+
+def test_roundtrip(tmp_path):
+    df = pd.DataFrame({"Сорт": ["a", "b", None, "a"], "y": [1.5, np.nan, 3.0, 4.0]})
+    store = ColumnStore.from_frame(df)
+    path = str(tmp_path / "p.sad")
+    save_project(path, store, {"alpha": 0.01})
+    loaded, meta = load_project(path)
+    assert meta == {"settings": {"alpha": 0.01}}
+    assert loaded.n_rows == 4 and loaded.names == ["Сорт", "y"]
+    g, y = loaded.columns
+    assert g.kind == CAT and [g.text(r) for r in range(4)] == ["a", "b", "", "a"]
+    assert y.kind == NUM and isinstance(y.values, np.memmap)
+    np.testing.assert_array_equal(y.values, [1.5, np.nan, 3.0, 4.0])
+    # copy-on-write: редагування не змінює файл
+    loaded.set_text(0, 1, "9")
+    again, _ = load_project(path)
+    assert again.columns[1].values[0] == 1.5
+    # повторне збереження поверх відображеного файлу
+    save_project(path, loaded)
+    assert load_project(path)[0].columns[1].values[0] == 9.0
+
+
+def test_empty_store(tmp_path):
+    path = str(tmp_path / "e.sad")
+    save_project(path, ColumnStore(0, 2))
+    loaded, _ = load_project(path)
+    assert loaded.n_rows == 0 and len(loaded.columns) == 2
@@ -0,0 +1,96 @@
+"""Векторизовані тести stats_engine проти scipy.stats на тих самих вибірках."""
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from stats_engine import SW_MAX_N, batch_statistics
+
+SEEDS = [0, 1, 2]
+
+
+def make_frame(seed: int, sizes, ties: bool = False) -> pd.DataFrame:
+    """Показник «y» у групах «g» заданих розмірів; ties — значення з повторами."""
+    rng = np.random.default_rng(seed)
+    g = np.repeat([f"G{i}" for i in range(len(sizes))], sizes)
+    y = rng.gamma(2.0, 3.0, len(g)) + np.repeat(rng.normal(0, 2, len(sizes)), sizes)
+    if ties:
+        y = np.round(y)
+    return pd.DataFrame({"g": g, "y": y})
+
+
+def groups(df: pd.DataFrame) -> list:
+    """Вибірки по групах у порядку batch_statistics (рівні відсортовані, без NaN)."""
+    df = df.dropna(subset=["g", "y"])
+    return [part["y"].to_numpy() for _, part in df.groupby("g", sort=True)]
+
+
+def check_describe(df: pd.DataFrame):
+    res = batch_statistics(df, ["y"], by="g")["describe"]
+    samples = groups(df)
+    assert len(res) == len(samples)
+    for row, y in zip(res.itertuples(), samples):
+        assert row.n == len(y)
+        if 3 <= len(y) <= SW_MAX_N and np.ptp(y) > 0:
+            w, p = stats.shapiro(y)
+            assert row.shapiro_w == pytest.approx(w, rel=1e-6)
+            assert row.shapiro_p == pytest.approx(p, rel=1e-5, abs=1e-12)
+        else:
+            assert np.isnan(row.shapiro_w) and np.isnan(row.shapiro_p)
+        if len(y) >= 8:
+            k2, p = stats.normaltest(y)
+            assert row.dagostino_k2 == pytest.approx(k2, rel=1e-8)
+            assert row.dagostino_p == pytest.approx(p, rel=1e-6, abs=1e-300)
+        else:
+            assert np.isnan(row.dagostino_k2)
+
+
+def check_homogeneity(df: pd.DataFrame):
+    res = batch_statistics(df, ["y"], by="g")["homogeneity"].iloc[0]
+    samples = groups(df)
+    w, p = stats.levene(*samples, center="median")
+    assert res.levene_w == pytest.approx(w, rel=1e-8)
+    assert res.levene_p == pytest.approx(p, rel=1e-6)
+    t, p = stats.bartlett(*samples)
+    assert res.bartlett_t == pytest.approx(t, rel=1e-8)
+    assert res.bartlett_p == pytest.approx(p, rel=1e-6)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_small_groups(seed):
+    df = make_frame(seed, [3, 4, 5, 6, 8, 11, 12, 30])
+    check_describe(df)
+    check_homogeneity(df)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_ties(seed):
+    df = make_frame(seed, [3, 9, 20, 60], ties=True)
+    check_describe(df)
+    check_homogeneity(df)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_nan_values_and_groups(seed):
+    df = make_frame(seed, [10, 15, 40, 25])
+    rng = np.random.default_rng(seed + 100)
+    df.loc[rng.random(len(df)) < 0.1, "y"] = np.nan
+    df.loc[rng.random(len(df)) < 0.1, "g"] = np.nan
+    check_describe(df)
+    check_homogeneity(df)
+
+
+def test_large_groups():
+    # W Шапіро–Уілка — лише до SW_MAX_N; Д'Агостіно і однорідність — для будь-якого n
+    df = make_frame(3, [SW_MAX_N, SW_MAX_N + 1000, 7000])
+    check_describe(df)
+    check_homogeneity(df)
+
+
+def test_constant_group():
+    df = make_frame(4, [6, 6, 10])
+    df.loc[df["g"] == "G1", "y"] = 5.0
+    res = batch_statistics(df, ["y"], by="g")["describe"]
+    assert np.isnan(res.loc[1, "shapiro_w"])
+    y = groups(df)[0]
+    assert res.loc[0, "shapiro_w"] == pytest.approx(stats.shapiro(y)[0], rel=1e-6)